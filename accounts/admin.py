@@ -1,7 +1,7 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 
-from .models import User
+from .models import Follow, User
 
 
 @admin.register(User)
@@ -10,3 +10,11 @@ class UserAdmin(BaseUserAdmin):
     fieldsets = BaseUserAdmin.fieldsets + (
         ('追加情報', {'fields': ('display_name',)}),
     )
+
+
+@admin.register(Follow)
+class FollowAdmin(admin.ModelAdmin):
+    list_display = ['follower', 'followee', 'created_at']
+    search_fields = ['follower__username', 'followee__username']
+    list_select_related = ['follower', 'followee']
+    autocomplete_fields = ['follower', 'followee']
@@ -4,6 +4,7 @@ from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from . import tasks
 from .serializers import LoginSerializer, RegisterSerializer, UserSerializer
 
 
@@ -59,7 +60,6 @@ class MobileMeView(APIView):
         return Response(serializer.data)
 
     def delete(self, request):
-        user = request.user
-        request._auth.delete()
-        user.delete()
+        # トークンの削除とログイン停止はすぐ、関連データの削除はジョブで行う（accounts/tasks.py）
+        tasks.request_deletion(request.user)
         return Response(status=status.HTTP_204_NO_CONTENT)
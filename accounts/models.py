@@ -13,9 +13,25 @@ class User(AbstractUser):
     bio = models.TextField(blank=True, default='')
     avatar_url = models.URLField(max_length=500, blank=True, default='')
     role = models.CharField(max_length=20, choices=ROLE_CHOICES, default='user')
+    follower_count = models.PositiveIntegerField(default=0)
 
     class Meta:
         db_table = 'accounts_user'
 
     def __str__(self):
         return self.username
+
+
+class Follow(models.Model):
+    follower = models.ForeignKey(User, on_delete=models.CASCADE, related_name='following')
+    followee = models.ForeignKey(User, on_delete=models.CASCADE, related_name='followers')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        constraints = [
+            models.UniqueConstraint(fields=['follower', 'followee'], name='unique_follow'),
+        ]
+
+    def __str__(self):
+        return f'{self.follower} → {self.followee}'
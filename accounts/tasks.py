@@ -0,0 +1,19 @@
+from django.db import transaction
+from knox.models import AuthToken
+
+from config import deletion
+from jobs.queue import enqueue, task
+from .models import User
+
+
+@task('accounts.delete_user')
+def delete_user(user_id):
+    deletion.purge(User.objects.filter(pk=user_id))
+
+
+def request_deletion(user):
+    """退会: すぐにログインできない状態にし、レビュー等の関連データごとの削除はジョブで行う"""
+    with transaction.atomic():
+        User.objects.filter(pk=user.pk).update(is_active=False)
+        AuthToken.objects.filter(user=user).delete()
+        enqueue('accounts.delete_user', user_id=user.pk)
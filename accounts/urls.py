@@ -7,4 +7,5 @@ urlpatterns = [
     path('auth/login/', views.LoginView.as_view(), name='login'),
     path('auth/logout/', views.LogoutView.as_view(), name='logout'),
     path('auth/me/', views.MeView.as_view(), name='me'),
+    path('users/<str:username>/follow/', views.FollowView.as_view(), name='follow'),
 ]
@@ -1,4 +1,5 @@
 from django.contrib.auth import login, logout
+from django.shortcuts import get_object_or_404
 from django.utils.decorators import method_decorator
 from django.views.decorators.csrf import ensure_csrf_cookie, csrf_exempt
 from rest_framework import status
@@ -6,6 +7,8 @@ from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from . import tasks
+from .models import Follow, User
 from .serializers import LoginSerializer, RegisterSerializer, UserSerializer
 
 
@@ -58,5 +61,27 @@ class MeView(APIView):
     def delete(self, request):
         user = request.user
         logout(request)
-        user.delete()
+        # 関連データの削除はジョブで行う（accounts/tasks.py）
+        tasks.request_deletion(user)
         return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class FollowView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, username):
+        followee = get_object_or_404(User, username=username)
+        if followee == request.user:
+            return Response({'detail': '自分自身はフォローできません。'}, status=status.HTTP_400_BAD_REQUEST)
+        # follower_count は Follow の post_save / post_delete で増減する（reviews/signals.py）
+        _, created = Follow.objects.get_or_create(follower=request.user, followee=followee)
+        if created:
+            return Response({'detail': 'フォローしました。'}, status=status.HTTP_201_CREATED)
+        return Response({'detail': '既にフォロー済みです。'}, status=status.HTTP_200_OK)
+
+    def delete(self, request, username):
+        followee = get_object_or_404(User, username=username)
+        deleted, _ = Follow.objects.filter(follower=request.user, followee=followee).delete()
+        if deleted:
+            return Response(status=status.HTTP_204_NO_CONTENT)
+        return Response({'detail': 'フォローしていません。'}, status=status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,71 @@
+"""
+JSON レンダラー / パーサーのベンチマーク
+python3 manage.py shell < bench_json.py
+
+WorkSerializer / ReviewSerializer の一覧ペイロード（DBに依存しない合成データ）を
+DRF 標準の JSONRenderer / JSONParser と FastJSONRenderer / FastJSONParser で
+encode / decode し、1秒あたりの処理回数を比較する。出力が同一であることも確認する。
+"""
+import datetime
+import io
+import timeit
+
+from django.utils import timezone
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from accounts.models import User
+from config.renderers import FastJSONParser, FastJSONRenderer, orjson
+from reviews.models import Review
+from reviews.serializers import ReviewSerializer
+from theaters.models import Theater
+from works.models import Performance, PosterSubmission, Work
+from works.serializers import WorkSerializer
+
+ROWS = 200
+now = timezone.now()
+user = User(id=1, username='bench', display_name='ベンチ太郎', avatar_url='https://res.cloudinary.com/x/a.png')
+theater = Theater(id=1, name='帝国劇場', slug='teikoku')
+
+works = []
+reviews = []
+for i in range(ROWS):
+    work = Work(id=i, title=f'星降る夜のワルツ {i}', slug=f'work-{i}', description='あらすじ。' * 20,
+                created_by=user, created_at=now, updated_at=now)
+    performance = Performance(id=i, work=work, theater=theater, start_date=datetime.date(2026, 4, 1),
+                              end_date=datetime.date(2026, 4, 30))
+    work._prefetched_selected_posters = [PosterSubmission(
+        id=i, work=work, user=user, image_url=f'https://res.cloudinary.com/x/p{i}.png',
+    )]
+    work._prefetched_performances = [performance]
+    # 評価の集計行はなし（get_rating が行ごとに RatingSummary を問い合わせないように）
+    work._state.fields_cache['rating_summary'] = None
+    performance._state.fields_cache['rating_summary'] = None
+    works.append(work)
+    review = Review(id=i, user=user, performance=performance, title='感想', body='とても良かった。' * 40,
+                    rating_overall=5, created_at=now, updated_at=now)
+    review._like_count = i
+    review._liked_by_user = False
+    reviews.append(review)
+
+payloads = {
+    'WorkSerializer': WorkSerializer(works, many=True).data,
+    'ReviewSerializer': ReviewSerializer(reviews, many=True).data,
+}
+
+print(f'orjson: {"有効" if orjson else "未インストール（標準 json にフォールバック）"}  行数: {ROWS}')
+print(f'{"payload":<18} {"op":<7} {"DRF(回/秒)":>12} {"Fast(回/秒)":>12} {"倍率":>6}')
+for name, data in payloads.items():
+    std_bytes = JSONRenderer().render(data)
+    fast_bytes = FastJSONRenderer().render(data)
+    assert std_bytes == fast_bytes, f'{name}: 出力が一致しません'
+    cases = {
+        'render': (lambda: JSONRenderer().render(data), lambda: FastJSONRenderer().render(data)),
+        'parse': (lambda: JSONParser().parse(io.BytesIO(std_bytes)),
+                  lambda: FastJSONParser().parse(io.BytesIO(std_bytes))),
+    }
+    for op, (std, fast) in cases.items():
+        n = 50
+        std_rate = n / min(timeit.repeat(std, number=n, repeat=3))
+        fast_rate = n / min(timeit.repeat(fast, number=n, repeat=3))
+        print(f'{name:<18} {op:<7} {std_rate:>12.1f} {fast_rate:>12.1f} {fast_rate / std_rate:>5.1f}x')
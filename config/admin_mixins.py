@@ -0,0 +1,51 @@
+"""
+ログ系の大きなテーブル向けの管理画面設定。
+
+- 絞り込みのない一覧の件数は、Postgres なら pg_class.reltuples の推定値を使う
+  （ADMIN_ESTIMATED_COUNT_THRESHOLD 行未満なら通常の COUNT(*)）。全件数の表示もしない。
+- date_hierarchy のある一覧は、条件なしで開いたとき今月に絞った URL へリダイレクトする
+  （全期間の DISTINCT 年月の集計と全件スキャンを避ける）。
+一覧で __str__ が辿る関連は各 ModelAdmin の list_select_related で JOIN しておく。
+"""
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db import connections
+from django.shortcuts import redirect
+from django.utils import timezone
+from django.utils.functional import cached_property
+
+
+def estimated_count(queryset):
+    """テーブル全体の推定行数（Postgres 以外・統計未取得なら None）"""
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass',
+            [queryset.model._meta.db_table],
+        )
+        row = cursor.fetchone()
+    return row[0] if row and row[0] >= 0 else None
+
+
+class EstimatedCountPaginator(Paginator):
+    @cached_property
+    def count(self):
+        if not self.object_list.query.where:
+            estimate = estimated_count(self.object_list)
+            if estimate is not None and estimate >= settings.ADMIN_ESTIMATED_COUNT_THRESHOLD:
+                return estimate
+        return super().count
+
+
+class LargeTableAdminMixin:
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def changelist_view(self, request, extra_context=None):
+        if self.date_hierarchy and not request.GET:
+            today = timezone.localdate()
+            field = self.date_hierarchy
+            return redirect(f'{request.path}?{field}__year={today.year}&{field}__month={today.month}')
+        return super().changelist_view(request, extra_context)
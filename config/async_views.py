@@ -0,0 +1,111 @@
+"""
+読み取り専用エンドポイント用の async ビュー基盤。
+
+DRF の APIView は同期処理のみのため、ASGI（uvicorn ワーカー）で動かすと
+リクエストごとにスレッドを占有する。ここでは認証・JSON出力（DEFAULT_RENDERER_CLASSES）だけ DRF に合わせ、
+データ取得は async ORM で行う。WSGI でも Django が同期実行に変換するので動作する。
+"""
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpResponse
+from django.views import View
+from rest_framework.exceptions import APIException, NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from . import response_cache
+from .fieldsets import parse_fields, restrict_fields
+
+
+def _render(data, status=200):
+    renderer = api_settings.DEFAULT_RENDERER_CLASSES[0]()
+    return HttpResponse(renderer.render(data), status=status, content_type='application/json')
+
+
+class AsyncReadView(View):
+    http_method_names = ['get', 'head', 'options']
+    # True のときだけ DRF の認証クラスでユーザーを解決（不要なら DB アクセスなし）
+    authenticate = False
+    # True なら URL 単位で RESPONSE_CACHE_TIMEOUT 秒キャッシュ（ユーザーに依存しないビューのみ）
+    cache_response = False
+
+    async def get(self, request, *args, **kwargs):
+        if not self.cache_response or not settings.RESPONSE_CACHE_TIMEOUT:
+            return await self.respond(request, *args, **kwargs)
+        key = response_cache.cache_key(request)
+        response = await response_cache.aget(key)
+        if response is None:
+            response = await self.respond(request, *args, **kwargs)
+            if response.status_code == 200:
+                await response_cache.aset(key, response, settings.RESPONSE_CACHE_TIMEOUT)
+        return response
+
+    async def respond(self, request, *args, **kwargs):
+        if self.authenticate:
+            try:
+                request.user = await sync_to_async(self._authenticate)(request)
+            except APIException as exc:
+                return _render({'detail': exc.detail}, status=exc.status_code)
+        else:
+            request.user = AnonymousUser()
+        try:
+            data = await self.get_data(request, *args, **kwargs)
+        except APIException as exc:
+            # DRF の exception_handler と同じく、ValidationError の dict / list はそのまま返す
+            detail = exc.detail if isinstance(exc.detail, (dict, list)) else {'detail': exc.detail}
+            return _render(detail, status=exc.status_code)
+        return _render(data)
+
+    def _authenticate(self, request):
+        drf_request = Request(
+            request,
+            authenticators=[auth() for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES],
+        )
+        return drf_request.user
+
+    async def get_data(self, request, *args, **kwargs):
+        raise NotImplementedError
+
+
+async def alist(qs):
+    return [obj async for obj in qs]
+
+
+def serialize(request, serializer_class, objects):
+    """objects を出力する（SparseFieldsMixin と同じく ?fields= / ?omit= で出力フィールドを絞る）"""
+    serializer = serializer_class(objects, many=True, context={'request': request})
+    return restrict_fields(serializer, parse_fields(request.GET, serializer.child.fields)).data
+
+
+async def apaginate(request, qs, serializer_class):
+    """PageNumberPagination と同じ形式（count/next/previous/results）でページングする"""
+    page_size = api_settings.PAGE_SIZE
+    try:
+        page = int(request.GET.get('page', 1))
+        if page < 1:
+            raise ValueError
+    except ValueError:
+        page = None
+    count = await qs.acount()
+    last_page = max(1, -(-count // page_size))
+    if page is None or page > last_page:
+        raise NotFound(PageNumberPagination.invalid_page_message)
+
+    objects = await alist(qs[(page - 1) * page_size:page * page_size])
+    url = request.build_absolute_uri()
+    next_url = replace_query_param(url, 'page', page + 1) if page < last_page else None
+    if page == 1:
+        previous_url = None
+    elif page == 2:
+        previous_url = remove_query_param(url, 'page')
+    else:
+        previous_url = replace_query_param(url, 'page', page - 1)
+    return {
+        'count': count,
+        'next': next_url,
+        'previous': previous_url,
+        'results': serialize(request, serializer_class, objects),
+    }
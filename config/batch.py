@@ -0,0 +1,131 @@
+"""
+バッチAPI: 複数の GET を1回の HTTP リクエストでまとめて実行する。
+
+  POST /api/batch/
+  {"requests": [{"path": "/api/auth/me/"}, {"path": "/api/reviews/latest/"}], "parallel": true}
+  → {"responses": [{"path": "/api/auth/me/", "status": 200, "body": {...}}, ...]}
+
+各サブリクエストは URL を resolve してビューをプロセス内で直接呼ぶ（ミドルウェアは通らない）。
+認証はバッチ自体のリクエストで一度だけ行い、その user / auth をサブリクエストに引き継ぐ。
+parallel が true ならスレッドで並列実行する（スレッドごとに DB 接続を使い、終了時に閉じる）。
+"""
+import io
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIRequest
+from django.db import connections
+from django.http import Http404
+from django.urls import Resolver404, resolve
+from rest_framework import status
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+logger = logging.getLogger('config.batch')
+
+BATCH_PATH = '/api/batch/'
+
+
+def _sub_request(request, path):
+    """元のリクエストのヘッダー・セッション・認証を引き継いだ GET リクエストを作る"""
+    base = request._request
+    path_info, _, query = path.partition('?')
+    environ = {
+        key: value for key, value in base.META.items()
+        if key not in ('CONTENT_TYPE', 'CONTENT_LENGTH', 'HTTP_CONTENT_TYPE') and not key.startswith('wsgi.')
+    }
+    environ.update({
+        'REQUEST_METHOD': 'GET',
+        'SCRIPT_NAME': '',
+        'PATH_INFO': path_info,
+        'QUERY_STRING': query,
+        'wsgi.input': io.BytesIO(b''),
+        'wsgi.url_scheme': base.scheme,
+    })
+    sub = WSGIRequest(environ)
+    sub.session = getattr(base, 'session', None)
+    sub.user = request.user
+    if request.user.is_authenticated:
+        # DRF の Request は _force_auth_* があれば認証クラスを通さずにそれを使う
+        # （未ログイン時は通常どおり認証させ、401 / WWW-Authenticate を揃える）
+        sub._force_auth_user = request.user
+        sub._force_auth_token = request.auth
+    return sub
+
+
+def _error(path, status_code, detail):
+    return {'path': path, 'status': status_code, 'body': {'detail': detail}}
+
+
+def _body(response):
+    content_type = response.get('Content-Type', '')
+    if not response.content:
+        return None
+    if content_type.startswith('application/json'):
+        return json.loads(response.content)
+    return response.content.decode(response.charset, errors='replace')
+
+
+async def _await(awaitable):
+    return await awaitable
+
+
+def run_one(request, path):
+    if not isinstance(path, str) or not path.startswith('/api/') or path.startswith(BATCH_PATH):
+        return _error(path, status.HTTP_400_BAD_REQUEST, '実行できないパスです。')
+    sub = _sub_request(request, path)
+    try:
+        match = resolve(sub.path_info)
+    except Resolver404:
+        return _error(path, status.HTTP_404_NOT_FOUND, '見つかりません。')
+    sub.resolver_match = match
+    try:
+        response = match.func(sub, *match.args, **match.kwargs)
+        if hasattr(response, '__await__'):
+            # AsyncReadView 等の async ビュー
+            response = async_to_sync(_await)(response)
+        if hasattr(response, 'render'):
+            response.render()
+    except Http404:
+        return _error(path, status.HTTP_404_NOT_FOUND, '見つかりません。')
+    except Exception:
+        logger.exception('batch sub-request failed: %s', path)
+        return _error(path, status.HTTP_500_INTERNAL_SERVER_ERROR, 'サーバーエラーが発生しました。')
+    if response.streaming:
+        response.close()
+        return _error(path, status.HTTP_400_BAD_REQUEST, 'ストリーミングのレスポンスは取得できません。')
+    return {'path': path, 'status': response.status_code, 'body': _body(response)}
+
+
+def _run_in_thread(request, path):
+    try:
+        return run_one(request, path)
+    finally:
+        connections.close_all()
+
+
+class BatchView(APIView):
+    permission_classes = [AllowAny]
+
+    def post(self, request):
+        items = request.data.get('requests')
+        if not isinstance(items, list) or not items:
+            return Response({'requests': 'リクエストの配列を指定してください。'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(items) > settings.BATCH_MAX_REQUESTS:
+            return Response(
+                {'requests': f'一度に実行できるのは{settings.BATCH_MAX_REQUESTS}件までです。'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        paths = [item.get('path') if isinstance(item, dict) else None for item in items]
+
+        if request.data.get('parallel') and len(paths) > 1:
+            workers = min(settings.BATCH_MAX_WORKERS, len(paths))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(lambda path: _run_in_thread(request, path), paths))
+        else:
+            results = [run_one(request, path) for path in paths]
+        return Response({'responses': results})
@@ -0,0 +1,172 @@
+"""
+レスポンス圧縮ミドルウェア（brotli / gzip）。
+
+Accept-Encoding の q 値から br・gzip を選んで圧縮する（同じ q なら br を優先）。
+COMPRESSION_MIN_SIZE 未満の本文、Content-Encoding 済み、画像など圧縮が効かない
+Content-Type はそのまま返す。StreamingHttpResponse（同期・非同期とも）はチャンクごとに逐次圧縮する。
+
+config/response_cache.py でキャッシュしたレスポンスは、圧縮結果もエンコーディングごとに
+キャッシュへ保存し、以降のヒットでは保存済みのバイト列を返す。
+brotli パッケージがなければ gzip のみ。
+
+BREACH 対策（本文中のトークンを圧縮後の長さから推測される攻撃）:
+- gzip は Django の GZipMiddleware と同じく、ヘッダーの FNAME に
+  0〜COMPRESSION_GZIP_MAX_RANDOM_BYTES 未満のランダム長の詰め物を入れて長さをぶらす
+- br には詰め物を入れる手段がないので、Cookie・Authorization の付いたリクエスト、
+  GET / HEAD 以外（ログイン等）、Set-Cookie するレスポンスでは使わず gzip にする
+"""
+import secrets
+import struct
+import zlib
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+from . import response_cache
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli 未インストール環境
+    brotli = None
+
+ENCODINGS = ('br', 'gzip') if brotli is not None else ('gzip',)
+COMPRESSIBLE_TYPES = ('text/', 'application/json', 'application/javascript', 'application/xml', 'image/svg+xml')
+
+
+def negotiate(accept_encoding, encodings=ENCODINGS):
+    """Accept-Encoding から使うエンコーディングを選ぶ（対応なし・q=0 なら None）"""
+    qualities = {}
+    for part in accept_encoding.split(','):
+        name, _, params = part.partition(';')
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        qualities[name.strip().lower()] = quality
+    best, best_quality = None, 0.0
+    for encoding in encodings:
+        quality = qualities.get(encoding, qualities.get('*', 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def breach_safe(request, response):
+    """本文に秘密（トークン・CSRF・セッション由来のデータ）が入りえないリクエスト・レスポンスか"""
+    return (
+        request.method in ('GET', 'HEAD')
+        and not request.META.get('HTTP_AUTHORIZATION')
+        and not request.META.get('HTTP_COOKIE')
+        and not response.cookies
+    )
+
+
+class GzipCompressor:
+    """ヘッダーの FNAME にランダム長の詰め物を入れる gzip（RFC 1952）の逐次圧縮"""
+
+    def __init__(self):
+        padding = settings.COMPRESSION_GZIP_MAX_RANDOM_BYTES
+        filename = b'a' * secrets.randbelow(padding) if padding > 0 else b''
+        # ID1 ID2 CM=deflate FLG(FNAME) MTIME=0 XFL=0 OS=unknown
+        self._header = b'\x1f\x8b\x08' + (b'\x08' if filename else b'\x00') + b'\x00' * 5 + b'\xff'
+        if filename:
+            self._header += filename + b'\x00'
+        self._deflate = zlib.compressobj(settings.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, -zlib.MAX_WBITS)
+        self._crc = 0
+        self._size = 0
+
+    def _start(self):
+        header, self._header = self._header, b''
+        return header
+
+    def process(self, chunk, sync=False):
+        self._crc = zlib.crc32(chunk, self._crc)
+        self._size += len(chunk)
+        data = self._start() + self._deflate.compress(chunk)
+        return data + self._deflate.flush(zlib.Z_SYNC_FLUSH) if sync else data
+
+    def finish(self):
+        return (
+            self._start() + self._deflate.flush()
+            + struct.pack('<II', self._crc & 0xffffffff, self._size & 0xffffffff)
+        )
+
+
+def compress(encoding, data):
+    if encoding == 'br':
+        return brotli.compress(data, quality=settings.COMPRESSION_BROTLI_QUALITY)
+    compressor = GzipCompressor()
+    return compressor.process(data) + compressor.finish()
+
+
+def _stream_compressor(encoding):
+    """(チャンクを圧縮して flush する関数, 終端を返す関数)"""
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=settings.COMPRESSION_BROTLI_QUALITY)
+        return (lambda chunk: compressor.process(chunk) + compressor.flush()), compressor.finish
+    compressor = GzipCompressor()
+    return (lambda chunk: compressor.process(chunk, sync=True)), compressor.finish
+
+
+def compress_stream(encoding, chunks):
+    step, finish = _stream_compressor(encoding)
+    for chunk in chunks:
+        data = step(chunk)
+        if data:
+            yield data
+    yield finish()
+
+
+async def acompress_stream(encoding, chunks):
+    step, finish = _stream_compressor(encoding)
+    async for chunk in chunks:
+        data = step(chunk)
+        if data:
+            yield data
+    yield finish()
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    def process_response(self, request, response):
+        if not response.streaming and len(response.content) < settings.COMPRESSION_MIN_SIZE:
+            return response
+        if response.has_header('Content-Encoding'):
+            return response
+        if not response.get('Content-Type', '').startswith(COMPRESSIBLE_TYPES):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encodings = ENCODINGS if breach_safe(request, response) else ('gzip',)
+        encoding = negotiate(request.META.get('HTTP_ACCEPT_ENCODING', ''), encodings)
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = acompress_stream(encoding, response.streaming_content)
+            else:
+                response.streaming_content = compress_stream(encoding, response.streaming_content)
+            # 圧縮後の長さは分からない
+            del response.headers['Content-Length']
+        else:
+            cached = getattr(response, 'cache_key', None) is not None
+            compressed = response_cache.get_variant(response, encoding) if cached else None
+            if compressed is None:
+                compressed = compress(encoding, response.content)
+                if cached:
+                    response_cache.set_variant(response, encoding, compressed)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers['Content-Length'] = str(len(compressed))
+
+        # 本文が変わるので強い ETag は弱い ETag にする（GZipMiddleware と同じ）
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = encoding
+        return response
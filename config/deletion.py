@@ -0,0 +1,66 @@
+"""
+関連行の多いオブジェクト（ユーザー・作品など）の段階的な削除。
+
+Model.delete() は Collector が関連行をすべてメモリに読み込み、1行ずつシグナルを送ってから消すため、
+レビューや観劇記録の多いユーザー・人気作品では時間もメモリも行数に比例する。
+ここでは逆参照（ForeignKey の on_delete）をたどり、参照している側の行から順に
+id を DELETION_BATCH_SIZE 件ずつ取り出して DELETE / UPDATE ... SET NULL を発行する。
+1バッチごとにコミットするので、途中で止まっても同じ呼び出しをやり直せば続きから消せる。
+
+行ごとの post_delete は送らない。集計やキャッシュの後始末は、各バッチを消す直前に
+同じトランザクションで送る pre_batch_delete（sender=モデル, ids=削除する id のリスト）で行う。
+
+  deletion.purge(User.objects.filter(pk=user_id))
+"""
+from django.conf import settings
+from django.db import models, router, transaction
+from django.dispatch import Signal
+
+pre_batch_delete = Signal()
+
+
+def _reverse_relations(model):
+    """model を参照する ForeignKey / OneToOneField（related_name='+' や M2M の中間テーブルも含む）"""
+    return [
+        f for f in model._meta.get_fields(include_hidden=True)
+        if f.auto_created and not f.concrete and (f.one_to_many or f.one_to_one)
+    ]
+
+
+def _set_null(queryset, field, batch_size):
+    while True:
+        ids = list(queryset.values_list('pk', flat=True)[:batch_size])
+        if not ids:
+            return
+        queryset.model._base_manager.filter(pk__in=ids).update(**{field.name: None})
+
+
+def _delete_batch(model, ids, batch_size):
+    for rel in _reverse_relations(model):
+        field = rel.field
+        children = rel.related_model._base_manager.filter(**{f'{field.name}__in': ids}).order_by()
+        on_delete = field.remote_field.on_delete
+        if on_delete is models.CASCADE:
+            purge(children, batch_size)
+        elif on_delete is models.SET_NULL:
+            _set_null(children, field, batch_size)
+        elif on_delete is not models.DO_NOTHING:
+            raise NotImplementedError(f'{field} の on_delete には対応していません')
+    with transaction.atomic():
+        pre_batch_delete.send(sender=model, ids=ids)
+        # 子の行は消してあるので Collector を通さずに DELETE ... WHERE id IN (...) だけ発行する
+        model._base_manager.filter(pk__in=ids)._raw_delete(router.db_for_write(model))
+
+
+def purge(queryset, batch_size=None):
+    """queryset の行を参照している行ごと、子から順にバッチで削除し、queryset の削除件数を返す"""
+    batch_size = batch_size or settings.DELETION_BATCH_SIZE
+    # 並び替えはせず、見つかった順に消していく（消した行は次の取り出しに出てこない）
+    queryset = queryset.order_by()
+    deleted = 0
+    while True:
+        ids = list(queryset.values_list('pk', flat=True)[:batch_size])
+        if not ids:
+            return deleted
+        _delete_batch(queryset.model, ids, batch_size)
+        deleted += len(ids)
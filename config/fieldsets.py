@@ -0,0 +1,206 @@
+"""
+?fields= / ?omit= による出力フィールドの絞り込み（スパースフィールドセット）。
+
+  /api/shops/?fields=id,name,slug,image_src,coupon_text
+  /api/performances/?omit=casts,note
+  /api/reviews/?expand=body
+
+
+出力から外すだけでなく、残ったフィールドが読むモデルのパスから
+select_related / prefetch_related / .only() の列を組み立て直し、クエリ自体を小さくする。
+
+各フィールドが読むパスは
+- 通常のモデルフィールド・'a.b' 形式の source・PrimaryKeyRelatedField → 自動で求める
+- SerializerMethodField・ネストした Serializer・StringRelatedField
+  → Serializer の Meta.field_paths に 'user__display_name' 形式で書く
+  （'_like_count' のような '_' 始まりは annotate。付けるかどうかは ViewSet 側で wants() を見て決める）
+パスが分からないフィールドが残る場合は queryset は絞り込まない（出力のみ絞る）。
+
+ViewSet の expandable_fields に挙げたフィールド（長い本文など）は retrieve 以外では出力せず、
+?expand= か ?fields= で指定したときだけ出す。
+
+AsyncReadView（config/async_views.py）は serialize() で ?fields= / ?omit= を同じように解釈する
+（出力のみ絞る）。
+"""
+from django.db.models import Prefetch
+from rest_framework import serializers
+from rest_framework.relations import PrimaryKeyRelatedField
+
+SPARSE_ACTIONS = ('list', 'retrieve')
+
+
+def split_path(model, path):
+    """
+    'a__b__c' 形式のパスを (列, select_related で辿る関連, prefetch で辿る関連) に分ける。
+    列は逆参照・多対多の手前まで（その先は prefetch で取る）。
+    """
+    if path.startswith('_'):
+        return path, [], None
+    parts = path.split('__')
+    opts = model._meta
+    relations = []
+    for i, part in enumerate(parts):
+        field = opts.get_field(part)
+        if field.one_to_many or field.many_to_many:
+            prefetch = [parts[i]]
+            for rest in parts[i + 1:]:
+                related = field.related_model._meta.get_field(rest)
+                if not related.is_relation:
+                    break
+                prefetch.append(rest)
+                field = related
+            return '__'.join(parts[:i]), relations, '__'.join(parts[:i] + prefetch)
+        if field.is_relation and i < len(parts) - 1:
+            relations.append('__'.join(parts[:i + 1]))
+            opts = field.related_model._meta
+    return path, relations, None
+
+
+def field_paths(serializer):
+    """Serializer のフィールド名 → 読むモデルのパス一覧（分からないものは None）"""
+    declared = getattr(serializer.Meta, 'field_paths', {})
+    paths = {}
+    for name, field in serializer.fields.items():
+        if name in declared:
+            paths[name] = declared[name]
+        elif isinstance(field, PrimaryKeyRelatedField) or not isinstance(
+            field, (serializers.SerializerMethodField, serializers.BaseSerializer, serializers.RelatedField),
+        ):
+            paths[name] = ['__'.join(field.source_attrs)] if field.source_attrs else None
+        else:
+            paths[name] = None
+    return paths
+
+
+def _overlaps(a, b):
+    return a == b or a.startswith(b + '__') or b.startswith(a + '__')
+
+
+def _select_leaves(select, prefix=''):
+    for name, children in select.items():
+        path = prefix + name
+        if children:
+            yield from _select_leaves(children, path + '__')
+        else:
+            yield path
+
+
+def prune_queryset(queryset, paths):
+    """paths が読む分だけ select_related / prefetch_related / 列を残す"""
+    model = queryset.model
+    columns, relations, prefetches = set(), set(), set()
+    for path in paths:
+        column, traversed, prefetch = split_path(model, path)
+        if column and not column.startswith('_'):
+            columns.add(column)
+        relations.update(traversed)
+        if prefetch:
+            prefetches.add(prefetch)
+
+    select = queryset.query.select_related
+    if select is True:
+        # select_related() の全関連指定は対象外
+        return queryset
+    kept = set()
+    if select:
+        leaves = list(_select_leaves(select))
+        kept = {r for r in relations if any(_overlaps(leaf, r) and len(leaf) >= len(r) for leaf in leaves)}
+        queryset = queryset.select_related(None)
+        if kept:
+            queryset = queryset.select_related(*sorted(kept))
+
+    lookups = queryset._prefetch_related_lookups
+    if lookups:
+        queryset = queryset.prefetch_related(None).prefetch_related(*[
+            lookup for lookup in lookups
+            if any(_overlaps(lookup.prefetch_through if isinstance(lookup, Prefetch) else lookup, p)
+                   for p in prefetches)
+        ])
+
+    # select_related しない関連の先の列は外部キー列だけ読む
+    only = {model._meta.pk.name}
+    for column in columns:
+        parts = column.split('__')
+        end = 1
+        while end < len(parts) and '__'.join(parts[:end]) in kept:
+            end += 1
+        only.add('__'.join(parts[:end]))
+    return queryset.only(*only)
+
+
+def _split(value):
+    return [f.strip() for f in value.split(',') if f.strip()]
+
+
+def parse_fields(params, available, expandable=(), collapse=False):
+    """
+    ?fields= / ?omit= / ?expand= から出力するフィールド名の集合を返す（指定がなければ None）。
+    collapse=True なら expandable のうち ?expand= / ?fields= にないものを外す。
+    """
+    fields = _split(params.get('fields', ''))
+    omit = _split(params.get('omit', ''))
+    expand = _split(params.get('expand', ''))
+    unknown = [f for f in expand if f not in expandable]
+    if unknown:
+        raise serializers.ValidationError({'expand': f'展開できないフィールドです: {", ".join(unknown)}'})
+    collapsed = set()
+    if collapse:
+        collapsed = set(expandable) - set(expand) - set(fields)
+    if not fields and not omit and not collapsed:
+        return None
+    available = list(available)
+    unknown = [f for f in fields + omit if f not in available]
+    if unknown:
+        raise serializers.ValidationError({'fields': f'不明なフィールドです: {", ".join(unknown)}'})
+    return {f for f in available if (not fields or f in fields) and f not in omit and f not in collapsed}
+
+
+def restrict_fields(serializer, fields):
+    """serializer（many=True なら child）から fields 以外を外す"""
+    if fields is None:
+        return serializer
+    target = serializer.child if isinstance(serializer, serializers.ListSerializer) else serializer
+    for name in list(target.fields):
+        if name not in fields:
+            target.fields.pop(name)
+    return serializer
+
+
+class SparseFieldsMixin:
+    """list / retrieve で ?fields= / ?omit= / ?expand= を受け付ける ViewSet 用 Mixin"""
+    sparse_actions = SPARSE_ACTIONS
+    # retrieve 以外では ?expand= / ?fields= で指定したときだけ出力するフィールド
+    expandable_fields = ()
+
+    def get_requested_fields(self):
+        """出力するフィールド名の集合（指定がなければ None）"""
+        if not hasattr(self, '_requested_fields'):
+            self._requested_fields = None
+            if self.request is not None and getattr(self, 'action', None) in self.sparse_actions:
+                self._requested_fields = self._parse_fields()
+        return self._requested_fields
+
+    def _parse_fields(self):
+        return parse_fields(
+            self.request.query_params, self.get_serializer_class()().fields,
+            expandable=self.expandable_fields, collapse=self.action != 'retrieve',
+        )
+
+    def wants(self, *names):
+        """いずれかのフィールドを出力するか（annotate 等を付けるかの判定用）"""
+        fields = self.get_requested_fields()
+        return fields is None or any(name in fields for name in names)
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        return restrict_fields(serializer, self.get_requested_fields())
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        fields = self.get_requested_fields()
+        if fields is None:
+            return queryset
+        paths = field_paths(self.get_serializer_class()())
+        if any(paths[name] is None for name in fields):
+            return queryset
+        return prune_queryset(queryset, [p for name in fields for p in paths[name]])
@@ -0,0 +1,132 @@
+"""
+一覧エンドポイント用の読み取り専用「プロジェクション」。
+
+Serializer と同じ出力を、モデルインスタンスを作らずに queryset.values() の行から作る。
+Serializer のフィールド定義から列名と変換関数を一度だけ組み立て（クラスごとにキャッシュ）、
+各行は「列を読んで to_representation を呼ぶ」だけで dict に変換する。
+
+- 通常のモデルフィールド・'a.b.c' 形式の source → 'a__b__c' 列をそのまま変換
+- PrimaryKeyRelatedField → '<source>_id' 列
+- SerializerMethodField・StringRelatedField・ネストした Serializer
+  → プロジェクション側の get_<フィールド名>(row) で実装する
+  （読む列は Serializer の Meta.field_paths から求める。config/fieldsets.py 参照）
+- prefetch 相当の関連データは prepare(rows) でまとめて取得する
+
+settings.API_PROJECTION が False のときは通常の Serializer で処理する。
+"""
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework import serializers
+from rest_framework.relations import PrimaryKeyRelatedField
+from rest_framework.response import Response
+
+from .fieldsets import split_path
+
+
+class Projection:
+    serializer_class = None
+    # 出力フィールド以外に必要な列（子要素を親に振り分ける外部キー等）
+    extra_columns = []
+
+    _compiled = None
+
+    def __init__(self, context=None, fields=None):
+        self.context = context or {}
+        self.request = self.context.get('request')
+        # 出力するフィールド名の集合（None なら全フィールド。?fields= / ?omit= 用）
+        self.fields = fields
+
+    def wants(self, *names):
+        return self.fields is None or any(name in self.fields for name in names)
+
+    @classmethod
+    def _compile(cls):
+        """(フィールド名, 列, 変換関数, 読む列の一覧) のリスト。get_<name> で計算するものは列が None"""
+        if cls.__dict__.get('_compiled') is None:
+            serializer = cls.serializer_class()
+            model = serializer.Meta.model
+            declared = getattr(serializer.Meta, 'field_paths', {})
+            compiled = []
+            for field in serializer.fields.values():
+                if field.write_only:
+                    continue
+                name = field.field_name
+                if hasattr(cls, f'get_{name}'):
+                    # Meta.field_paths の逆参照より手前の列（'_' 始まりは annotate）
+                    columns = [split_path(model, path)[0] for path in declared.get(name, [])]
+                    compiled.append((name, None, None, [c for c in columns if c]))
+                    continue
+                if isinstance(field, (serializers.SerializerMethodField, serializers.BaseSerializer,
+                                      serializers.RelatedField)) and not isinstance(field, PrimaryKeyRelatedField):
+                    raise ImproperlyConfigured(f'{cls.__name__} に get_{name} が必要です')
+                column = '__'.join(field.source_attrs)
+                if isinstance(field, PrimaryKeyRelatedField):
+                    column += '_id'
+                    convert = None
+                else:
+                    convert = field.to_representation
+                compiled.append((name, column, convert, [column]))
+            cls._compiled = compiled
+        return cls._compiled
+
+    def _fields(self):
+        return [compiled for compiled in self._compile() if self.wants(compiled[0])]
+
+    def queryset(self, qs):
+        annotations = qs.query.annotations
+        columns = ['id']
+        for *_, needed in self._fields():
+            for column in needed:
+                if column not in columns and (not column.startswith('_') or column in annotations):
+                    columns.append(column)
+        columns += [c for c in self.extra_columns if c not in columns]
+        # 集計 annotate 付きの values() では Meta.ordering が無視されるので明示する
+        if not qs.query.order_by and qs.model._meta.ordering:
+            qs = qs.order_by(*qs.model._meta.ordering)
+        return qs.prefetch_related(None).values(*columns)
+
+    def prepare(self, rows):
+        """関連データをまとめて取得する（サブクラスで実装。wants() で不要なものは省く）"""
+
+    def represent(self, rows):
+        rows = list(rows)
+        self.prepare(rows)
+        accessors = [
+            (name, getattr(self, f'get_{name}')) if column is None
+            else (name, self._plain(column, convert))
+            for name, column, convert, _ in self._fields()
+        ]
+        return [{name: get(row) for name, get in accessors} for row in rows]
+
+    @staticmethod
+    def _plain(column, convert):
+        if convert is None:
+            return lambda row: row[column]
+
+        def get(row):
+            value = row[column]
+            return None if value is None else convert(value)
+        return get
+
+    def file_url(self, field, name):
+        """FieldFile.url 相当（request があれば絶対URL）"""
+        url = field.storage.url(name)
+        return self.request.build_absolute_uri(url) if self.request else url
+
+
+class ProjectionListMixin:
+    """list() をプロジェクションで処理する ViewSet 用 Mixin"""
+    projection_class = None
+
+    def list(self, request, *args, **kwargs):
+        if self.projection_class is None or not settings.API_PROJECTION:
+            return super().list(request, *args, **kwargs)
+        get_fields = getattr(self, 'get_requested_fields', None)
+        projection = self.projection_class(
+            context=self.get_serializer_context(), fields=get_fields() if get_fields else None,
+        )
+        queryset = projection.queryset(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(projection.represent(page))
+        return Response(projection.represent(queryset))
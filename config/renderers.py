@@ -0,0 +1,52 @@
+"""
+高速 JSON レンダラー / パーサー（settings.FAST_JSON で有効化）。
+
+orjson があればそれで encode/decode し、なければ DRF 標準の JSONRenderer /
+JSONParser（標準ライブラリ json）にそのままフォールバックする。
+datetime・Decimal・lazy 文字列などは DRF の JSONEncoder.default に渡すので、
+出力は DRF 標準と同じバイト列になる。
+"""
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson 未インストール環境
+    orjson = None
+
+if orjson is not None:
+    # datetime は DRF 側の書式（UTC は 'Z'）に合わせるため default へ回す
+    ORJSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+    _default = JSONEncoder().default
+
+
+class FastJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        # インデント指定（ブラウザブルAPI等）や非コンパクト設定は標準実装で処理
+        if (
+            orjson is None or data is None or not self.compact or not self.strict or self.ensure_ascii
+            or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        ret = orjson.dumps(data, default=_default, option=ORJSON_OPTIONS)
+        # DRF と同じく U+2028 / U+2029 はエスケープ（JavaScript の文字列リテラル互換）
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
+
+
+class FastJSONParser(JSONParser):
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        if orjson is None or encoding.lower().replace('-', '') != 'utf8' or not self.strict:
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
@@ -0,0 +1,58 @@
+"""
+読み取り系エンドポイント用の簡易レスポンスキャッシュ。
+
+レンダリング済みのレスポンス（ステータス・Content-Type・本文）をキーごとに保存する。
+保存のたびにトークンを振り、圧縮ミドルウェア（config/compression.py）は
+「キー + トークン + エンコーディング」で圧縮済みのバイト列も保存するので、
+キャッシュヒット時は再圧縮しない（本文が作り直されれば別トークンになり古い圧縮結果は使われない）。
+"""
+import hashlib
+import uuid
+
+from django.core.cache import cache
+from django.http import HttpResponse
+
+
+def cache_key(request, prefix='response'):
+    """URL（ホスト・クエリ文字列込み）単位のキー"""
+    return f'{prefix}:{hashlib.md5(request.build_absolute_uri().encode()).hexdigest()}'
+
+
+def _build(key, entry):
+    token, timeout, status, content_type, body = entry
+    response = HttpResponse(body, status=status, content_type=content_type)
+    response.cache_key, response.cache_timeout = f'{key}:{token}', timeout
+    return response
+
+
+def _entry(key, response, timeout):
+    token = uuid.uuid4().hex
+    response.cache_key, response.cache_timeout = f'{key}:{token}', timeout
+    return token, timeout, response.status_code, response['Content-Type'], response.content
+
+
+def get(key):
+    entry = cache.get(key)
+    return _build(key, entry) if entry else None
+
+
+def set(key, response, timeout):
+    cache.set(key, _entry(key, response, timeout), timeout)
+
+
+async def aget(key):
+    entry = await cache.aget(key)
+    return _build(key, entry) if entry else None
+
+
+async def aset(key, response, timeout):
+    await cache.aset(key, _entry(key, response, timeout), timeout)
+
+
+def get_variant(response, encoding):
+    """キャッシュ済みレスポンスの圧縮済みバイト列"""
+    return cache.get(f'{response.cache_key}:{encoding}')
+
+
+def set_variant(response, encoding, data):
+    cache.set(f'{response.cache_key}:{encoding}', data, response.cache_timeout)
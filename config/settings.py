@@ -32,11 +32,13 @@ INSTALLED_APPS = [
     'works',
     'reviews',
     'shops',
+    'jobs',
 ]
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
+    'config.compression.CompressionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -66,9 +68,12 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'config.wsgi.application'
 
+# 接続は CONN_MAX_AGE 秒まで使い回し、再利用の前に CONN_HEALTH_CHECKS で疎通確認する
 DATABASES = {
     'default': dj_database_url.parse(
-        config('DATABASE_URL', default=f'sqlite:///{BASE_DIR / "db.sqlite3"}')
+        config('DATABASE_URL', default=f'sqlite:///{BASE_DIR / "db.sqlite3"}'),
+        conn_max_age=config('DB_CONN_MAX_AGE', default=600, cast=int),
+        conn_health_checks=True,
     )
 }
 
@@ -92,6 +97,28 @@ MEDIA_ROOT = BASE_DIR / 'media'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# OGP画像（works/og_cards.py）
+OG_CACHE_DIR = config('OG_CACHE_DIR', default=str(BASE_DIR / 'og_cache'))
+OG_FONT_PATH = config('OG_FONT_PATH', default='')
+OG_CACHE_MAX_AGE = config('OG_CACHE_MAX_AGE', default=60 * 60 * 24 * 7, cast=int)
+
+# バックグラウンドジョブ（jobs/queue.py / run_worker）
+JOB_WORKERS = config('JOB_WORKERS', default=2, cast=int)
+JOB_POLL_INTERVAL = config('JOB_POLL_INTERVAL', default=5, cast=float)
+JOB_MAX_ATTEMPTS = config('JOB_MAX_ATTEMPTS', default=5, cast=int)
+# 再実行までの待ち: JOB_RETRY_BASE_DELAY * 2^(失敗回数-1) 秒（上限 JOB_RETRY_MAX_DELAY）
+JOB_RETRY_BASE_DELAY = config('JOB_RETRY_BASE_DELAY', default=30, cast=int)
+JOB_RETRY_MAX_DELAY = config('JOB_RETRY_MAX_DELAY', default=60 * 60, cast=int)
+# 実行中のジョブの heartbeat_at を更新する間隔（秒）
+JOB_HEARTBEAT_INTERVAL = config('JOB_HEARTBEAT_INTERVAL', default=60, cast=int)
+# これ以上 heartbeat_at が更新されない running のジョブはワーカーが落ちたとみなして待機中に戻す
+JOB_TIMEOUT = config('JOB_TIMEOUT', default=60 * 30, cast=int)
+JOB_RETENTION_DAYS = config('JOB_RETENTION_DAYS', default=7, cast=int)
+
+# クリック・クーポン利用ログの保持日数とアーカイブ先（shops/retention.py / archive_shop_logs）
+SHOP_LOG_RETENTION_DAYS = config('SHOP_LOG_RETENTION_DAYS', default=180, cast=int)
+SHOP_LOG_ARCHIVE_DIR = config('SHOP_LOG_ARCHIVE_DIR', default=str(BASE_DIR / 'log_archive'))
+
 # Cloudinary
 CLOUDINARY_STORAGE = {
     'CLOUD_NAME': config('CLOUDINARY_CLOUD_NAME', default=''),
@@ -116,6 +143,49 @@ REST_FRAMEWORK = {
     'PAGE_SIZE': 20,
 }
 
+# 一覧APIを values() ベースのプロジェクションで処理（config/projection.py）
+API_PROJECTION = config('API_PROJECTION', default=True, cast=bool)
+
+# orjson による高速 JSON レンダラー / パーサー（未インストール時は標準 json で動作）
+FAST_JSON = config('FAST_JSON', default=True, cast=bool)
+if FAST_JSON:
+    REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'] = [
+        'config.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ]
+    REST_FRAMEWORK['DEFAULT_PARSER_CLASSES'] = [
+        'config.renderers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ]
+
+# 管理画面（config/admin_mixins.py）: これ以上の行数のテーブルは一覧の件数に推定値を使う（Postgres のみ）
+ADMIN_ESTIMATED_COUNT_THRESHOLD = config('ADMIN_ESTIMATED_COUNT_THRESHOLD', default=100000, cast=int)
+
+# レスポンス圧縮（config/compression.py）。brotli 未インストール時は gzip のみ
+COMPRESSION_MIN_SIZE = config('COMPRESSION_MIN_SIZE', default=1024, cast=int)
+COMPRESSION_GZIP_LEVEL = config('COMPRESSION_GZIP_LEVEL', default=6, cast=int)
+COMPRESSION_BROTLI_QUALITY = config('COMPRESSION_BROTLI_QUALITY', default=5, cast=int)
+# BREACH 対策: gzip のヘッダーに 0〜この値未満のランダム長の詰め物を入れる（GZipMiddleware と同じ 100）
+COMPRESSION_GZIP_MAX_RANDOM_BYTES = config('COMPRESSION_GZIP_MAX_RANDOM_BYTES', default=100, cast=int)
+
+# 作品ページ集約API（works/work_page.py）のキャッシュ秒数。内容の変更はバージョン更新で即時反映
+WORK_PAGE_CACHE_TIMEOUT = config('WORK_PAGE_CACHE_TIMEOUT', default=60 * 10, cast=int)
+
+# 人物の出演作API（works/filmography.py）: 1ページの件数とキャッシュ秒数（内容の変更はバージョン更新で即時反映）
+FILMOGRAPHY_PAGE_SIZE = config('FILMOGRAPHY_PAGE_SIZE', default=20, cast=int)
+FILMOGRAPHY_CACHE_TIMEOUT = config('FILMOGRAPHY_CACHE_TIMEOUT', default=60 * 10, cast=int)
+
+# バッチAPI（config/batch.py）: 1回で実行できるサブリクエスト数と並列実行のスレッド数
+BATCH_MAX_REQUESTS = config('BATCH_MAX_REQUESTS', default=10, cast=int)
+BATCH_MAX_WORKERS = config('BATCH_MAX_WORKERS', default=4, cast=int)
+
+# 公開読み取りAPIのレスポンスキャッシュ秒数（config/response_cache.py。0 で無効）
+RESPONSE_CACHE_TIMEOUT = config('RESPONSE_CACHE_TIMEOUT', default=60, cast=int)
+
+# ユーザー・作品の削除（config/deletion.py）で1回に消す行数
+DELETION_BATCH_SIZE = config('DELETION_BATCH_SIZE', default=1000, cast=int)
+
 # CORS
 CORS_ALLOWED_ORIGINS = [
     'http://localhost:5173',
@@ -149,6 +219,9 @@ CSRF_TRUSTED_ORIGINS = [
     'ionic://localhost',
 ]
 
+# Timeline: フォロワー数がこれを超えるユーザーのレビューは書き込み時に展開せず、読み込み時に取得
+TIMELINE_FANOUT_LIMIT = config('TIMELINE_FANOUT_LIMIT', default=1000, cast=int)
+
 # Knox (Mobile token auth)
 REST_KNOX = {
     'TOKEN_TTL': None,  # トークン無期限（明示的ログアウトで失効）
@@ -0,0 +1,55 @@
+"""
+一意制約のある行の「なければ作る」を1文で行う。
+
+  created = upsert.insert_ignore(Like(user=user, review=review))
+
+get_or_create() の SELECT → INSERT は往復が2回で、同時に2回押されると両方が INSERT して
+片方が IntegrityError になる。ここでは INSERT ... ON CONFLICT DO NOTHING RETURNING id
+（SQLite では INSERT OR IGNORE ... RETURNING。3.35 以降）を1回だけ発行し、
+行が返れば作成、返らなければ既存とみなす。
+
+シグナルは Model.save() と同じ順に送るので、集計・キャッシュの更新（各アプリの signals.py）はそのまま動く。
+- pre_save は INSERT の前に毎回送る（一意制約に当たって何も作られない場合も含む）
+- post_save(created=True) は行を作成したときだけ送る
+このため pre_save の受け手は instance の値を埋める以外の副作用（他テーブルの更新・キャッシュの無効化など）を
+持たせないこと。そうした処理は post_save 側に置く。
+"""
+from django.db import connections, router, transaction
+from django.db.models.constants import OnConflict
+from django.db.models.signals import post_save, pre_save
+from django.db.models.sql import InsertQuery
+
+
+def insert_ignore(instance):
+    """instance を INSERT し、一意制約に当たれば何もしない。作成したら pk を埋めて True を返す
+
+    pre_save は結果にかかわらず送られる（モジュールの docstring 参照）。
+    """
+    model = type(instance)
+    opts = model._meta
+    using = router.db_for_write(model, instance=instance)
+    connection = connections[using]
+    if not connection.features.can_return_columns_from_insert:
+        raise NotImplementedError(f'{connection.vendor} は INSERT ... RETURNING に対応していません')
+    # Model.save() と同じく、pk 未設定なら自動採番の列は入れない
+    fields = [
+        f for f in opts.local_concrete_fields if f is not opts.auto_field or instance.pk is not None
+    ]
+
+    with transaction.atomic(using=using, savepoint=False):
+        pre_save.send(sender=model, instance=instance, raw=False, using=using, update_fields=None)
+        query = InsertQuery(model, on_conflict=OnConflict.IGNORE)
+        query.insert_values(fields, [instance])
+        compiler = query.get_compiler(using=using)
+        compiler.returning_fields = [opts.pk]
+        with connection.cursor() as cursor:
+            for sql, params in compiler.as_sql():
+                cursor.execute(sql, params)
+            row = cursor.fetchone()
+        if row is None:
+            return False
+        setattr(instance, opts.pk.attname, row[0])
+        instance._state.adding = False
+        instance._state.db = using
+        post_save.send(sender=model, instance=instance, created=True, update_fields=None, raw=False, using=using)
+    return True
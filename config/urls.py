@@ -3,8 +3,11 @@ from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import include, path
 
+from .batch import BatchView
+
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('api/batch/', BatchView.as_view(), name='batch'),
     path('api/', include('accounts.urls')),
     path('api/mobile/', include('accounts.mobile_urls')),
     path('api/', include('theaters.urls')),
@@ -0,0 +1,22 @@
+from django.contrib import admin
+
+from config.admin_mixins import LargeTableAdminMixin
+from .models import Job, JobMetric, ScheduleState
+
+
+@admin.register(Job)
+class JobAdmin(LargeTableAdminMixin, admin.ModelAdmin):
+    list_display = ['name', 'status', 'priority', 'run_at', 'attempts', 'duration_ms', 'locked_by', 'created_at']
+    list_filter = ['status', 'name']
+    search_fields = ['name']
+    readonly_fields = ['started_at', 'heartbeat_at', 'finished_at', 'duration_ms', 'locked_by', 'last_error']
+
+
+@admin.register(JobMetric)
+class JobMetricAdmin(admin.ModelAdmin):
+    list_display = ['name', 'runs', 'failures', 'average_ms', 'max_ms', 'last_run_at']
+
+
+@admin.register(ScheduleState)
+class ScheduleStateAdmin(admin.ModelAdmin):
+    list_display = ['name', 'next_run_at']
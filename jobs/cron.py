@@ -0,0 +1,77 @@
+"""
+cron 形式（分 時 日 月 曜日）のスケジュール。
+
+各フィールドは *、数値、カンマ区切り、範囲（1-5）、間隔（*/15, 0-30/10）に対応。
+曜日は 0 または 7 が日曜。日と曜日の両方を指定した場合は cron と同じくどちらかに一致すればよい。
+時刻はローカルタイム（TIME_ZONE）で解釈する。
+"""
+import datetime
+
+from django.utils import timezone
+
+FIELDS = [
+    ('minute', 0, 59),
+    ('hour', 0, 23),
+    ('day', 1, 31),
+    ('month', 1, 12),
+    ('weekday', 0, 7),
+]
+
+
+def _parse_field(text, low, high):
+    values = set()
+    for part in text.split(','):
+        expr, _, step = part.partition('/')
+        step = int(step) if step else 1
+        if expr == '*':
+            start, end = low, high
+        elif '-' in expr:
+            start, end = (int(v) for v in expr.split('-', 1))
+        else:
+            start = end = int(expr)
+            if step != 1:
+                end = high
+        if not (low <= start <= end <= high) or step < 1:
+            raise ValueError(f'範囲外の値です: {part}')
+        values.update(range(start, end + 1, step))
+    return values
+
+
+class Cron:
+    def __init__(self, expression):
+        parts = expression.split()
+        if len(parts) != len(FIELDS):
+            raise ValueError(f'cron 形式は「分 時 日 月 曜日」の5項目です: {expression}')
+        self.expression = expression
+        for (name, low, high), text in zip(FIELDS, parts):
+            setattr(self, name, _parse_field(text, low, high))
+        if 7 in self.weekday:
+            self.weekday = (self.weekday - {7}) | {0}
+        self.any_day = parts[2] == '*'
+        self.any_weekday = parts[4] == '*'
+
+    def __repr__(self):
+        return f'Cron({self.expression!r})'
+
+    def _day_matches(self, date):
+        day_ok = date.day in self.day
+        weekday_ok = (date.isoweekday() % 7) in self.weekday
+        if self.any_day or self.any_weekday:
+            return day_ok and weekday_ok
+        return day_ok or weekday_ok
+
+    def next_after(self, value):
+        """value より後で最初に一致する時刻（aware datetime）"""
+        local = timezone.localtime(value).replace(second=0, microsecond=0) + datetime.timedelta(minutes=1)
+        date = local.date()
+        for _ in range(366 * 5):
+            if date.month in self.month and self._day_matches(date):
+                start_time = local.time() if date == local.date() else datetime.time(0, 0)
+                for hour in sorted(h for h in self.hour if h >= start_time.hour):
+                    for minute in sorted(self.minute):
+                        if hour == start_time.hour and minute < start_time.minute:
+                            continue
+                        naive = datetime.datetime.combine(date, datetime.time(hour, minute))
+                        return timezone.make_aware(naive)
+            date += datetime.timedelta(days=1)
+        raise ValueError(f'一致する時刻がありません: {self.expression}')
@@ -0,0 +1,70 @@
+import logging
+import os
+import signal
+import socket
+import threading
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connections
+
+from jobs import queue
+
+logger = logging.getLogger('jobs')
+
+
+class Command(BaseCommand):
+    help = 'バックグラウンドジョブを実行するワーカー（SIGINT / SIGTERM で実行中のジョブを終えてから停止）'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=settings.JOB_WORKERS, help='並列に実行するスレッド数')
+        parser.add_argument('--poll-interval', type=float, default=settings.JOB_POLL_INTERVAL,
+                            help='ジョブがないときに待つ秒数')
+        parser.add_argument('--once', action='store_true', help='実行できるジョブがなくなったら終了する')
+        parser.add_argument('--no-schedule', action='store_true', help='定期ジョブの登録を行わない')
+
+    def handle(self, *args, **options):
+        self.stop = threading.Event()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(sig, lambda *_: self.stop.set())
+
+        worker_id = f'{socket.gethostname()}:{os.getpid()}'
+        counts = [0] * options['workers']
+        threads = [
+            threading.Thread(
+                target=self.loop, name=f'job-worker-{i}',
+                args=(f'{worker_id}:{i}', i, counts, options),
+            )
+            for i in range(options['workers'])
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            # join(timeout) にしてメインスレッドでシグナルを受け取れるようにする
+            while thread.is_alive():
+                thread.join(timeout=1)
+        self.stdout.write(self.style.SUCCESS(f'完了: 実行={sum(counts)}'))
+
+    def loop(self, worker_id, index, counts, options):
+        # 定期ジョブの登録と止まったジョブの回収は1スレッドだけが行う
+        scheduler = index == 0 and not options['no_schedule']
+        try:
+            while not self.stop.is_set():
+                close_old_connections()
+                try:
+                    if scheduler:
+                        queue.enqueue_due_schedules()
+                        queue.requeue_stale()
+                    jobs = queue.claim(worker_id)
+                    for job in jobs:
+                        queue.run(job)
+                        counts[index] += 1
+                except Exception:
+                    logger.exception('job worker error: %s', worker_id)
+                    jobs = []
+                if not jobs:
+                    if options['once']:
+                        return
+                    self.stop.wait(options['poll_interval'])
+        finally:
+            connections.close_all()
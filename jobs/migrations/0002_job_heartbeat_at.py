@@ -0,0 +1,24 @@
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill(apps, schema_editor):
+    # 実行中のジョブは started_at から止まったかどうかを判定する
+    Job = apps.get_model('jobs', 'Job')
+    Job.objects.filter(status='running').update(heartbeat_at=F('started_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='heartbeat_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,71 @@
+from django.db import models
+from django.utils import timezone
+
+
+class Job(models.Model):
+    """バックグラウンドジョブ（jobs/queue.py の enqueue で登録し、run_worker が実行）"""
+    STATUS_QUEUED = 'queued'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, '待機中'),
+        (STATUS_RUNNING, '実行中'),
+        (STATUS_DONE, '完了'),
+        (STATUS_FAILED, '失敗'),
+    ]
+
+    name = models.CharField(max_length=100)
+    kwargs = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_QUEUED)
+    priority = models.SmallIntegerField(default=0)
+    run_at = models.DateTimeField(default=timezone.now)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=5)
+    last_error = models.TextField(blank=True, default='')
+    locked_by = models.CharField(max_length=100, blank=True, default='')
+    started_at = models.DateTimeField(null=True, blank=True)
+    # 実行中のワーカーが JOB_HEARTBEAT_INTERVAL 秒ごとに更新する（止まったジョブの判定用）
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    duration_ms = models.PositiveIntegerField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            # 取り出し（status=queued かつ run_at <= now を優先度・時刻順）用
+            models.Index(fields=['status', 'run_at'], name='job_claim_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.name} #{self.pk} ({self.status})'
+
+
+class JobMetric(models.Model):
+    """ジョブ名ごとの実行回数・失敗回数・所要時間（完了したジョブを削除しても残る）"""
+    name = models.CharField(max_length=100, unique=True)
+    runs = models.PositiveIntegerField(default=0)
+    failures = models.PositiveIntegerField(default=0)
+    total_ms = models.BigIntegerField(default=0)
+    max_ms = models.PositiveIntegerField(default=0)
+    last_run_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['name']
+
+    def __str__(self):
+        return f'{self.name}: {self.runs} runs'
+
+    @property
+    def average_ms(self):
+        return self.total_ms / self.runs if self.runs else None
+
+
+class ScheduleState(models.Model):
+    """定期実行（@task(schedule=...)）の次回実行時刻。複数ワーカーでも1回だけ登録されるよう条件付き UPDATE で進める"""
+    name = models.CharField(max_length=100, primary_key=True)
+    next_run_at = models.DateTimeField()
+
+    def __str__(self):
+        return f'{self.name} → {self.next_run_at}'
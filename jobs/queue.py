@@ -0,0 +1,219 @@
+"""
+データベースを使ったバックグラウンドジョブのキュー。
+
+  @task('reviews.rebuild_ratings', schedule='30 4 * * *')
+  def rebuild_ratings(): ...
+
+  queue.enqueue('reviews.rebuild_viewing_stats', user_ids=[1])
+
+ジョブは jobs_job テーブルに積み、manage.py run_worker が取り出して実行する。
+取り出しは Postgres では SELECT ... FOR UPDATE SKIP LOCKED（ワーカー同士が同じ行を待たない）、
+SKIP LOCKED のない SQLite では「status=queued なら running にする」条件付き UPDATE で行う。
+失敗したジョブは指数バックオフで再実行し、max_attempts 回で failed にする。
+実行中はワーカーが JOB_HEARTBEAT_INTERVAL 秒ごとに heartbeat_at を更新し、
+JOB_TIMEOUT 秒以上更新のない running のジョブ（ワーカーが落ちたもの）を待機中へ戻す。
+結果の書き込みは locked_by が自分のままの行に対する条件付き UPDATE なので、
+待機中へ戻されて別のワーカーが取ったジョブを元のワーカーが上書きすることはない。
+"""
+import logging
+import random
+import threading
+import time
+import traceback
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, connections, transaction
+from django.db.models import Case, F, PositiveIntegerField, Value, When
+from django.utils import timezone
+
+from .cron import Cron
+from .models import Job, JobMetric, ScheduleState
+
+logger = logging.getLogger('jobs')
+
+REGISTRY = {}
+SCHEDULES = {}
+
+
+def task(name, schedule=None, max_attempts=None, **schedule_kwargs):
+    """関数をジョブとして登録するデコレーター。schedule（cron 形式）を渡すと定期実行する"""
+    def decorator(func):
+        REGISTRY[name] = func
+        func.job_name = name
+        func.max_attempts = max_attempts
+        if schedule:
+            SCHEDULES[name] = (Cron(schedule), schedule_kwargs)
+        return func
+    return decorator
+
+
+def enqueue(name, *, run_at=None, priority=0, max_attempts=None, **kwargs):
+    """ジョブを登録する。トランザクション内なら、そのコミット時に見えるようになる"""
+    if name not in REGISTRY:
+        raise KeyError(f'未登録のジョブです: {name}')
+    return Job.objects.create(
+        name=name, kwargs=kwargs, priority=priority, run_at=run_at or timezone.now(),
+        max_attempts=max_attempts or REGISTRY[name].max_attempts or settings.JOB_MAX_ATTEMPTS,
+    )
+
+
+def backoff(attempts):
+    """attempts 回目の失敗後、次に実行するまでの秒数（指数 + ゆらぎ）"""
+    delay = min(settings.JOB_RETRY_MAX_DELAY, settings.JOB_RETRY_BASE_DELAY * 2 ** (attempts - 1))
+    return delay * random.uniform(0.8, 1.2)
+
+
+def claim(worker_id, limit=1):
+    """実行できるジョブを最大 limit 件取り出して running にする"""
+    now = timezone.now()
+    due = Job.objects.filter(status=Job.STATUS_QUEUED, run_at__lte=now).order_by('-priority', 'run_at', 'id')
+    claimed = {
+        'status': Job.STATUS_RUNNING, 'locked_by': worker_id,
+        'started_at': now, 'heartbeat_at': now, 'attempts': F('attempts') + 1,
+    }
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            ids = list(due.select_for_update(skip_locked=True).values_list('id', flat=True)[:limit])
+            Job.objects.filter(id__in=ids).update(**claimed)
+    else:
+        ids = []
+        for job_id in due.values_list('id', flat=True)[:limit * 5]:
+            # 他のワーカーが先に取っていれば 0 件になる
+            if Job.objects.filter(id=job_id, status=Job.STATUS_QUEUED).update(**claimed):
+                ids.append(job_id)
+                if len(ids) == limit:
+                    break
+    return list(Job.objects.filter(id__in=ids).order_by('-priority', 'run_at', 'id'))
+
+
+def _record(name, duration_ms, failed, now):
+    JobMetric.objects.bulk_create([JobMetric(name=name)], ignore_conflicts=True)
+    JobMetric.objects.filter(name=name).update(
+        runs=F('runs') + 1,
+        failures=F('failures') + int(failed),
+        total_ms=F('total_ms') + duration_ms,
+        max_ms=Case(
+            When(max_ms__lt=duration_ms, then=Value(duration_ms)),
+            default=F('max_ms'), output_field=PositiveIntegerField(),
+        ),
+        last_run_at=now,
+    )
+
+
+def _owned(job, worker_id):
+    """worker_id が実行中のままの行（requeue_stale で戻されていなければ1件）"""
+    return Job.objects.filter(pk=job.pk, status=Job.STATUS_RUNNING, locked_by=worker_id)
+
+
+@contextmanager
+def _heartbeat(job, worker_id):
+    """ブロックの実行中、別スレッドで JOB_HEARTBEAT_INTERVAL 秒ごとに heartbeat_at を更新する"""
+    done = threading.Event()
+
+    def beat():
+        try:
+            while not done.wait(settings.JOB_HEARTBEAT_INTERVAL):
+                try:
+                    if not _owned(job, worker_id).update(heartbeat_at=timezone.now()):
+                        # 待機中に戻されたか別のワーカーが取った
+                        return
+                except Exception:
+                    # 一時的なエラー（SQLite のロック待ちなど）は次の間隔でやり直す
+                    logger.exception('job heartbeat failed: %s #%s', job.name, job.pk)
+        finally:
+            connections.close_all()
+
+    thread = threading.Thread(target=beat, name=f'job-heartbeat-{job.pk}', daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        done.set()
+        thread.join()
+
+
+def run(job):
+    """取り出したジョブを実行し、結果（done / 再実行待ち / failed）と所要時間を記録する"""
+    func = REGISTRY.get(job.name)
+    worker_id = job.locked_by
+    started = time.monotonic()
+    error = ''
+    with _heartbeat(job, worker_id):
+        try:
+            if func is None:
+                raise KeyError(f'未登録のジョブです: {job.name}')
+            func(**job.kwargs)
+        except Exception:
+            error = traceback.format_exc()
+            logger.exception('job failed: %s #%s', job.name, job.pk)
+    duration_ms = int((time.monotonic() - started) * 1000)
+    now = timezone.now()
+
+    if not error:
+        job.status = Job.STATUS_DONE
+    elif job.attempts >= job.max_attempts:
+        job.status = Job.STATUS_FAILED
+    else:
+        job.status = Job.STATUS_QUEUED
+        job.run_at = now + timedelta(seconds=backoff(job.attempts))
+    job.last_error = error
+    job.locked_by = ''
+    job.finished_at = now
+    job.duration_ms = duration_ms
+    updated = _owned(job, worker_id).update(
+        status=job.status, run_at=job.run_at, last_error=error, locked_by='',
+        finished_at=now, duration_ms=duration_ms,
+    )
+    if not updated:
+        # 実行中に待機中へ戻された（別のワーカーが取ったかもしれない）ので結果は書かない
+        logger.warning('job lost its lock before finishing: %s #%s', job.name, job.pk)
+    _record(job.name, duration_ms, bool(error), now)
+    return job
+
+
+def enqueue_due_schedules(now=None):
+    """次回実行時刻を過ぎた定期ジョブを登録する（複数ワーカーから呼んでも1回だけ）"""
+    now = now or timezone.now()
+    states = dict(ScheduleState.objects.filter(name__in=SCHEDULES).values_list('name', 'next_run_at'))
+    enqueued = []
+    for name, (cron, kwargs) in SCHEDULES.items():
+        if name not in states:
+            ScheduleState.objects.bulk_create(
+                [ScheduleState(name=name, next_run_at=cron.next_after(now))], ignore_conflicts=True,
+            )
+            continue
+        next_run_at = states[name]
+        if next_run_at > now:
+            continue
+        # 取りこぼした回はまとめて1回にする
+        advanced = ScheduleState.objects.filter(name=name, next_run_at=next_run_at).update(
+            next_run_at=cron.next_after(now),
+        )
+        if advanced:
+            enqueue(name, **kwargs)
+            enqueued.append(name)
+    return enqueued
+
+
+def requeue_stale(now=None):
+    """JOB_TIMEOUT 秒を超えて heartbeat_at が更新されない running のジョブ（ワーカー停止など）を待機中に戻す"""
+    now = now or timezone.now()
+    stale = Job.objects.filter(
+        status=Job.STATUS_RUNNING, heartbeat_at__lt=now - timedelta(seconds=settings.JOB_TIMEOUT),
+    )
+    failed = stale.filter(attempts__gte=F('max_attempts')).update(
+        status=Job.STATUS_FAILED, locked_by='', finished_at=now, last_error='timeout',
+    )
+    requeued = stale.update(status=Job.STATUS_QUEUED, locked_by='', run_at=now, last_error='timeout')
+    return requeued + failed
+
+
+def purge_finished(now=None):
+    """JOB_RETENTION_DAYS より前に完了したジョブを削除（失敗したジョブは残す）"""
+    now = now or timezone.now()
+    deleted, _ = Job.objects.filter(
+        status=Job.STATUS_DONE, finished_at__lt=now - timedelta(days=settings.JOB_RETENTION_DAYS),
+    ).delete()
+    return deleted
@@ -0,0 +1,6 @@
+from . import queue
+
+
+@queue.task('jobs.purge_finished', schedule='15 3 * * *')
+def purge_finished():
+    queue.purge_finished()
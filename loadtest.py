@@ -0,0 +1,76 @@
+"""
+簡易負荷試験スクリプト（WSGI / ASGI モードのスループット比較用）
+python3 loadtest.py http://localhost:8000 --concurrency 20 --duration 30
+
+読み取り系エンドポイントを並列に叩き、エンドポイントごとの
+リクエスト数/秒・p50/p95 レイテンシ・エラー数を表示する。
+"""
+import argparse
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import defaultdict
+
+PATHS = [
+    '/api/reviews/latest/',
+    '/api/shops/featured/',
+    '/api/people/popular/',
+    '/api/theaters/',
+    '/api/theaters/?q=劇場',
+]
+
+
+def worker(base_url, offset, deadline, results, errors, lock):
+    i = offset
+    while time.monotonic() < deadline:
+        path = PATHS[i % len(PATHS)]
+        i += 1
+        started = time.monotonic()
+        try:
+            url = base_url + urllib.parse.quote(path, safe='/?=&')
+            with urllib.request.urlopen(url, timeout=30) as res:
+                res.read()
+        except (urllib.error.URLError, OSError):
+            with lock:
+                errors[path] += 1
+            continue
+        with lock:
+            results[path].append(time.monotonic() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('base_url')
+    parser.add_argument('--concurrency', type=int, default=20)
+    parser.add_argument('--duration', type=int, default=30)
+    args = parser.parse_args()
+
+    results, errors, lock = defaultdict(list), defaultdict(int), threading.Lock()
+    deadline = time.monotonic() + args.duration
+    threads = [
+        threading.Thread(target=worker, args=(args.base_url.rstrip('/'), n, deadline, results, errors, lock))
+        for n in range(args.concurrency)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    total = sum(len(v) for v in results.values())
+    print(f'{"path":<28} {"req/s":>8} {"p50(ms)":>9} {"p95(ms)":>9} {"errors":>7}')
+    for path in PATHS:
+        times = sorted(results[path])
+        if not times:
+            print(f'{path:<28} {"-":>8} {"-":>9} {"-":>9} {errors[path]:>7}')
+            continue
+        p95 = times[int(len(times) * 0.95) - 1] if len(times) > 1 else times[0]
+        print(f'{path:<28} {len(times) / args.duration:>8.1f} {statistics.median(times) * 1000:>9.1f} '
+              f'{p95 * 1000:>9.1f} {errors[path]:>7}')
+    print(f'{"total":<28} {total / args.duration:>8.1f}')
+
+
+if __name__ == '__main__':
+    main()
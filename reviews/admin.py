@@ -1,27 +1,41 @@
 from django.contrib import admin
 
+from config.admin_mixins import LargeTableAdminMixin
 from .models import Like, Review, ViewingLog, ViewingLogImage
 
 
 @admin.register(Review)
-class ReviewAdmin(admin.ModelAdmin):
+class ReviewAdmin(LargeTableAdminMixin, admin.ModelAdmin):
     list_display = ['user', 'performance', 'rating_overall', 'is_spoiler', 'created_at']
     list_filter = ['is_spoiler', 'rating_overall']
+    list_select_related = ['user', 'performance__work', 'performance__theater']
     search_fields = ['body', 'title']
+    autocomplete_fields = ['user', 'performance']
+    date_hierarchy = 'created_at'
 
 
 @admin.register(ViewingLog)
-class ViewingLogAdmin(admin.ModelAdmin):
+class ViewingLogAdmin(LargeTableAdminMixin, admin.ModelAdmin):
     list_display = ['user', 'performance', 'status', 'watched_on', 'created_at']
     list_filter = ['status', 'watched_on']
+    list_select_related = ['user', 'performance__work', 'performance__theater']
+    autocomplete_fields = ['user', 'performance']
+    date_hierarchy = 'created_at'
 
 
 @admin.register(ViewingLogImage)
-class ViewingLogImageAdmin(admin.ModelAdmin):
+class ViewingLogImageAdmin(LargeTableAdminMixin, admin.ModelAdmin):
     list_display = ['id', 'viewing_log', 'order', 'created_at']
+    list_select_related = ['viewing_log__user', 'viewing_log__performance__work', 'viewing_log__performance__theater']
+    raw_id_fields = ['viewing_log']
 
 
 @admin.register(Like)
-class LikeAdmin(admin.ModelAdmin):
+class LikeAdmin(LargeTableAdminMixin, admin.ModelAdmin):
     list_display = ['user', 'review', 'created_at']
     list_filter = ['created_at']
+    list_select_related = [
+        'user', 'review__user', 'review__performance__work', 'review__performance__theater',
+    ]
+    autocomplete_fields = ['user', 'review']
+    date_hierarchy = 'created_at'
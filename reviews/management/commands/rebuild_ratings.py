@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from reviews import ratings
+
+
+class Command(BaseCommand):
+    help = '作品・公演ごとの評価集計（WorkRating / PerformanceRating）をレビューから再計算'
+
+    def handle(self, *args, **options):
+        performances, works = ratings.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'完了: 公演={performances} 作品={works}'))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from reviews import stats
+
+
+class Command(BaseCommand):
+    help = '観劇統計（ViewingStat）を観劇記録・レビューから再計算'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, action='append', dest='user_ids',
+                            help='対象ユーザーID（複数指定可、省略時は全ユーザー）')
+
+    def handle(self, *args, **options):
+        rows = stats.rebuild(options['user_ids'])
+        self.stdout.write(self.style.SUCCESS(f'完了: 統計行={rows}'))
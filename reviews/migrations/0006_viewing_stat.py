@@ -0,0 +1,33 @@
+# Generated by Django 4.2.29 on 2026-10-19 13:25
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('reviews', '0005_viewing_log_image'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ViewingStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('year', '年'), ('month', '月'), ('rating', '評価'), ('theater', '劇場'), ('person', '出演者')], max_length=10)),
+                ('key', models.CharField(max_length=20)),
+                ('count', models.IntegerField(default=0)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='viewing_stats', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', 'kind', '-count'], name='viewing_stat_rank_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='viewingstat',
+            constraint=models.UniqueConstraint(fields=('user', 'kind', 'key'), name='unique_user_stat_key'),
+        ),
+    ]
@@ -0,0 +1,77 @@
+# Generated by Django 4.2.29 on 2026-10-19 13:48
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+RATING_VALUES = (3, 4, 5)
+
+
+def backfill(apps, schema_editor):
+    """既存レビューから集計を作成（全作品に WorkRating 行を作る）"""
+    Review = apps.get_model('reviews', 'Review')
+    Work = apps.get_model('works', 'Work')
+    PerformanceRating = apps.get_model('reviews', 'PerformanceRating')
+    WorkRating = apps.get_model('reviews', 'WorkRating')
+
+    def summaries(group_by):
+        rows = Review.objects.filter(rating_overall__isnull=False).values(group_by).annotate(
+            count=models.Count('id'),
+            total=models.Sum('rating_overall'),
+            **{f'count_{v}': models.Count('id', filter=models.Q(rating_overall=v)) for v in RATING_VALUES},
+        ).order_by()
+        return {
+            row.pop(group_by): dict(row, average=row['total'] / row['count'])
+            for row in rows
+        }
+
+    PerformanceRating.objects.bulk_create(
+        [PerformanceRating(performance_id=key, **fields) for key, fields in summaries('performance_id').items()],
+        batch_size=1000,
+    )
+    by_work = summaries('performance__work_id')
+    WorkRating.objects.bulk_create(
+        [WorkRating(work_id=work_id, **by_work.get(work_id, {})) for work_id in Work.objects.values_list('id', flat=True)],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('works', '0005_recommendations'),
+        ('reviews', '0007_timeline_entry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PerformanceRating',
+            fields=[
+                ('count', models.PositiveIntegerField(default=0)),
+                ('count_3', models.PositiveIntegerField(default=0)),
+                ('count_4', models.PositiveIntegerField(default=0)),
+                ('count_5', models.PositiveIntegerField(default=0)),
+                ('total', models.PositiveIntegerField(default=0)),
+                ('average', models.FloatField(default=0)),
+                ('performance', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='rating_summary', serialize=False, to='works.performance')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='WorkRating',
+            fields=[
+                ('count', models.PositiveIntegerField(default=0)),
+                ('count_3', models.PositiveIntegerField(default=0)),
+                ('count_4', models.PositiveIntegerField(default=0)),
+                ('count_5', models.PositiveIntegerField(default=0)),
+                ('total', models.PositiveIntegerField(default=0)),
+                ('average', models.FloatField(default=0)),
+                ('work', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='rating_summary', serialize=False, to='works.work')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['-average', '-count'], name='work_rating_rank_idx')],
+            },
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
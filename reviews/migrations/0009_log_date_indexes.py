@@ -0,0 +1,25 @@
+# Generated by Django 4.2.29 on 2026-10-19 13:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0008_rating_summaries'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='like',
+            index=models.Index(fields=['created_at'], name='like_created_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['created_at'], name='review_created_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='viewinglog',
+            index=models.Index(fields=['created_at'], name='viewing_log_created_at_idx'),
+        ),
+    ]
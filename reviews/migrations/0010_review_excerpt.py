@@ -0,0 +1,42 @@
+# Generated by Django 4.2.29 on 2026-10-19 14:07
+
+from django.db import migrations, models
+
+BATCH_SIZE = 1000
+
+
+# reviews.models.make_excerpt のこの時点での定義（後で変わってもこのマイグレーションの結果は変えない）
+def make_excerpt(body):
+    body = (body or '').strip()
+    if len(body) <= 140:
+        return body
+    return body[:140].rstrip() + '…'
+
+
+def fill_excerpts(apps, schema_editor):
+    Review = apps.get_model('reviews', 'Review')
+    last_id = 0
+    while True:
+        rows = list(Review.objects.filter(id__gt=last_id).order_by('id').values_list('id', 'body')[:BATCH_SIZE])
+        if not rows:
+            return
+        Review.objects.bulk_update(
+            [Review(id=review_id, excerpt=make_excerpt(body)) for review_id, body in rows], ['excerpt'],
+        )
+        last_id = rows[-1][0]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0009_log_date_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='review',
+            name='excerpt',
+            field=models.CharField(blank=True, default='', editable=False, max_length=141),
+        ),
+        migrations.RunPython(fill_excerpts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,47 @@
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+BATCH_SIZE = 10000
+
+
+def fill_work(apps, schema_editor):
+    """performance.work_id を id 範囲ごとに UPDATE ... SET work_id = (SELECT ...) で写す"""
+    Review = apps.get_model('reviews', 'Review')
+    Performance = apps.get_model('works', 'Performance')
+    work_id = Subquery(Performance.objects.filter(pk=OuterRef('performance_id')).values('work_id')[:1])
+    last_id = Review.objects.order_by('-id').values_list('id', flat=True).first() or 0
+    for start in range(0, last_id, BATCH_SIZE):
+        Review.objects.filter(id__gt=start, id__lte=start + BATCH_SIZE).update(work_id=work_id)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('works', '0008_work_is_deleted'),
+        ('reviews', '0010_review_excerpt'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='review',
+            name='work',
+            field=models.ForeignKey(
+                db_index=False, editable=False, null=True, on_delete=django.db.models.deletion.CASCADE,
+                related_name='reviews', to='works.work',
+            ),
+        ),
+        migrations.RunPython(fill_work, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='review',
+            name='work',
+            field=models.ForeignKey(
+                db_index=False, editable=False, on_delete=django.db.models.deletion.CASCADE,
+                related_name='reviews', to='works.work',
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['work', '-created_at'], name='review_work_created_idx'),
+        ),
+    ]
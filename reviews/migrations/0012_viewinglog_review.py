@@ -0,0 +1,36 @@
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+BATCH_SIZE = 10000
+
+
+def link_reviews(apps, schema_editor):
+    """各 ViewingLog に同じユーザー・公演の最新のレビューを id 範囲ごとに紐付ける"""
+    ViewingLog = apps.get_model('reviews', 'ViewingLog')
+    Review = apps.get_model('reviews', 'Review')
+    latest = Review.objects.filter(
+        user_id=OuterRef('user_id'), performance_id=OuterRef('performance_id'),
+    ).order_by('-created_at', '-id').values('id')[:1]
+    last_id = ViewingLog.objects.order_by('-id').values_list('id', flat=True).first() or 0
+    for start in range(0, last_id, BATCH_SIZE):
+        ViewingLog.objects.filter(id__gt=start, id__lte=start + BATCH_SIZE).update(review=Subquery(latest))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0011_review_work'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='viewinglog',
+            name='review',
+            field=models.ForeignKey(
+                blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL,
+                related_name='+', to='reviews.review',
+            ),
+        ),
+        migrations.RunPython(link_reviews, migrations.RunPython.noop),
+    ]
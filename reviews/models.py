@@ -2,6 +2,16 @@ from django.conf import settings
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
 
+EXCERPT_LENGTH = 140
+
+
+def make_excerpt(body):
+    """一覧・フィード用の本文の冒頭（EXCERPT_LENGTH 文字を超える分は「…」で省略）"""
+    body = (body or '').strip()
+    if len(body) <= EXCERPT_LENGTH:
+        return body
+    return body[:EXCERPT_LENGTH].rstrip() + '…'
+
 
 class Review(models.Model):
     user = models.ForeignKey(
@@ -10,8 +20,14 @@ class Review(models.Model):
     performance = models.ForeignKey(
         'works.Performance', on_delete=models.CASCADE, related_name='reviews',
     )
+    # performance.work の複製。作品ごとのレビュー一覧を公演との JOIN なしで引く（索引は review_work_created_idx）
+    work = models.ForeignKey(
+        'works.Work', on_delete=models.CASCADE, related_name='reviews', editable=False, db_index=False,
+    )
     title = models.CharField(max_length=200, blank=True, default='')
     body = models.TextField()
+    # make_excerpt(body)。一覧では body を読まずにこちらを返す
+    excerpt = models.CharField(max_length=EXCERPT_LENGTH + 1, blank=True, default='', editable=False)
     RATING_CHOICES = [
         (3, '観た'),
         (4, '良かった'),
@@ -28,6 +44,22 @@ class Review(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['created_at'], name='review_created_at_idx'),
+            models.Index(fields=['work', '-created_at'], name='review_work_created_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'body' in update_fields:
+            self.excerpt = make_excerpt(self.body)
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'excerpt'}
+        if update_fields is None or 'performance' in update_fields:
+            self.work_id = self.performance.work_id
+            if update_fields is not None:
+                kwargs['update_fields'] = {*kwargs['update_fields'], 'work'}
+        super().save(*args, **kwargs)
 
     def __str__(self):
         return f'{self.user} - {self.performance}'
@@ -45,6 +77,10 @@ class ViewingLog(models.Model):
     performance = models.ForeignKey(
         'works.Performance', on_delete=models.CASCADE, related_name='viewing_logs',
     )
+    # このユーザーのこの公演への最新のレビュー（reviews/signals.py が保つ）。一覧の評価を JOIN で読む
+    review = models.ForeignKey(
+        Review, on_delete=models.SET_NULL, null=True, blank=True, editable=False, related_name='+',
+    )
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='watched')
     watched_on = models.DateField(null=True, blank=True)
     watched_time = models.TimeField(null=True, blank=True)
@@ -54,6 +90,9 @@ class ViewingLog(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['created_at'], name='viewing_log_created_at_idx'),
+        ]
         constraints = [
             models.UniqueConstraint(fields=['user', 'performance'], name='unique_user_performance'),
         ]
@@ -93,6 +132,105 @@ class Like(models.Model):
     class Meta:
         unique_together = ['user', 'review']
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['created_at'], name='like_created_at_idx'),
+        ]
 
     def __str__(self):
         return f'{self.user} → {self.review}'
+
+
+class ViewingStat(models.Model):
+    """ユーザー別の観劇統計（年・月・評価・劇場・出演者ごとの件数）"""
+    KIND_YEAR = 'year'
+    KIND_MONTH = 'month'
+    KIND_RATING = 'rating'
+    KIND_THEATER = 'theater'
+    KIND_PERSON = 'person'
+    KIND_CHOICES = [
+        (KIND_YEAR, '年'),
+        (KIND_MONTH, '月'),
+        (KIND_RATING, '評価'),
+        (KIND_THEATER, '劇場'),
+        (KIND_PERSON, '出演者'),
+    ]
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='viewing_stats',
+    )
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    key = models.CharField(max_length=20)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'kind', 'key'], name='unique_user_stat_key'),
+        ]
+        indexes = [
+            models.Index(fields=['user', 'kind', '-count'], name='viewing_stat_rank_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.user} {self.kind}:{self.key} = {self.count}'
+
+
+class TimelineEntry(models.Model):
+    """フォロー中ユーザーのレビューをフォロワーごとに展開したホームタイムライン"""
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='timeline_entries',
+    )
+    review = models.ForeignKey(Review, on_delete=models.CASCADE, related_name='+')
+    author = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='+',
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'review'], name='unique_timeline_entry'),
+        ]
+        indexes = [
+            models.Index(fields=['user', '-review'], name='timeline_user_review_idx'),
+            models.Index(fields=['user', 'author'], name='timeline_user_author_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.user} ← {self.review_id}'
+
+
+class RatingSummary(models.Model):
+    """評価付きレビューの集計（件数・評価別件数・合計・平均）。reviews/ratings.py が差分更新する"""
+    count = models.PositiveIntegerField(default=0)
+    # Review.RATING_CHOICES の値ごとの件数
+    count_3 = models.PositiveIntegerField(default=0)
+    count_4 = models.PositiveIntegerField(default=0)
+    count_5 = models.PositiveIntegerField(default=0)
+    total = models.PositiveIntegerField(default=0)
+    # 評価なし（count=0）のときは 0
+    average = models.FloatField(default=0)
+
+    class Meta:
+        abstract = True
+
+
+class PerformanceRating(RatingSummary):
+    performance = models.OneToOneField(
+        'works.Performance', on_delete=models.CASCADE, primary_key=True, related_name='rating_summary',
+    )
+
+    def __str__(self):
+        return f'{self.performance_id}: {self.average:.2f} ({self.count})'
+
+
+class WorkRating(RatingSummary):
+    """作品ごとの評価集計（全作品に1行。評価順の並び替えに使う）"""
+    work = models.OneToOneField(
+        'works.Work', on_delete=models.CASCADE, primary_key=True, related_name='rating_summary',
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-average', '-count'], name='work_rating_rank_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.work_id}: {self.average:.2f} ({self.count})'
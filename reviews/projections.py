@@ -0,0 +1,61 @@
+from config.projection import Projection
+from works.projections import poster_url, selected_posters
+from .models import ViewingLogImage
+from .serializers import ReviewSerializer, ViewingLogImageSerializer, ViewingLogSerializer
+
+
+class ReviewProjection(Projection):
+    serializer_class = ReviewSerializer
+
+    def get_user(self, row):
+        return row['user__username']
+
+    def get_user_display_name(self, row):
+        return row['user__display_name'] or row['user__username']
+
+    def get_user_avatar_url(self, row):
+        return row['user__avatar_url'] or None
+
+    def get_performance_str(self, row):
+        # Performance.__str__ と同じ
+        return f'{row["performance__work__title"]} @ {row["performance__theater__name"]}'
+
+    def get_like_count(self, row):
+        return row['_like_count']
+
+    def get_is_liked(self, row):
+        return row.get('_liked_by_user', False)
+
+
+class ViewingLogImageProjection(Projection):
+    serializer_class = ViewingLogImageSerializer
+    extra_columns = ['viewing_log_id']
+
+
+class ViewingLogProjection(Projection):
+    serializer_class = ViewingLogSerializer
+
+    def prepare(self, rows):
+        self.posters, self.images = {}, {}
+        if self.wants('poster_url'):
+            self.posters = selected_posters(row['performance__work'] for row in rows)
+        if not self.wants('images'):
+            return
+        images = ViewingLogImageProjection(self.context)
+        image_rows = list(images.queryset(
+            ViewingLogImage.objects.filter(viewing_log_id__in=[row['id'] for row in rows]),
+        ))
+        for row, data in zip(image_rows, images.represent(image_rows)):
+            self.images.setdefault(row['viewing_log_id'], []).append(data)
+
+    def get_user(self, row):
+        return row['user__username']
+
+    def get_poster_url(self, row):
+        return poster_url(self, self.posters.get(row['performance__work']))
+
+    def get_rating(self, row):
+        return row['_rating']
+
+    def get_images(self, row):
+        return self.images.get(row['id'], [])
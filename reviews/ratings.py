@@ -0,0 +1,147 @@
+"""
+作品・公演ごとの評価集計（WorkRating / PerformanceRating）の差分更新。
+
+Review の保存・削除で (公演, 評価) の増減を求め、同じトランザクション内で
+件数・評価別件数・合計・平均を1行1回の UPDATE で更新する（F() で相対更新するので同時更新でも崩れない）。
+"""
+from collections import Counter
+
+from django.core.exceptions import ObjectDoesNotExist
+from django.db import transaction
+from django.db.models import Case, Count, F, FloatField, Q, Sum, Value, When
+from django.db.models.functions import Cast
+
+from works.models import Performance, Work
+from .models import PerformanceRating, Review, WorkRating
+
+RATING_VALUES = [value for value, _ in Review.RATING_CHOICES]
+
+
+def _rated(state):
+    """Review のスナップショット → (performance_id, rating)。評価なしは None"""
+    if not state or state.get('rating_overall') is None:
+        return None
+    return state['performance_id'], state['rating_overall']
+
+
+def _update(model, key_field, key, rating, delta):
+    if delta > 0:
+        model.objects.bulk_create([model(**{key_field: key})], ignore_conflicts=True)
+    # 削除時は行を作り直さない（公演・作品ごと削除中の場合がある）
+    count, total = F('count') + delta, F('total') + rating * delta
+    model.objects.filter(**{key_field: key}).update(
+        count=count,
+        total=total,
+        average=Case(
+            When(count__gt=-delta, then=Cast(total, FloatField()) / count),
+            default=Value(0.0),
+        ),
+        **{f'count_{rating}': F(f'count_{rating}') + delta},
+    )
+
+
+def apply(old_state, new_state):
+    """Review の変更前後のスナップショットから集計を更新"""
+    old, new = _rated(old_state), _rated(new_state)
+    if old == new:
+        return
+    performance_deltas = Counter()
+    if old:
+        performance_deltas[old] -= 1
+    if new:
+        performance_deltas[new] += 1
+    work_ids = dict(Performance.objects.filter(
+        pk__in={perf_id for perf_id, _ in performance_deltas},
+    ).values_list('id', 'work_id'))
+    work_deltas = Counter()
+    for (perf_id, rating), delta in performance_deltas.items():
+        if perf_id in work_ids:
+            work_deltas[work_ids[perf_id], rating] += delta
+    _apply_deltas(performance_deltas, work_deltas)
+
+
+def move_performance(performance_id, old_work_id, new_work_id):
+    """公演の作品が付け替えられたとき、その公演の評価を旧作品から新作品の集計へ移す"""
+    rows = Review.objects.filter(performance_id=performance_id, rating_overall__isnull=False).values(
+        'rating_overall',
+    ).annotate(n=Count('id')).order_by()
+    work_deltas = Counter()
+    for row in rows:
+        work_deltas[old_work_id, row['rating_overall']] -= row['n']
+        work_deltas[new_work_id, row['rating_overall']] += row['n']
+    _apply_deltas(Counter(), work_deltas)
+
+
+def remove(review_ids):
+    """まとめて削除するレビューの分を集計から差し引く（削除前に呼ぶ。config/deletion.py 用）"""
+    rows = Review.objects.filter(pk__in=review_ids, rating_overall__isnull=False).values(
+        'performance_id', 'work_id', 'rating_overall',
+    ).annotate(n=Count('id'))
+    performance_deltas, work_deltas = Counter(), Counter()
+    for row in rows:
+        performance_deltas[row['performance_id'], row['rating_overall']] -= row['n']
+        work_deltas[row['work_id'], row['rating_overall']] -= row['n']
+    _apply_deltas(performance_deltas, work_deltas)
+
+
+def _apply_deltas(performance_deltas, work_deltas):
+    with transaction.atomic():
+        for (perf_id, rating), delta in performance_deltas.items():
+            if delta:
+                _update(PerformanceRating, 'performance_id', perf_id, rating, delta)
+        for (work_id, rating), delta in work_deltas.items():
+            if delta:
+                _update(WorkRating, 'work_id', work_id, rating, delta)
+
+
+def summary_of(obj):
+    """Work / Performance の集計行（未作成なら None）"""
+    try:
+        return obj.rating_summary
+    except ObjectDoesNotExist:
+        return None
+
+
+def summary_data(summary):
+    """集計行（なければ None）→ API の rating 表現"""
+    count = summary.count if summary else 0
+    return {
+        'count': count,
+        'average': round(summary.average, 2) if count else None,
+        'distribution': [
+            {'rating': value, 'label': label, 'count': getattr(summary, f'count_{value}') if summary else 0}
+            for value, label in Review.RATING_CHOICES
+        ],
+    }
+
+
+def _aggregate(group_by):
+    return Review.objects.filter(rating_overall__isnull=False).values(group_by).annotate(
+        count=Count('id'),
+        total=Sum('rating_overall'),
+        **{f'count_{value}': Count('id', filter=Q(rating_overall=value)) for value in RATING_VALUES},
+    )
+
+
+def _summary(model, key_field, key, row):
+    fields = {name: row[name] for name in ['count', 'total'] + [f'count_{v}' for v in RATING_VALUES]}
+    return model(**{key_field: key}, average=row['total'] / row['count'], **fields)
+
+
+def rebuild():
+    """Review から集計を再計算（初回投入・整合性チェック用）。全作品に WorkRating 行を作る"""
+    performance_rows = _aggregate('performance_id')
+    work_rows = {row['work_id']: row for row in _aggregate('work_id')}
+    with transaction.atomic():
+        PerformanceRating.objects.all().delete()
+        WorkRating.objects.all().delete()
+        PerformanceRating.objects.bulk_create(
+            [_summary(PerformanceRating, 'performance_id', row['performance_id'], row) for row in performance_rows],
+            batch_size=1000,
+        )
+        WorkRating.objects.bulk_create([
+            _summary(WorkRating, 'work_id', work_id, work_rows[work_id]) if work_id in work_rows
+            else WorkRating(work_id=work_id)
+            for work_id in Work.objects.values_list('id', flat=True).iterator()
+        ], batch_size=1000)
+    return PerformanceRating.objects.count(), WorkRating.objects.count()
@@ -16,11 +16,20 @@ class ReviewSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'user', 'user_display_name', 'user_avatar_url',
             'performance', 'performance_str',
-            'title', 'body', 'rating_overall', 'is_spoiler',
+            'title', 'body', 'excerpt', 'rating_overall', 'is_spoiler',
             'like_count', 'is_liked',
             'created_at', 'updated_at',
         ]
         read_only_fields = ['id', 'user', 'created_at', 'updated_at']
+        # ?fields= での絞り込み用（各フィールドが読むモデルのパス。'_' 始まりは annotate）
+        field_paths = {
+            'user': ['user__username'],
+            'user_display_name': ['user__display_name', 'user__username'],
+            'user_avatar_url': ['user__avatar_url'],
+            'performance_str': ['performance__work__title', 'performance__theater__name'],
+            'like_count': ['_like_count'],
+            'is_liked': ['_liked_by_user'],
+        }
 
     def get_user_display_name(self, obj):
         return obj.user.display_name or obj.user.username
@@ -59,7 +68,7 @@ class LatestReviewSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'user_display_name', 'user_avatar_url',
             'work_title', 'work_slug', 'poster_url',
-            'title', 'body', 'rating_overall',
+            'title', 'excerpt', 'rating_overall',
             'created_at',
         ]
 
@@ -113,6 +122,14 @@ class ViewingLogSerializer(serializers.ModelSerializer):
             'rating', 'images', 'created_at', 'updated_at',
         ]
         read_only_fields = ['id', 'user', 'created_at', 'updated_at']
+        field_paths = {
+            'user': ['user__username'],
+            'poster_url': [
+                'performance__work__poster_submissions__image', 'performance__work__poster_submissions__image_url',
+            ],
+            'rating': ['_rating'],
+            'images': ['images__image_url'],
+        }
 
     def get_poster_url(self, obj):
         posters = getattr(obj.performance.work, '_prefetched_selected_posters', None)
@@ -134,9 +151,7 @@ class ViewingLogSerializer(serializers.ModelSerializer):
     def get_rating(self, obj):
         if hasattr(obj, '_rating'):
             return obj._rating
-        return Review.objects.filter(
-            user=obj.user, performance=obj.performance,
-        ).order_by('-created_at').values_list('rating_overall', flat=True).first()
+        return obj.review.rating_overall if obj.review_id else None
 
     def validate(self, data):
         # PATCH時は既存インスタンスの値をフォールバック
@@ -0,0 +1,198 @@
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db.models import Count, F, Subquery
+from django.db.models.signals import post_delete, post_init, post_save, pre_save
+from django.dispatch import receiver
+
+from accounts.models import Follow, User
+from config import deletion
+from works.models import Performance, PerformanceCast, Work
+from . import ratings, stats, timeline
+from .models import Review, ViewingLog, WorkRating
+
+
+@receiver(post_init, sender=ViewingLog)
+def _snapshot_viewing_log(sender, instance, **kwargs):
+    instance._stats_state = stats.snapshot(instance, stats.VIEWING_LOG_TRACKED)
+
+
+@receiver(pre_save, sender=ViewingLog)
+def _load_viewing_log_state(sender, instance, **kwargs):
+    # deferred 等で保存前の値が揃っていなければDBから補完
+    if instance.pk and len(instance._stats_state) < len(stats.VIEWING_LOG_TRACKED):
+        instance._stats_state = ViewingLog.objects.filter(pk=instance.pk).values(
+            *stats.VIEWING_LOG_TRACKED,
+        ).first()
+
+
+def _latest_review(user_id, performance_id):
+    return Review.objects.filter(
+        user_id=user_id, performance_id=performance_id,
+    ).order_by('-created_at', '-id').values('id')[:1]
+
+
+def _link_review(user_id, performance_id):
+    """ViewingLog.review をその公演への最新のレビューに付け替える"""
+    ViewingLog.objects.filter(user_id=user_id, performance_id=performance_id).update(
+        review=Subquery(_latest_review(user_id, performance_id)),
+    )
+
+
+@receiver(pre_save, sender=ViewingLog)
+def _set_viewing_log_review(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    old = instance._stats_state or {}
+    pair = (instance.user_id, instance.performance_id)
+    if instance._state.adding or (old.get('user_id'), old.get('performance_id')) != pair:
+        instance.review_id = _latest_review(*pair).values_list('id', flat=True).first()
+
+
+@receiver(post_save, sender=ViewingLog)
+def _update_viewing_stats(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    old = None if created else instance._stats_state
+    new = stats.snapshot(instance, stats.VIEWING_LOG_TRACKED)
+    stats.apply_deltas(stats.diff(stats.viewing_log_keys(old), stats.viewing_log_keys(new)))
+    instance._stats_state = new
+
+
+@receiver(post_delete, sender=ViewingLog)
+def _remove_viewing_stats(sender, instance, **kwargs):
+    stats.apply_deltas(stats.diff(stats.viewing_log_keys(instance._stats_state), {}))
+
+
+@receiver(post_init, sender=Review)
+def _snapshot_review(sender, instance, **kwargs):
+    instance._stats_state = stats.snapshot(instance, stats.REVIEW_TRACKED)
+
+
+@receiver(pre_save, sender=Review)
+def _load_review_state(sender, instance, **kwargs):
+    if instance.pk and len(instance._stats_state) < len(stats.REVIEW_TRACKED):
+        instance._stats_state = Review.objects.filter(pk=instance.pk).values(
+            *stats.REVIEW_TRACKED,
+        ).first()
+
+
+@receiver(post_save, sender=Review)
+def _link_viewing_log(sender, instance, created, raw=False, **kwargs):
+    # _update_rating_stats が _stats_state を更新する前に、変更前の (ユーザー, 公演) を見る
+    if raw:
+        return
+    old = instance._stats_state or {}
+    pair = (instance.user_id, instance.performance_id)
+    if created or (old.get('user_id'), old.get('performance_id')) != pair:
+        _link_review(*pair)
+        if not created and old:
+            _link_review(old['user_id'], old['performance_id'])
+
+
+@receiver(post_save, sender=Review)
+def _update_rating_stats(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    old = None if created else instance._stats_state
+    new = stats.snapshot(instance, stats.REVIEW_TRACKED)
+    stats.apply_deltas(stats.diff(stats.review_keys(old), stats.review_keys(new)))
+    ratings.apply(old, new)
+    instance._stats_state = new
+
+
+@receiver(post_save, sender=Review)
+def _fan_out_review(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        timeline.fan_out(instance)
+
+
+@receiver(post_delete, sender=Review)
+def _remove_rating_stats(sender, instance, **kwargs):
+    stats.apply_deltas(stats.diff(stats.review_keys(instance._stats_state), {}))
+    ratings.apply(instance._stats_state, None)
+    # on_delete=SET_NULL で外れた ViewingLog.review を、残っているレビューに付け替える
+    _link_review(instance.user_id, instance.performance_id)
+
+
+@receiver(post_save, sender=Work)
+def _create_work_rating(sender, instance, created, raw=False, **kwargs):
+    # 評価順の並び替えのため全作品に集計行を持たせる
+    if created and not raw:
+        WorkRating.objects.get_or_create(work=instance)
+
+
+@receiver(post_save, sender=Performance)
+def _sync_review_work(sender, instance, created, raw=False, **kwargs):
+    # 公演の作品が付け替えられたら、複製している Review.work と作品の評価集計も合わせる
+    if created or raw:
+        return
+    old_work_id = getattr(instance, '_previous_work_id', None)
+    if old_work_id and old_work_id != instance.work_id:
+        ratings.move_performance(instance.pk, old_work_id, instance.work_id)
+    Review.objects.filter(performance=instance).exclude(work_id=instance.work_id).update(
+        work_id=instance.work_id,
+    )
+
+
+@receiver(post_save, sender=PerformanceCast)
+def _add_cast_stats(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        stats.cast_changed(instance.performance_id, instance.person_id, 1)
+
+
+@receiver(post_delete, sender=PerformanceCast)
+def _remove_cast_stats(sender, instance, **kwargs):
+    stats.cast_changed(instance.performance_id, instance.person_id, -1)
+
+
+@receiver(post_save, sender=Follow)
+def _backfill_timeline(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        # フォロワー数は展開方法（timeline.py）の判定に使うので、管理画面等からの追加でも数える
+        User.objects.filter(pk=instance.followee_id).update(follower_count=F('follower_count') + 1)
+        timeline.backfill(instance.follower_id, instance.followee_id)
+
+
+@receiver(post_delete, sender=Follow)
+def _remove_from_timeline(sender, instance, **kwargs):
+    # 管理画面・ユーザー削除のカスケードでも数を合わせる
+    User.objects.filter(pk=instance.followee_id).update(follower_count=F('follower_count') - 1)
+    timeline.remove(instance.follower_id, instance.followee_id)
+    count = User.objects.filter(pk=instance.followee_id).values_list('follower_count', flat=True).first()
+    if count == settings.TIMELINE_FANOUT_LIMIT:
+        # 上限を下回った: 読み込み時の取得から外れるので、展開されていないレビューを取り込む
+        timeline.backfill_followers(instance.followee_id)
+
+
+@receiver(deletion.pre_batch_delete, sender=Follow)
+def _remove_follows_batch(sender, ids, **kwargs):
+    removed = Counter(dict(Follow.objects.filter(pk__in=ids).values('followee_id').annotate(
+        n=Count('id'),
+    ).order_by().values_list('followee_id', 'n')))
+    before = dict(User.objects.filter(pk__in=removed).values_list('id', 'follower_count'))
+    by_count = defaultdict(list)
+    for user_id, n in removed.items():
+        by_count[n].append(user_id)
+    for n, user_ids in by_count.items():
+        User.objects.filter(pk__in=user_ids).update(follower_count=F('follower_count') - n)
+    limit = settings.TIMELINE_FANOUT_LIMIT
+    for user_id, n in removed.items():
+        if before.get(user_id, 0) > limit >= before.get(user_id, 0) - n:
+            timeline.backfill_followers(user_id, exclude_follow_ids=ids)
+
+
+@receiver(deletion.pre_batch_delete, sender=ViewingLog)
+def _remove_viewing_log_batch(sender, ids, **kwargs):
+    stats.remove(log_ids=ids)
+
+
+@receiver(deletion.pre_batch_delete, sender=Review)
+def _remove_review_batch(sender, ids, **kwargs):
+    stats.remove(review_ids=ids)
+    ratings.remove(ids)
+
+
+@receiver(deletion.pre_batch_delete, sender=PerformanceCast)
+def _remove_cast_batch(sender, ids, **kwargs):
+    stats.remove_casts(ids)
@@ -0,0 +1,161 @@
+"""
+観劇統計（ViewingStat）の差分更新。
+
+ViewingLog / Review / PerformanceCast の変更を (user, kind, key) ごとの
+増減に変換し、まとめて UPDATE する。統計APIは集計済みの行を読むだけで、
+ユーザーの全履歴を走査しない。
+"""
+from collections import Counter, defaultdict
+from functools import reduce
+from operator import or_
+
+from django.db import transaction
+from django.db.models import Count, F, Q
+
+from works.models import Performance, PerformanceCast
+from .models import Review, ViewingLog, ViewingStat
+
+VIEWING_LOG_TRACKED = ('user_id', 'performance_id', 'status', 'watched_on')
+REVIEW_TRACKED = ('user_id', 'performance_id', 'rating_overall')
+MATCH_CHUNK_SIZE = 200
+
+
+def snapshot(instance, fields):
+    """ロード済みのフィールド値を保持（deferredのフィールドは含めない）"""
+    return {f: instance.__dict__[f] for f in fields if f in instance.__dict__}
+
+
+def _performance_keys(performance_id):
+    theater_id = Performance.objects.filter(pk=performance_id).values_list('theater_id', flat=True).first()
+    person_ids = PerformanceCast.objects.filter(performance_id=performance_id).values_list('person_id', flat=True)
+    keys = [(ViewingStat.KIND_PERSON, str(pid)) for pid in person_ids]
+    if theater_id:
+        keys.append((ViewingStat.KIND_THEATER, str(theater_id)))
+    return keys
+
+
+def viewing_log_keys(state):
+    """ViewingLog の状態が寄与する統計キー（watched のみ集計対象）"""
+    if not state or state.get('status') != 'watched':
+        return Counter()
+    user_id = state['user_id']
+    keys = Counter()
+    watched_on = state.get('watched_on')
+    if watched_on:
+        keys[(user_id, ViewingStat.KIND_YEAR, f'{watched_on.year}')] += 1
+        keys[(user_id, ViewingStat.KIND_MONTH, f'{watched_on.year}-{watched_on.month:02d}')] += 1
+    for kind, key in _performance_keys(state['performance_id']):
+        keys[(user_id, kind, key)] += 1
+    return keys
+
+
+def review_keys(state):
+    if not state or state.get('rating_overall') is None:
+        return Counter()
+    return Counter({(state['user_id'], ViewingStat.KIND_RATING, str(state['rating_overall'])): 1})
+
+
+def diff(old_keys, new_keys):
+    deltas = Counter(new_keys)
+    deltas.subtract(old_keys)
+    return deltas
+
+
+def _chunks(idents):
+    # OR 条件が長くなりすぎないように分ける（SQLite の式の深さの上限など）
+    for i in range(0, len(idents), MATCH_CHUNK_SIZE):
+        yield idents[i:i + MATCH_CHUNK_SIZE]
+
+
+def _match(idents):
+    return reduce(or_, (Q(user_id=u, kind=k, key=key) for u, k, key in idents))
+
+
+def apply_deltas(deltas):
+    """{(user_id, kind, key): 増減} を数クエリでまとめて反映"""
+    deltas = {ident: d for ident, d in deltas.items() if d}
+    if not deltas:
+        return
+    by_delta = defaultdict(list)
+    for ident, d in deltas.items():
+        by_delta[d].append(ident)
+    with transaction.atomic():
+        ViewingStat.objects.bulk_create(
+            [
+                ViewingStat(user_id=u, kind=k, key=key, count=0)
+                for (u, k, key), d in deltas.items() if d > 0
+            ],
+            ignore_conflicts=True,
+        )
+        for d, idents in by_delta.items():
+            for chunk in _chunks(idents):
+                ViewingStat.objects.filter(_match(chunk)).update(count=F('count') + d)
+        # 0件になった行は削除してテーブルを小さく保つ
+        for chunk in _chunks(list(deltas)):
+            ViewingStat.objects.filter(_match(chunk), count__lte=0).delete()
+
+
+def cast_changed(performance_id, person_id, delta):
+    """出演者の追加・削除を、その公演を観たユーザー全員の統計に反映"""
+    user_ids = ViewingLog.objects.filter(
+        performance_id=performance_id, status='watched',
+    ).values_list('user_id', flat=True)
+    apply_deltas({(u, ViewingStat.KIND_PERSON, str(person_id)): delta for u in user_ids})
+
+
+def _count(logs, reviews):
+    """watched の ViewingLog / 評価付き Review のクエリセット → {(user_id, kind, key): 件数}"""
+    counts = Counter()
+    for user_id, watched_on in logs.exclude(watched_on=None).values_list('user_id', 'watched_on').iterator():
+        counts[(user_id, ViewingStat.KIND_YEAR, f'{watched_on.year}')] += 1
+        counts[(user_id, ViewingStat.KIND_MONTH, f'{watched_on.year}-{watched_on.month:02d}')] += 1
+    for row in logs.values('user_id', 'performance__theater_id').annotate(n=Count('id')):
+        counts[(row['user_id'], ViewingStat.KIND_THEATER, str(row['performance__theater_id']))] = row['n']
+    person_rows = logs.filter(performance__casts__isnull=False).values(
+        'user_id', 'performance__casts__person_id',
+    ).annotate(n=Count('id'))
+    for row in person_rows:
+        counts[(row['user_id'], ViewingStat.KIND_PERSON, str(row['performance__casts__person_id']))] = row['n']
+    for row in reviews.values('user_id', 'rating_overall').annotate(n=Count('id')):
+        counts[(row['user_id'], ViewingStat.KIND_RATING, str(row['rating_overall']))] = row['n']
+    return counts
+
+
+def remove(log_ids=(), review_ids=()):
+    """まとめて削除する ViewingLog / Review の分を統計から差し引く（削除前に呼ぶ。config/deletion.py 用）"""
+    counts = _count(
+        ViewingLog.objects.filter(pk__in=log_ids, status='watched'),
+        Review.objects.filter(pk__in=review_ids, rating_overall__isnull=False),
+    )
+    apply_deltas({ident: -n for ident, n in counts.items()})
+
+
+def remove_casts(cast_ids):
+    """まとめて削除する出演者の分を、その公演を観たユーザーの統計から差し引く"""
+    rows = ViewingLog.objects.filter(status='watched', performance__casts__in=cast_ids).values(
+        'user_id', 'performance__casts__person_id',
+    ).annotate(n=Count('id'))
+    apply_deltas({
+        (row['user_id'], ViewingStat.KIND_PERSON, str(row['performance__casts__person_id'])): -row['n']
+        for row in rows
+    })
+
+
+def rebuild(user_ids=None):
+    """ViewingLog / Review から統計を再計算（初回投入・整合性チェック用）"""
+    logs = ViewingLog.objects.filter(status='watched')
+    reviews = Review.objects.filter(rating_overall__isnull=False)
+    stats = ViewingStat.objects.all()
+    if user_ids is not None:
+        logs = logs.filter(user_id__in=user_ids)
+        reviews = reviews.filter(user_id__in=user_ids)
+        stats = stats.filter(user_id__in=user_ids)
+    counts = _count(logs, reviews)
+
+    with transaction.atomic():
+        stats.delete()
+        ViewingStat.objects.bulk_create(
+            [ViewingStat(user_id=u, kind=k, key=key, count=n) for (u, k, key), n in counts.items()],
+            batch_size=1000,
+        )
+    return len(counts)
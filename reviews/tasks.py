@@ -0,0 +1,13 @@
+from jobs.queue import task
+from . import ratings, stats
+
+
+@task('reviews.rebuild_ratings', schedule='30 4 * * *')
+def rebuild_ratings():
+    # 差分更新で生じたずれを毎日レビューから作り直す
+    ratings.rebuild()
+
+
+@task('reviews.rebuild_viewing_stats', schedule='0 5 * * 1')
+def rebuild_viewing_stats(user_ids=None):
+    stats.rebuild(user_ids)
@@ -0,0 +1,88 @@
+"""
+ホームタイムライン（フォロー中ユーザーのレビュー）。
+
+通常のユーザーのレビューは投稿時にフォロワー全員の TimelineEntry へ展開する
+（fan-out on write）。フォロワー数が TIMELINE_FANOUT_LIMIT を超えるユーザーは
+展開せず、読み込み時に Review から直接取得してマージする（fan-out on read）。
+読み込みは1ユーザー分の行を review_id の降順でキーセットページングするだけなので、
+全体のレビュー数に依存しない。
+"""
+from django.conf import settings
+
+from accounts.models import Follow
+from .models import Review, TimelineEntry
+
+BACKFILL_SIZE = 50
+
+
+def fan_out(review):
+    if review.user.follower_count > settings.TIMELINE_FANOUT_LIMIT:
+        return
+    follower_ids = Follow.objects.filter(followee_id=review.user_id).values_list('follower_id', flat=True)
+    TimelineEntry.objects.bulk_create(
+        [
+            TimelineEntry(user_id=follower_id, review_id=review.id, author_id=review.user_id)
+            for follower_id in follower_ids.iterator()
+        ],
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+
+
+def backfill(follower_id, followee_id):
+    """フォロー直後に直近のレビューを取り込む"""
+    review_ids = Review.objects.filter(
+        user_id=followee_id,
+    ).order_by('-id').values_list('id', flat=True)[:BACKFILL_SIZE]
+    TimelineEntry.objects.bulk_create(
+        [TimelineEntry(user_id=follower_id, review_id=rid, author_id=followee_id) for rid in review_ids],
+        ignore_conflicts=True,
+    )
+
+
+def backfill_followers(author_id, exclude_follow_ids=()):
+    """
+    フォロワー数が TIMELINE_FANOUT_LIMIT 以下に戻った author のフォロワー全員に直近のレビューを取り込む。
+    上限を超えていた間のレビューは展開されておらず、以後は読み込み時にも取得されないため
+    """
+    review_ids = list(Review.objects.filter(
+        user_id=author_id,
+    ).order_by('-id').values_list('id', flat=True)[:BACKFILL_SIZE])
+    if not review_ids:
+        return
+    follower_ids = Follow.objects.filter(followee_id=author_id).exclude(
+        pk__in=exclude_follow_ids,
+    ).values_list('follower_id', flat=True)
+    TimelineEntry.objects.bulk_create(
+        [
+            TimelineEntry(user_id=follower_id, review_id=rid, author_id=author_id)
+            for follower_id in follower_ids.iterator()
+            for rid in review_ids
+        ],
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+
+
+def remove(follower_id, followee_id):
+    TimelineEntry.objects.filter(user_id=follower_id, author_id=followee_id).delete()
+
+
+def page(user, cursor=None, size=20):
+    """review_id の降順で size 件を返す。cursor は前ページ最後の review_id"""
+    entries = TimelineEntry.objects.filter(user=user)
+    if cursor is not None:
+        entries = entries.filter(review_id__lt=cursor)
+    review_ids = set(entries.order_by('-review_id').values_list('review_id', flat=True)[:size])
+
+    pulled_authors = Follow.objects.filter(
+        follower=user, followee__follower_count__gt=settings.TIMELINE_FANOUT_LIMIT,
+    ).values_list('followee_id', flat=True)
+    pulled = Review.objects.filter(user_id__in=pulled_authors)
+    if cursor is not None:
+        pulled = pulled.filter(id__lt=cursor)
+    review_ids.update(pulled.order_by('-id').values_list('id', flat=True)[:size])
+
+    review_ids = sorted(review_ids, reverse=True)[:size]
+    next_cursor = review_ids[-1] if len(review_ids) == size else None
+    return review_ids, next_cursor
@@ -1,9 +1,12 @@
+from django.urls import path
 from rest_framework.routers import DefaultRouter
 
-from .views import ReviewViewSet, ViewingLogViewSet
+from .views import LatestReviewsView, ReviewViewSet, ViewingLogViewSet
 
 router = DefaultRouter()
 router.register('reviews', ReviewViewSet, basename='review')
 router.register('viewing-logs', ViewingLogViewSet, basename='viewing-log')
 
-urlpatterns = router.urls
+urlpatterns = [
+    path('reviews/latest/', LatestReviewsView.as_view(), name='review-latest'),
+] + router.urls
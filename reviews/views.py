@@ -1,4 +1,5 @@
-from django.db.models import Count, Exists, OuterRef, Prefetch, Subquery
+from django.db.models import Count, Exists, F, OuterRef, Prefetch
+from django.utils import timezone
 
 from rest_framework import status
 from rest_framework.decorators import action
@@ -7,21 +8,38 @@ from rest_framework.response import Response
 from rest_framework.viewsets import ModelViewSet
 
 from accounts.permissions import IsOwnerOrReadOnly
-from works.models import PosterSubmission
-from .models import Like, Review, ViewingLog, ViewingLogImage
+from config import upsert
+from config.async_views import AsyncReadView, alist, serialize
+from config.fieldsets import SparseFieldsMixin
+from config.projection import ProjectionListMixin
+from theaters.models import Theater
+from works import og_cards
+from works.models import Person, PosterSubmission
+from . import timeline
+from .models import Like, Review, ViewingLog, ViewingLogImage, ViewingStat
+from .projections import ReviewProjection, ViewingLogProjection
 from .serializers import LatestReviewSerializer, ReviewSerializer, ViewingLogImageSerializer, ViewingLogSerializer
 
 
-class ReviewViewSet(ModelViewSet):
+class ReviewViewSet(SparseFieldsMixin, ProjectionListMixin, ModelViewSet):
     serializer_class = ReviewSerializer
+    projection_class = ReviewProjection
     permission_classes = [IsOwnerOrReadOnly]
+    sparse_actions = ('list', 'retrieve', 'home_timeline')
+    # 一覧・タイムラインは excerpt だけ返す（本文は詳細か ?expand=body で）
+    expandable_fields = ('body',)
 
     def get_queryset(self):
-        qs = Review.objects.select_related(
+        # 集計 annotate 付きでは Meta.ordering が効かないので明示
+        qs = Review.objects.filter(work__is_deleted=False).select_related(
             'user', 'performance__work', 'performance__theater',
-        ).annotate(_like_count=Count('likes'))
-
-        if self.request.user.is_authenticated:
+        ).order_by('-created_at')
+        if not self.wants('body'):
+            qs = qs.defer('body')
+        # ?fields= で外された集計は付けない
+        if self.wants('like_count'):
+            qs = qs.annotate(_like_count=Count('likes'))
+        if self.request.user.is_authenticated and self.wants('is_liked'):
             qs = qs.annotate(
                 _liked_by_user=Exists(
                     Like.objects.filter(review=OuterRef('pk'), user=self.request.user)
@@ -29,25 +47,39 @@ class ReviewViewSet(ModelViewSet):
             )
         work = self.request.query_params.get('work')
         if work:
-            qs = qs.filter(performance__work_id=work)
+            # review_work_created_idx で公演との JOIN なしに作品のレビューを新しい順に読む
+            qs = qs.filter(work_id=work)
         return qs
 
-    @action(detail=False, methods=['get'], permission_classes=[AllowAny])
-    def latest(self, request):
-        qs = Review.objects.select_related(
-            'user', 'performance__work', 'performance__theater',
-        ).prefetch_related(
-            Prefetch(
-                'performance__work__poster_submissions',
-                queryset=PosterSubmission.objects.filter(is_selected=True),
-                to_attr='_prefetched_selected_posters',
-            ),
-        ).filter(body__gt='').order_by('-created_at')[:10]
-        serializer = LatestReviewSerializer(qs, many=True, context={'request': request})
-        return Response(serializer.data)
+    @action(detail=True, methods=['get'], url_path='og-image', permission_classes=[AllowAny])
+    def og_image(self, request, pk=None):
+        review = self.get_object()
+        work = review.performance.work
+        theater = review.performance.theater
+        poster = PosterSubmission.objects.filter(work=work, is_selected=True).first()
+        rating_text = ''
+        if review.rating_overall:
+            rating_text = f'{"★" * (review.rating_overall - 2)} {review.get_rating_overall_display()}'
+        body = '' if review.is_spoiler else (review.title or review.body)
+        key = og_cards.cache_key(
+            'review', review.id, review.updated_at, work.updated_at, theater.updated_at,
+            poster and poster.id, poster and poster.image_url,
+        )
+        return og_cards.respond(request, key, poster, work.title, theater.name, rating_text, body=body)
+
+    @action(detail=False, methods=['get'], url_path='timeline')
+    def home_timeline(self, request):
+        cursor = request.query_params.get('cursor')
+        review_ids, next_cursor = timeline.page(
+            request.user, cursor=int(cursor) if cursor and cursor.isdigit() else None,
+        )
+        reviews = self.filter_queryset(self.get_queryset()).in_bulk(review_ids)
+        ordered = [reviews[rid] for rid in review_ids if rid in reviews]
+        serializer = self.get_serializer(ordered, many=True)
+        return Response({'results': serializer.data, 'next_cursor': next_cursor})
 
     def get_permissions(self):
-        if self.action in ('create', 'like'):
+        if self.action in ('create', 'like', 'home_timeline'):
             return [IsAuthenticated()]
         return super().get_permissions()
 
@@ -58,8 +90,7 @@ class ReviewViewSet(ModelViewSet):
     def like(self, request, pk=None):
         review = self.get_object()
         if request.method == 'POST':
-            _, created = Like.objects.get_or_create(user=request.user, review=review)
-            if created:
+            if upsert.insert_ignore(Like(user=request.user, review=review)):
                 return Response({'detail': 'いいねしました。'}, status=status.HTTP_201_CREATED)
             return Response({'detail': '既にいいね済みです。'}, status=status.HTTP_200_OK)
         else:
@@ -69,8 +100,25 @@ class ReviewViewSet(ModelViewSet):
             return Response({'detail': 'いいねしていません。'}, status=status.HTTP_404_NOT_FOUND)
 
 
-class ViewingLogViewSet(ModelViewSet):
+class LatestReviewsView(AsyncReadView):
+    async def get_data(self, request):
+        reviews = await alist(Review.objects.select_related(
+            'user', 'performance__work', 'performance__theater',
+        ).filter(work__is_deleted=False).defer('body').exclude(excerpt='').order_by('-created_at')[:10])
+        # async では prefetch_related が使えないので選択済みポスターを手動で紐付け
+        posters = {}
+        async for poster in PosterSubmission.objects.filter(
+            work_id__in={r.performance.work_id for r in reviews}, is_selected=True,
+        ):
+            posters.setdefault(poster.work_id, []).append(poster)
+        for review in reviews:
+            review.performance.work._prefetched_selected_posters = posters.get(review.performance.work_id, [])
+        return serialize(request, LatestReviewSerializer, reviews)
+
+
+class ViewingLogViewSet(SparseFieldsMixin, ProjectionListMixin, ModelViewSet):
     serializer_class = ViewingLogSerializer
+    projection_class = ViewingLogProjection
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
@@ -85,35 +133,78 @@ class ViewingLogViewSet(ModelViewSet):
                 to_attr='_prefetched_selected_posters',
             ),
             'images',
-        ).annotate(
-            _rating=Subquery(
-                Review.objects.filter(
-                    user=OuterRef('user'),
-                    performance=OuterRef('performance'),
-                ).order_by('-created_at').values('rating_overall')[:1]
-            ),
         )
+        if self.wants('rating'):
+            # ViewingLog.review への LEFT JOIN（行ごとのサブクエリにしない）
+            qs = qs.annotate(_rating=F('review__rating_overall'))
         status_filter = self.request.query_params.get('status')
         if status_filter in ('planned', 'watched'):
             qs = qs.filter(status=status_filter)
         return qs
 
     def create(self, request, *args, **kwargs):
-        performance_id = request.data.get('performance')
+        # まだ記録がなければ INSERT ... ON CONFLICT DO NOTHING の1文で作る（同時の二重送信でもエラーにしない）
+        serializer = self.get_serializer(data=request.data)
+        if serializer.is_valid():
+            log = ViewingLog(user=request.user, **serializer.validated_data)
+            if upsert.insert_ignore(log):
+                return Response(self.get_serializer(log).data, status=status.HTTP_201_CREATED)
+
+        # 既にあれば部分更新（統計の差分に変更前の値が要るので通常の save で）
         existing = ViewingLog.objects.filter(
-            user=request.user, performance_id=performance_id,
+            user=request.user, performance_id=request.data.get('performance'),
         ).first()
-
         if existing:
             serializer = self.get_serializer(existing, data=request.data, partial=True)
             serializer.is_valid(raise_exception=True)
             serializer.save()
             return Response(serializer.data, status=status.HTTP_200_OK)
-
-        serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        serializer.save(user=request.user)
-        return Response(serializer.data, status=status.HTTP_201_CREATED)
+        # 作成と同時に別のリクエストで削除された場合
+        return Response({'detail': '記録できませんでした。もう一度お試しください。'}, status=status.HTTP_409_CONFLICT)
+
+    @action(detail=False, methods=['get'])
+    def stats(self, request):
+        # 集計済みの ViewingStat を読むだけ（観劇履歴は走査しない）
+        user_stats = ViewingStat.objects.filter(user=request.user)
+        rows = user_stats.filter(
+            kind__in=[ViewingStat.KIND_YEAR, ViewingStat.KIND_MONTH, ViewingStat.KIND_RATING],
+        ).values_list('kind', 'key', 'count')
+        buckets = {ViewingStat.KIND_YEAR: {}, ViewingStat.KIND_MONTH: {}, ViewingStat.KIND_RATING: {}}
+        for kind, key, count in rows:
+            buckets[kind][key] = count
+        yearly = buckets[ViewingStat.KIND_YEAR]
+        monthly = buckets[ViewingStat.KIND_MONTH]
+        ratings = buckets[ViewingStat.KIND_RATING]
+
+        top_theaters = list(user_stats.filter(
+            kind=ViewingStat.KIND_THEATER,
+        ).order_by('-count', 'key').values_list('key', 'count')[:5])
+        top_people = list(user_stats.filter(
+            kind=ViewingStat.KIND_PERSON,
+        ).order_by('-count', 'key').values_list('key', 'count')[:5])
+        theaters = Theater.objects.in_bulk([int(k) for k, _ in top_theaters])
+        people = Person.objects.in_bulk([int(k) for k, _ in top_people])
+
+        this_year = str(timezone.localdate().year)
+        return Response({
+            'total_watched': sum(yearly.values()),
+            'this_year': yearly.get(this_year, 0),
+            'yearly': [{'year': int(y), 'count': yearly[y]} for y in sorted(yearly, reverse=True)],
+            'monthly': [{'month': m, 'count': monthly[m]} for m in sorted(monthly, reverse=True)],
+            'rating_distribution': [
+                {'rating': value, 'label': label, 'count': ratings.get(str(value), 0)}
+                for value, label in Review.RATING_CHOICES
+            ],
+            'top_theaters': [
+                {'id': t.id, 'name': t.name, 'slug': t.slug, 'count': count}
+                for key, count in top_theaters if (t := theaters.get(int(key)))
+            ],
+            'top_people': [
+                {'id': p.id, 'name': p.name, 'slug': p.slug, 'count': count}
+                for key, count in top_people if (p := people.get(int(key)))
+            ],
+        })
 
     @action(detail=True, methods=['post'], url_path='images')
     def add_image(self, request, pk=None):
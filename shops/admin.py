@@ -1,8 +1,9 @@
 from django.contrib import admin
 
+from config.admin_mixins import LargeTableAdminMixin
 from .models import (
     Coupon, CouponUseLog, Shop, ShopClickLog,
-    ShopPlan, ShopSubscription, ShopWantToGo, TheaterShop,
+    ShopLogDailyCount, ShopPlan, ShopSubscription, ShopWantToGo, TheaterShop,
 )
 
 
@@ -19,24 +20,44 @@ class ShopAdmin(admin.ModelAdmin):
 class TheaterShopAdmin(admin.ModelAdmin):
     list_display = ['theater', 'shop', 'sort_order', 'is_featured']
     list_filter = ['is_featured']
+    list_select_related = ['theater', 'shop']
+    autocomplete_fields = ['theater', 'shop']
 
 
 @admin.register(Coupon)
 class CouponAdmin(admin.ModelAdmin):
     list_display = ['title', 'shop', 'discount_text', 'is_active', 'start_date', 'end_date']
     list_filter = ['is_active', 'shop']
+    list_select_related = ['shop']
+    search_fields = ['title', 'shop__name']
+    autocomplete_fields = ['shop']
 
 
 @admin.register(CouponUseLog)
-class CouponUseLogAdmin(admin.ModelAdmin):
+class CouponUseLogAdmin(LargeTableAdminMixin, admin.ModelAdmin):
     list_display = ['coupon', 'user', 'performance', 'used_at']
     list_filter = ['used_at']
+    list_select_related = ['coupon', 'user', 'performance__work', 'performance__theater']
+    autocomplete_fields = ['coupon', 'user', 'performance']
+    date_hierarchy = 'used_at'
 
 
 @admin.register(ShopClickLog)
-class ShopClickLogAdmin(admin.ModelAdmin):
+class ShopClickLogAdmin(LargeTableAdminMixin, admin.ModelAdmin):
     list_display = ['shop', 'user', 'source_type', 'clicked_target', 'created_at']
     list_filter = ['source_type', 'clicked_target']
+    list_select_related = ['shop', 'user']
+    autocomplete_fields = ['shop', 'user']
+    date_hierarchy = 'created_at'
+
+
+@admin.register(ShopLogDailyCount)
+class ShopLogDailyCountAdmin(admin.ModelAdmin):
+    list_display = ['shop', 'kind', 'date', 'count']
+    list_filter = ['kind']
+    list_select_related = ['shop']
+    autocomplete_fields = ['shop']
+    date_hierarchy = 'date'
 
 
 @admin.register(ShopWantToGo)
@@ -44,6 +65,8 @@ class ShopWantToGoAdmin(admin.ModelAdmin):
     list_display = ['user', 'shop', 'created_at']
     list_filter = ['created_at']
     search_fields = ['user__username', 'shop__name']
+    list_select_related = ['user', 'shop']
+    autocomplete_fields = ['user', 'shop']
 
 
 @admin.register(ShopPlan)
@@ -56,3 +79,4 @@ class ShopPlanAdmin(admin.ModelAdmin):
 class ShopSubscriptionAdmin(admin.ModelAdmin):
     list_display = ['shop', 'plan', 'status', 'current_period_start', 'current_period_end']
     list_filter = ['status']
+    list_select_related = ['shop', 'plan']
@@ -7,7 +7,8 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from accounts.permissions import IsShopUser
-from .models import CouponUseLog, Shop, ShopClickLog
+from . import retention
+from .models import CouponUseLog, Shop, ShopClickLog, ShopLogDailyCount
 
 
 class ShopDashboardView(APIView):
@@ -20,11 +21,16 @@ class ShopDashboardView(APIView):
 
         today = timezone.now().date()
 
+        # 累計は archive_shop_logs でアーカイブ済みの件数 + 残っている行
+        archived = retention.archived_totals(shop)
         coupon_logs = CouponUseLog.objects.filter(coupon__shop=shop)
-        coupon_use_total = coupon_logs.count()
+        coupon_use_total = archived.get(ShopLogDailyCount.KIND_COUPON_USE, 0) + coupon_logs.count()
         coupon_use_today = coupon_logs.filter(used_at__date=today).count()
 
-        click_total = ShopClickLog.objects.filter(shop=shop).count()
+        click_total = (
+            archived.get(ShopLogDailyCount.KIND_CLICK, 0)
+            + ShopClickLog.objects.filter(shop=shop).count()
+        )
         click_today = ShopClickLog.objects.filter(
             shop=shop, created_at__date=today,
         ).count()
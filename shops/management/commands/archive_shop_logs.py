@@ -0,0 +1,31 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from shops import retention
+
+
+class Command(BaseCommand):
+    help = '保持期間を過ぎたクリック・クーポン利用ログを圧縮ファイルへ書き出して削除（日別件数は残す）'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=settings.SHOP_LOG_RETENTION_DAYS,
+                            help='残す日数（既定: SHOP_LOG_RETENTION_DAYS）')
+        parser.add_argument('--dir', default=settings.SHOP_LOG_ARCHIVE_DIR, help='アーカイブ先ディレクトリ')
+        parser.add_argument('--format', choices=retention.FORMATS, default='ndjson')
+        parser.add_argument('--kind', choices=list(retention.LOGS), action='append', dest='kinds',
+                            help='対象ログ（複数指定可、省略時はすべて）')
+
+    def handle(self, *args, **options):
+        # ダッシュボードの「今日」「直近7日」は残っている行から数える
+        if options['days'] < 7:
+            raise CommandError('--days は7以上にしてください')
+        cutoff = timezone.localtime().replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=options['days'])
+        results = {
+            kind: retention.archive(kind, cutoff, options['dir'], options['format'])
+            for kind in options['kinds'] or retention.LOGS
+        }
+        summary = ' '.join(f'{kind}={count}' for kind, count in results.items())
+        self.stdout.write(self.style.SUCCESS(f'完了: {summary}（{cutoff:%Y-%m-%d} より前）'))
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.29 on 2026-10-19 13:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shops', '0005_add_shop_want_to_go'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='couponuselog',
+            index=models.Index(fields=['used_at'], name='coupon_use_log_used_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='shopclicklog',
+            index=models.Index(fields=['created_at'], name='shop_click_log_created_at_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 4.2.29 on 2026-10-19 13:56
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shops', '0006_log_date_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ShopLogDailyCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('click', 'クリック'), ('coupon_use', 'クーポン利用')], max_length=20)),
+                ('date', models.DateField()),
+                ('count', models.IntegerField(default=0)),
+                ('shop', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_log_counts', to='shops.shop')),
+            ],
+            options={
+                'ordering': ['-date'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='shoplogdailycount',
+            constraint=models.UniqueConstraint(fields=('shop', 'kind', 'date'), name='unique_shop_log_daily_count'),
+        ),
+    ]
@@ -84,6 +84,9 @@ class CouponUseLog(models.Model):
 
     class Meta:
         ordering = ['-used_at']
+        indexes = [
+            models.Index(fields=['used_at'], name='coupon_use_log_used_at_idx'),
+        ]
 
     def __str__(self):
         return f'{self.user} used {self.coupon.title}'
@@ -101,6 +104,9 @@ class ShopClickLog(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['created_at'], name='shop_click_log_created_at_idx'),
+        ]
 
 
 class ShopWantToGo(models.Model):
@@ -146,3 +152,27 @@ class ShopSubscription(models.Model):
 
     def __str__(self):
         return f'{self.shop.name} - {self.plan.name}'
+
+
+class ShopLogDailyCount(models.Model):
+    """アーカイブ済みのクリック・クーポン利用ログの店舗・日別件数（archive_shop_logs が集計）"""
+    KIND_CLICK = 'click'
+    KIND_COUPON_USE = 'coupon_use'
+    KIND_CHOICES = [
+        (KIND_CLICK, 'クリック'),
+        (KIND_COUPON_USE, 'クーポン利用'),
+    ]
+
+    shop = models.ForeignKey(Shop, on_delete=models.CASCADE, related_name='archived_log_counts')
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    date = models.DateField()
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        ordering = ['-date']
+        constraints = [
+            models.UniqueConstraint(fields=['shop', 'kind', 'date'], name='unique_shop_log_daily_count'),
+        ]
+
+    def __str__(self):
+        return f'{self.shop_id} {self.kind} {self.date} = {self.count}'
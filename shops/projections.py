@@ -0,0 +1,34 @@
+from config.projection import Projection
+from .models import Coupon, Shop
+from .serializers import ShopSerializer
+
+
+class ShopProjection(Projection):
+    serializer_class = ShopSerializer
+
+    def prepare(self, rows):
+        # _prefetched_active_coupons[0] 相当（Coupon の既定の並び順で先頭）
+        self.coupons = {}
+        if not self.wants('coupon_text'):
+            return
+        coupon_rows = Coupon.objects.filter(
+            shop_id__in=[row['id'] for row in rows], is_active=True,
+        ).values('shop_id', 'discount_text', 'title')
+        for row in coupon_rows:
+            self.coupons.setdefault(row['shop_id'], row)
+
+    def get_image_src(self, row):
+        if row['image_url']:
+            return row['image_url']
+        if row['image']:
+            return self.file_url(Shop._meta.get_field('image'), row['image'])
+        return None
+
+    def get_coupon_text(self, row):
+        coupon = self.coupons.get(row['id'])
+        if coupon:
+            return coupon['discount_text'] or coupon['title']
+        return None
+
+    def get_is_want_to_go(self, row):
+        return row.get('_is_want_to_go', False)
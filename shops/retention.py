@@ -0,0 +1,128 @@
+"""
+クリック・クーポン利用ログ（ShopClickLog / CouponUseLog）の保持期間とアーカイブ。
+
+保持期間（SHOP_LOG_RETENTION_DAYS）より古い行を月ごと・id 順のバッチで
+gzip 圧縮した NDJSON / CSV ファイルへ書き出し、店舗・日別の件数を ShopLogDailyCount に
+足してから元の行を削除する。ファイルは「テーブル名-年月-先頭id-末尾id」で、途中で失敗して
+再実行しても同じバッチは同じファイル名に上書きされる。
+ダッシュボードの累計はアーカイブ済みの件数 + 残っている行の件数で出す。
+"""
+import csv
+import datetime
+import gzip
+import json
+import os
+from collections import Counter, defaultdict
+from functools import reduce
+from operator import or_
+from pathlib import Path
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import F, Q, Sum
+from django.utils import timezone
+
+from .models import CouponUseLog, ShopClickLog, ShopLogDailyCount
+
+BATCH_SIZE = 5000
+MATCH_CHUNK_SIZE = 200
+FORMATS = ('ndjson', 'csv')
+
+LOGS = {
+    ShopLogDailyCount.KIND_CLICK: {
+        'model': ShopClickLog,
+        'date_field': 'created_at',
+        'fields': ['id', 'shop_id', 'user_id', 'source_type', 'clicked_target', 'created_at'],
+        'expressions': {},
+    },
+    ShopLogDailyCount.KIND_COUPON_USE: {
+        'model': CouponUseLog,
+        'date_field': 'used_at',
+        'fields': ['id', 'coupon_id', 'shop_id', 'user_id', 'performance_id', 'used_at'],
+        'expressions': {'shop_id': F('coupon__shop_id')},
+    },
+}
+
+
+def archived_totals(shop):
+    """{kind: アーカイブ済みの件数}"""
+    return dict(ShopLogDailyCount.objects.filter(shop=shop).values('kind').annotate(
+        total=Sum('count'),
+    ).values_list('kind', 'total'))
+
+
+def _next_month(value):
+    local = timezone.localtime(value)
+    first = local.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    return (first + datetime.timedelta(days=32)).replace(day=1)
+
+
+def _write(path, rows, fields, fmt):
+    tmp = path.with_name(path.name + '.tmp')
+    with gzip.open(tmp, 'wt', encoding='utf-8', newline='') as f:
+        if fmt == 'csv':
+            writer = csv.DictWriter(f, fieldnames=fields)
+            writer.writeheader()
+            writer.writerows(rows)
+        else:
+            for row in rows:
+                record = {name: row[name] for name in fields}
+                f.write(json.dumps(record, cls=DjangoJSONEncoder, ensure_ascii=False) + '\n')
+    # 書き終えたファイルだけが正式な名前で見えるようにする
+    os.replace(tmp, path)
+
+
+def _chunks(keys):
+    # OR 条件が長くなりすぎないように分ける（SQLite の式の深さの上限など）
+    for i in range(0, len(keys), MATCH_CHUNK_SIZE):
+        yield keys[i:i + MATCH_CHUNK_SIZE]
+
+
+def _add_counts(kind, counts):
+    """{(shop_id, date): 件数} を ShopLogDailyCount に加算（同じ件数の MATCH_CHUNK_SIZE 件ごとに UPDATE 1回）"""
+    ShopLogDailyCount.objects.bulk_create([
+        ShopLogDailyCount(shop_id=shop_id, kind=kind, date=date)
+        for shop_id, date in counts
+    ], ignore_conflicts=True)
+    by_count = defaultdict(list)
+    for key, n in counts.items():
+        by_count[n].append(key)
+    for n, keys in by_count.items():
+        for chunk in _chunks(keys):
+            match = reduce(or_, (Q(shop_id=shop_id, date=date) for shop_id, date in chunk))
+            ShopLogDailyCount.objects.filter(match, kind=kind).update(count=F('count') + n)
+
+
+def archive(kind, cutoff, directory, fmt='ndjson', batch_size=BATCH_SIZE):
+    """cutoff より古い行をアーカイブして削除し、件数を返す"""
+    spec = LOGS[kind]
+    model, date_field, fields = spec['model'], spec['date_field'], spec['fields']
+    expressions = spec['expressions']
+    columns = [name for name in fields if name not in expressions]
+    table = model._meta.db_table
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    old_rows = model.objects.filter(**{f'{date_field}__lt': cutoff}).order_by('id')
+
+    archived = 0
+    while True:
+        oldest = old_rows.order_by(date_field).values_list(date_field, flat=True).first()
+        if oldest is None:
+            return archived
+        # 1ファイルに1か月分だけ入るよう、月の境界で区切る
+        bound = min(_next_month(oldest), cutoff)
+        month = timezone.localtime(oldest).strftime('%Y-%m')
+        month_rows = old_rows.filter(**{f'{date_field}__lt': bound})
+        while True:
+            rows = list(month_rows.values(*columns, **expressions)[:batch_size])
+            if not rows:
+                break
+            first, last = rows[0]['id'], rows[-1]['id']
+            _write(directory / f'{table}-{month}-{first}-{last}.{fmt}.gz', rows, fields, fmt)
+            counts = Counter(
+                (row['shop_id'], timezone.localdate(row[date_field])) for row in rows
+            )
+            with transaction.atomic():
+                _add_counts(kind, counts)
+                month_rows.filter(id__gte=first, id__lte=last).delete()
+            archived += len(rows)
@@ -19,6 +19,12 @@ class ShopSerializer(serializers.ModelSerializer):
             'is_featured', 'is_active', 'created_at', 'updated_at',
             'is_want_to_go',
         ]
+        # ?fields= での絞り込み用（各フィールドが読むモデルのパス。'_' 始まりは annotate）
+        field_paths = {
+            'image_src': ['image_url', 'image'],
+            'coupon_text': ['coupons__discount_text', 'coupons__title'],
+            'is_want_to_go': ['_is_want_to_go'],
+        }
 
     def get_is_want_to_go(self, obj):
         request = self.context.get('request')
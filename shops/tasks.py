@@ -0,0 +1,16 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from jobs.queue import task
+from . import retention
+
+
+@task('shops.archive_logs', schedule='0 3 * * *')
+def archive_logs():
+    # archive_shop_logs コマンドと同じく、保持日数より前の日付の行をアーカイブ
+    today = timezone.localtime().replace(hour=0, minute=0, second=0, microsecond=0)
+    cutoff = today - timedelta(days=settings.SHOP_LOG_RETENTION_DAYS)
+    for kind in retention.LOGS:
+        retention.archive(kind, cutoff, settings.SHOP_LOG_ARCHIVE_DIR)
@@ -2,7 +2,7 @@ from django.urls import path
 from rest_framework.routers import DefaultRouter
 
 from .dashboard_views import ShopDashboardView
-from .views import CouponViewSet, ShopViewSet
+from .views import CouponViewSet, FeaturedShopsView, ShopViewSet
 
 router = DefaultRouter()
 router.register('shops', ShopViewSet)
@@ -10,4 +10,5 @@ router.register('coupons', CouponViewSet)
 
 urlpatterns = [
     path('dashboard/', ShopDashboardView.as_view(), name='shop-dashboard'),
+    path('shops/featured/', FeaturedShopsView.as_view(), name='shop-featured'),
 ] + router.urls
@@ -8,13 +8,19 @@ from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.viewsets import ReadOnlyModelViewSet
 
+from config import upsert
+from config.async_views import AsyncReadView, alist, serialize
+from config.fieldsets import SparseFieldsMixin
+from config.projection import ProjectionListMixin
 from .models import Coupon, CouponUseLog, Shop, ShopClickLog, ShopWantToGo, TheaterShop
+from .projections import ShopProjection
 from .serializers import CouponSerializer, ShopSerializer
 
 
-class ShopViewSet(ReadOnlyModelViewSet):
+class ShopViewSet(SparseFieldsMixin, ProjectionListMixin, ReadOnlyModelViewSet):
     queryset = Shop.objects.filter(is_active=True)
     serializer_class = ShopSerializer
+    projection_class = ShopProjection
     lookup_field = 'slug'
     permission_classes = [AllowAny]
 
@@ -42,7 +48,7 @@ class ShopViewSet(ReadOnlyModelViewSet):
 
         # N+1回避: is_want_to_go をアノテーション
         user = self.request.user
-        if user.is_authenticated:
+        if user.is_authenticated and self.wants('is_want_to_go'):
             qs = qs.annotate(
                 _is_want_to_go=Exists(
                     ShopWantToGo.objects.filter(user=user, shop_id=OuterRef('pk'))
@@ -58,20 +64,6 @@ class ShopViewSet(ReadOnlyModelViewSet):
         ).order_by('_featured_rank', 'featured_order', 'name')
         return qs
 
-    @action(detail=False, methods=['get'], permission_classes=[AllowAny])
-    def featured(self, request):
-        shops = Shop.objects.filter(
-            is_active=True, is_featured=True,
-        ).prefetch_related(
-            Prefetch(
-                'coupons',
-                queryset=Coupon.objects.filter(is_active=True),
-                to_attr='_prefetched_active_coupons',
-            ),
-        ).order_by('featured_order')[:6]
-        serializer = self.get_serializer(shops, many=True)
-        return Response(serializer.data)
-
     @action(detail=True, methods=['post'], permission_classes=[AllowAny])
     def click(self, request, slug=None):
         shop = self.get_object()
@@ -94,8 +86,7 @@ class ShopViewSet(ReadOnlyModelViewSet):
     def want_to_go(self, request, slug=None):
         shop = self.get_object()
         if request.method == 'POST':
-            _, created = ShopWantToGo.objects.get_or_create(user=request.user, shop=shop)
-            if created:
+            if upsert.insert_ignore(ShopWantToGo(user=request.user, shop=shop)):
                 return Response({'detail': '行きたい店に追加しました。'}, status=status.HTTP_201_CREATED)
             return Response({'detail': '既に登録済みです。'}, status=status.HTTP_200_OK)
         else:
@@ -123,7 +114,29 @@ class ShopViewSet(ReadOnlyModelViewSet):
         return Response(serializer.data)
 
 
-class CouponViewSet(ReadOnlyModelViewSet):
+class FeaturedShopsView(AsyncReadView):
+    authenticate = True
+
+    async def get_data(self, request):
+        shops = await alist(Shop.objects.filter(
+            is_active=True, is_featured=True,
+        ).order_by('featured_order')[:6])
+        shop_ids = [shop.id for shop in shops]
+        coupons = {}
+        async for coupon in Coupon.objects.filter(shop_id__in=shop_ids, is_active=True):
+            coupons.setdefault(coupon.shop_id, []).append(coupon)
+        want_to_go = set()
+        if request.user.is_authenticated:
+            want_to_go = set(await alist(ShopWantToGo.objects.filter(
+                user=request.user, shop_id__in=shop_ids,
+            ).values_list('shop_id', flat=True)))
+        for shop in shops:
+            shop._prefetched_active_coupons = coupons.get(shop.id, [])
+            shop._is_want_to_go = shop.id in want_to_go
+        return serialize(request, ShopSerializer, shops)
+
+
+class CouponViewSet(SparseFieldsMixin, ReadOnlyModelViewSet):
     queryset = Coupon.objects.filter(is_active=True).select_related('shop')
     serializer_class = CouponSerializer
     permission_classes = [AllowAny]
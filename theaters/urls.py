@@ -1,8 +1,11 @@
+from django.urls import path
 from rest_framework.routers import DefaultRouter
 
-from .views import TheaterViewSet
+from .views import TheaterListView, TheaterViewSet
 
 router = DefaultRouter()
 router.register('theaters', TheaterViewSet)
 
-urlpatterns = router.urls
+urlpatterns = [
+    path('theaters/', TheaterListView.as_view(), name='theater-list-async'),
+] + router.urls
@@ -2,13 +2,15 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.viewsets import ReadOnlyModelViewSet
 
+from config.async_views import AsyncReadView, apaginate
+from config.fieldsets import SparseFieldsMixin
 from shops.models import TheaterShop
 from shops.serializers import ShopSerializer
 from .models import Theater
 from .serializers import TheaterSerializer
 
 
-class TheaterViewSet(ReadOnlyModelViewSet):
+class TheaterViewSet(SparseFieldsMixin, ReadOnlyModelViewSet):
     queryset = Theater.objects.filter(is_active=True)
     serializer_class = TheaterSerializer
     lookup_field = 'slug'
@@ -32,3 +34,14 @@ class TheaterViewSet(ReadOnlyModelViewSet):
             shops.append(ts.shop)
         serializer = ShopSerializer(shops, many=True)
         return Response(serializer.data)
+
+
+class TheaterListView(AsyncReadView):
+    cache_response = True
+
+    async def get_data(self, request):
+        qs = Theater.objects.filter(is_active=True)
+        q = request.GET.get('q')
+        if q:
+            qs = qs.filter(name__icontains=q)
+        return await apaginate(request, qs, TheaterSerializer)
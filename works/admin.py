@@ -8,6 +8,7 @@ class WorkAdmin(admin.ModelAdmin):
     list_display = ['title', 'created_by', 'is_approved', 'created_at']
     list_filter = ['is_approved']
     search_fields = ['title']
+    list_select_related = ['created_by']
     prepopulated_fields = {'slug': ('title',)}
 
 
@@ -16,12 +17,14 @@ class PersonAdmin(admin.ModelAdmin):
     list_display = ['name', 'phonetic', 'created_by', 'is_approved']
     list_filter = ['is_approved']
     search_fields = ['name', 'phonetic']
+    list_select_related = ['created_by']
     prepopulated_fields = {'slug': ('name',)}
 
 
 class PerformanceCastInline(admin.TabularInline):
     model = PerformanceCast
     extra = 1
+    autocomplete_fields = ['person']
 
 
 @admin.register(Performance)
@@ -29,6 +32,8 @@ class PerformanceAdmin(admin.ModelAdmin):
     list_display = ['work', 'theater', 'company_name', 'start_date', 'end_date', 'is_approved']
     list_filter = ['is_approved', 'start_date']
     search_fields = ['work__title', 'theater__name', 'company_name']
+    list_select_related = ['work', 'theater']
+    autocomplete_fields = ['work', 'theater']
     inlines = [PerformanceCastInline]
 
 
@@ -37,4 +42,6 @@ class PosterSubmissionAdmin(admin.ModelAdmin):
     list_display = ['work', 'user', 'is_selected', 'image_url', 'created_at']
     list_filter = ['is_selected']
     search_fields = ['work__title', 'user__username']
+    list_select_related = ['work', 'user']
+    autocomplete_fields = ['work', 'user']
     readonly_fields = ['image_url', 'image_public_id', 'image_width', 'image_height', 'image_format']
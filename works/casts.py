@@ -0,0 +1,79 @@
+"""
+公演キャストの一括登録（POST /api/performances/<id>/add_casts/ と import_casts）。
+
+人物は name_key の IN 検索1回で解決し、未登録の人物とキャストはそれぞれ
+bulk_create(ignore_conflicts=True) 1回で作る（name_key / (公演, 人物) の一意制約で同時登録にも耐える）。
+bulk_create はシグナルを通らないので、観劇統計・出演作・作品ページのキャッシュ更新はここで行う。
+"""
+import uuid
+
+from django.db import transaction
+from django.utils.text import slugify
+
+from reviews import stats
+from reviews.models import ViewingLog, ViewingStat
+from . import filmography, work_page
+from .models import PerformanceCast, Person, normalize_name
+
+MAX_CASTS = 200
+
+
+def _slugs(names):
+    """新規人物の slug（既存・同じバッチ内と重なるものは乱数で回避）"""
+    bases = {name: slugify(name, allow_unicode=True)[:200] or f'item-{uuid.uuid4().hex[:8]}' for name in names}
+    taken = set(Person.objects.filter(slug__in=bases.values()).values_list('slug', flat=True))
+    slugs = {}
+    for name, slug in bases.items():
+        if slug in taken:
+            slug = f'{slug[:187]}-{uuid.uuid4().hex[:8]}'
+        taken.add(slug)
+        slugs[name] = slug
+    return slugs
+
+
+def resolve_people(names, created_by=None, is_approved=False):
+    """名前のリスト → {name_key: Person}。未登録の人物はまとめて作る"""
+    names_by_key = {}
+    for name in names:
+        names_by_key.setdefault(normalize_name(name), name)
+    people = {p.name_key: p for p in Person.objects.filter(name_key__in=names_by_key)}
+    missing = {key: name for key, name in names_by_key.items() if key not in people}
+    if missing:
+        slugs = _slugs(missing.values())
+        Person.objects.bulk_create([
+            Person(name=name, name_key=key, slug=slugs[name], created_by=created_by, is_approved=is_approved)
+            for key, name in missing.items()
+        ], ignore_conflicts=True)
+        # ignore_conflicts では pk が返らないので取り直す
+        people.update((p.name_key, p) for p in Person.objects.filter(name_key__in=missing))
+    return people
+
+
+def add_casts(performance, entries, created_by=None, is_approved=False):
+    """[{name, role_name}] を公演のキャストに追加し、作ったキャスト数を返す（既存のキャストは変更しない）"""
+    entries = [(e['name'].strip(), (e.get('role_name') or '').strip()) for e in entries]
+    with transaction.atomic():
+        people = resolve_people([name for name, _ in entries], created_by, is_approved)
+        existing = set(PerformanceCast.objects.filter(
+            performance=performance, person__in=people.values(),
+        ).values_list('person_id', flat=True))
+        new_casts = {}
+        for name, role_name in entries:
+            person = people[normalize_name(name)]
+            if person.pk not in existing and person.pk not in new_casts:
+                new_casts[person.pk] = PerformanceCast(performance=performance, person=person, role_name=role_name)
+        if not new_casts:
+            return 0
+        PerformanceCast.objects.bulk_create(new_casts.values(), ignore_conflicts=True)
+
+        # reviews/signals.py の cast_changed 相当をまとめて反映
+        user_ids = ViewingLog.objects.filter(
+            performance=performance, status='watched',
+        ).values_list('user_id', flat=True)
+        stats.apply_deltas({
+            (user_id, ViewingStat.KIND_PERSON, str(person_id)): 1
+            for user_id in user_ids for person_id in new_casts
+        })
+        filmography.bump(*new_casts)
+        work_page.bump(performance.work_id)
+    return len(new_casts)
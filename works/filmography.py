@@ -0,0 +1,83 @@
+"""
+人物の出演作一覧（GET /api/people/<slug>/performances/）。
+
+PerformanceCast(person) → Performance → Work / Theater を1クエリで結合し、
+公演開始日の降順でキーセットページングする（cursor は前ページ最後の「開始日_キャストID」）。
+OFFSET を使わないので、出演作が多い人物でも後ろのページのコストは変わらない。
+
+ページは「人物ごとのバージョン」をキーにキャッシュする。バージョンは出演・公演・作品の
+保存/削除時に works/signals.py が更新する（劇場名などの変更は FILMOGRAPHY_CACHE_TIMEOUT で反映）。
+"""
+import datetime
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+
+from .models import PerformanceCast
+from .serializers import FilmographySerializer
+
+
+def _version_key(person_id):
+    return f'filmography:version:{person_id}'
+
+
+def version(person_id):
+    # 初期値も時刻にして、バージョンのキーが消えても古いエントリと衝突しないようにする
+    return cache.get_or_set(_version_key(person_id), time.time_ns(), None)
+
+
+def bump(*person_ids):
+    """出演作一覧のキャッシュを無効化（コミット後に新しいバージョンへ）"""
+    person_ids = {person_id for person_id in person_ids if person_id}
+    if person_ids:
+        transaction.on_commit(lambda: cache.set_many(
+            {_version_key(person_id): time.time_ns() for person_id in person_ids}, None,
+        ))
+
+
+def parse_cursor(value):
+    """「開始日_キャストID」→ (date, id)。不正な値は None（先頭ページ）"""
+    start_date, _, cast_id = (value or '').partition('_')
+    try:
+        return datetime.date.fromisoformat(start_date), int(cast_id)
+    except ValueError:
+        return None
+
+
+def page(person_id, cursor=None, size=None):
+    """開始日の降順（同日ならキャストIDの降順）で size 件と次のカーソルを返す"""
+    size = size or settings.FILMOGRAPHY_PAGE_SIZE
+    casts = PerformanceCast.objects.filter(
+        person_id=person_id, performance__work__is_deleted=False,
+    ).select_related(
+        'performance__work', 'performance__theater',
+    ).order_by('-performance__start_date', '-id')
+    if cursor is not None:
+        start_date, cast_id = cursor
+        casts = casts.filter(
+            Q(performance__start_date__lt=start_date)
+            | Q(performance__start_date=start_date, id__lt=cast_id),
+        )
+    # 1件多く取って次ページの有無を判定する
+    casts = list(casts[:size + 1])
+    next_cursor = None
+    if len(casts) > size:
+        casts = casts[:size]
+        last = casts[-1]
+        next_cursor = f'{last.performance.start_date.isoformat()}_{last.id}'
+    return casts, next_cursor
+
+
+def get(person_id, cursor=None):
+    cursor = parse_cursor(cursor)
+    cursor_key = f'{cursor[0].isoformat()}_{cursor[1]}' if cursor else ''
+    key = f'filmography:{person_id}:{version(person_id)}:{cursor_key}'
+    data = cache.get(key)
+    if data is None:
+        casts, next_cursor = page(person_id, cursor)
+        data = {'results': FilmographySerializer(casts, many=True).data, 'next_cursor': next_cursor}
+        cache.set(key, data, settings.FILMOGRAPHY_CACHE_TIMEOUT)
+    return data
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from works import recommendations
+
+
+class Command(BaseCommand):
+    help = '観劇記録の共起と出演者の重なりから類似作品・おすすめ作品を再計算'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=20, help='作品・ユーザーごとに保存する件数')
+
+    def handle(self, *args, **options):
+        similar, recommended = recommendations.build(top_n=options['top'])
+        self.stdout.write(self.style.SUCCESS(
+            f'完了: 類似作品={similar} おすすめ={recommended}'
+        ))
@@ -0,0 +1,352 @@
+"""
+ベンチマーク用の大規模な合成データを生成する。
+
+同じ --seed なら同じデータ（空のデータベースに対しては同じ id）になる。
+人気は偏らせる（作品・公演・人物・店舗・レビューは id の小さいものほど選ばれやすく、
+ユーザーごとの件数はパレート分布）。すべて bulk_create でバッチ投入するのでシグナルは通らず、
+評価集計（WorkRating / PerformanceRating）は最後に再計算する（観劇統計は --with-stats）。
+
+  python manage.py generate_dataset                # 既定の規模（作品10万・公演100万・ログ1000万…）
+  python manage.py generate_dataset --scale 0.01   # 1/100 の規模
+"""
+import datetime
+import random
+from array import array
+from contextlib import contextmanager
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import OuterRef, Subquery
+
+from accounts.models import User
+from reviews import ratings, stats
+from reviews.models import Like, Review, ViewingLog, make_excerpt
+from shops.models import Coupon, Shop, ShopClickLog
+from theaters.models import Theater
+from works.models import Performance, PerformanceCast, Person, Work, normalize_name
+
+SIZES = {
+    'users': 200_000,
+    'theaters': 500,
+    'works': 100_000,
+    'people': 100_000,
+    'performances': 1_000_000,
+    'casts': 1_000_000,
+    'viewing_logs': 10_000_000,
+    'reviews': 10_000_000,
+    'likes': 10_000_000,
+    'shops': 5_000,
+    'coupons': 10_000,
+    'click_logs': 50_000_000,
+}
+
+TITLE_WORDS = [
+    '星', '夜', '光', '海', '風', '花', '夢', '約束', '迷宮', '王国', '記憶', '旅', '鏡', '月', '翼',
+    '物語', '嵐', '庭', '扉', '歌', '森', '街', '影', '雪', '炎', '時計', '手紙', '舞踏会', '航海', '楽園',
+]
+TITLE_PATTERNS = ['{a}の{b}', '{a}と{b}', '{a}降る{b}', 'さよなら、{a}', '{a}の{b}へ', '{a}を待つ{b}']
+SURNAMES = ['佐藤', '鈴木', '高橋', '田中', '伊藤', '渡辺', '山本', '中村', '小林', '加藤', '吉田', '山田', '松本', '井上', '木村']
+GIVEN_NAMES = ['翔', '蓮', '陽菜', '結衣', '大和', '美咲', '悠真', '葵', '湊', '凛', '颯太', '芽依', '律', '紬', '朝陽']
+REVIEW_PHRASES = [
+    '歌唱が素晴らしかった。', '二幕の演出に圧倒された。', '初演より良くなっていた。', '音響が少し気になった。',
+    'カーテンコールで泣いた。', '脚本の構成が見事。', 'アンサンブルの迫力がすごい。', '席からの見え方も良かった。',
+    'また観に行きたい。', '原作ファンとしても満足。',
+]
+AREAS = ['日比谷', '渋谷', '新宿', '池袋', '銀座', '梅田', '博多', '名古屋', '横浜', '下北沢']
+SOURCE_TYPES = ['theater', 'work', 'review', 'search']
+CLICKED_TARGETS = ['website', 'map', 'instagram', 'phone', 'coupon']
+
+START = datetime.date(2015, 1, 1)
+DAYS = (datetime.date(2026, 12, 31) - START).days
+
+
+def skewed(rng, n, skew=2.5):
+    """0..n-1 の添字。小さい添字ほど選ばれやすい（skew が大きいほど偏る）"""
+    return int(n * rng.random() ** skew)
+
+
+def allocate(rng, owners, total, alpha=1.2, cap=None):
+    """total 件をパレート分布の重みで owners 人に配分した件数のリスト"""
+    weights = [rng.paretovariate(alpha) for _ in range(owners)]
+    scale = total / sum(weights)
+    counts = [int(w * scale + rng.random()) for w in weights]
+    return [min(c, cap) for c in counts] if cap is not None else counts
+
+
+def distinct_picks(rng, n, k, skew):
+    """0..n-1 から偏りのある重複なしの k 個"""
+    k = min(k, n // 2 or n)
+    picks = set()
+    while len(picks) < k:
+        picks.add(skewed(rng, n, skew))
+    return sorted(picks)
+
+
+def at(date, rng):
+    return datetime.datetime.combine(
+        date, datetime.time(rng.randrange(24), rng.randrange(60), rng.randrange(60)),
+        tzinfo=datetime.timezone.utc,
+    )
+
+
+@contextmanager
+def keep_timestamps(*models):
+    """auto_now / auto_now_add を止め、生成した日時をそのまま保存する"""
+    saved = []
+    for model in models:
+        for field in model._meta.concrete_fields:
+            if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False):
+                saved.append((field, field.auto_now, field.auto_now_add))
+                field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+class Command(BaseCommand):
+    help = 'ベンチマーク用の大規模な合成データを seed から決定的に生成（空のデータベースで実行）'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=1, help='乱数の seed')
+        parser.add_argument('--scale', type=float, default=1.0, help='既定の件数に掛ける倍率')
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--with-stats', action='store_true', help='観劇統計（ViewingStat）も再計算する')
+
+    def handle(self, *args, **options):
+        if Work.objects.exists() or Performance.objects.exists():
+            raise CommandError('作品・公演のない空のデータベースで実行してください')
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        self.sizes = {name: max(1, int(size * options['scale'])) for name, size in SIZES.items()}
+
+        models = [User, Theater, Work, Person, Performance, PerformanceCast,
+                  ViewingLog, Review, Like, Shop, Coupon, ShopClickLog]
+        with keep_timestamps(*models):
+            users = self.generate_users()
+            theaters = self.generate_theaters()
+            works = self.generate_works()
+            people = self.generate_people()
+            performances, start_days, performance_works = self.generate_performances(works, theaters)
+            self.generate_casts(performances, people)
+            self.generate_viewing_logs(users, performances, start_days)
+            reviews = self.generate_reviews(users, performances, start_days, performance_works)
+            self.link_reviews()
+            self.generate_likes(users, reviews)
+            shops = self.generate_shops()
+            self.generate_coupons(shops)
+            self.generate_click_logs(users, shops)
+
+        performance_rows, work_rows = ratings.rebuild()
+        self.stdout.write(f'評価集計: 公演={performance_rows} 作品={work_rows}')
+        if options['with_stats']:
+            self.stdout.write(f'観劇統計: {stats.rebuild()}')
+        summary = ' '.join(f'{name}={size}' for name, size in self.sizes.items())
+        self.stdout.write(self.style.SUCCESS(f'完了: {summary}'))
+
+    def insert(self, model, objects, ids=None):
+        """objects をバッチごとに bulk_create。ids を渡すと作成した pk を追加する"""
+        label = model._meta.verbose_name_plural
+        batch, total = [], 0
+
+        def flush():
+            with transaction.atomic():
+                created = model.objects.bulk_create(batch, batch_size=self.batch_size)
+            if ids is not None:
+                if created and created[0].pk is None:
+                    raise CommandError('bulk_create が pk を返さないデータベースには対応していません')
+                ids.extend(obj.pk for obj in created)
+
+        for obj in objects:
+            batch.append(obj)
+            if len(batch) >= self.batch_size:
+                flush()
+                total += len(batch)
+                batch = []
+                if total % (self.batch_size * 100) == 0:
+                    self.stdout.write(f'  {label}: {total}')
+        if batch:
+            flush()
+            total += len(batch)
+        self.stdout.write(f'{label}: {total}')
+        return ids
+
+    def random_date(self):
+        return START + datetime.timedelta(days=self.rng.randrange(DAYS))
+
+    def generate_users(self):
+        rng = self.rng
+        return self.insert(User, (
+            User(
+                username=f'user{i}', email=f'user{i}@example.com', password='!',
+                display_name=f'{rng.choice(SURNAMES)}{rng.choice(GIVEN_NAMES)}',
+                date_joined=at(self.random_date(), rng),
+            )
+            for i in range(self.sizes['users'])
+        ), array('q'))
+
+    def generate_theaters(self):
+        rng = self.rng
+        return self.insert(Theater, (
+            Theater(
+                name=f'{rng.choice(AREAS)}劇場{i}', slug=f'theater-{i}', area_name=rng.choice(AREAS),
+                created_at=at(START, rng), updated_at=at(START, rng),
+            )
+            for i in range(self.sizes['theaters'])
+        ), array('q'))
+
+    def generate_works(self):
+        rng = self.rng
+
+        def works():
+            for i in range(self.sizes['works']):
+                a, b = rng.sample(TITLE_WORDS, 2)
+                created = at(self.random_date(), rng)
+                yield Work(
+                    title=rng.choice(TITLE_PATTERNS).format(a=a, b=b), slug=f'work-{i}',
+                    created_at=created, updated_at=created,
+                )
+        return self.insert(Work, works(), array('q'))
+
+    def generate_people(self):
+        rng = self.rng
+
+        def people():
+            for i in range(self.sizes['people']):
+                name = f'{rng.choice(SURNAMES)} {rng.choice(GIVEN_NAMES)}{i}'
+                created = at(self.random_date(), rng)
+                yield Person(
+                    name=name, name_key=normalize_name(name), slug=f'person-{i}', is_approved=True,
+                    created_at=created, updated_at=created,
+                )
+        return self.insert(Person, people(), array('q'))
+
+    def generate_performances(self, works, theaters):
+        rng = self.rng
+        start_days = array('i')
+        performance_works = array('q')
+
+        def performances():
+            for _ in range(self.sizes['performances']):
+                offset = rng.randrange(DAYS)
+                start_days.append(offset)
+                start = START + datetime.timedelta(days=offset)
+                created = at(start - datetime.timedelta(days=60), rng)
+                performance_works.append(works[skewed(rng, len(works))])
+                yield Performance(
+                    work_id=performance_works[-1],
+                    theater_id=theaters[skewed(rng, len(theaters), 1.5)],
+                    start_date=start, end_date=start + datetime.timedelta(days=rng.randrange(1, 60)),
+                    is_approved=True, created_at=created, updated_at=created,
+                )
+        return self.insert(Performance, performances(), array('q')), start_days, performance_works
+
+    def generate_casts(self, performances, people):
+        rng = self.rng
+        counts = allocate(rng, len(performances), self.sizes['casts'], alpha=2.0, cap=40)
+
+        def casts():
+            for performance_id, k in zip(performances, counts):
+                for index in distinct_picks(rng, len(people), k, 2.0):
+                    yield PerformanceCast(
+                        performance_id=performance_id, person_id=people[index],
+                        created_at=at(START, rng), updated_at=at(START, rng),
+                    )
+        self.insert(PerformanceCast, casts())
+
+    def per_user_performances(self, users, total, performances, start_days, skew):
+        """(user_id, 公演の添字, 観劇日) をユーザーごとに重複なしで total 件前後"""
+        rng = self.rng
+        counts = allocate(rng, len(users), total, cap=len(performances) // 2 or 1)
+        for user_id, k in zip(users, counts):
+            for index in distinct_picks(rng, len(performances), k, skew):
+                watched = START + datetime.timedelta(days=start_days[index] + rng.randrange(30))
+                yield user_id, index, watched
+
+    def generate_viewing_logs(self, users, performances, start_days):
+        rng = self.rng
+
+        def logs():
+            for user_id, index, watched in self.per_user_performances(
+                users, self.sizes['viewing_logs'], performances, start_days, 2.5,
+            ):
+                planned = rng.random() < 0.1
+                created = at(watched, rng)
+                yield ViewingLog(
+                    user_id=user_id, performance_id=performances[index],
+                    status='planned' if planned else 'watched', watched_on=None if planned else watched,
+                    created_at=created, updated_at=created,
+                )
+        self.insert(ViewingLog, logs())
+
+    def generate_reviews(self, users, performances, start_days, performance_works):
+        rng = self.rng
+
+        def reviews():
+            for user_id, index, watched in self.per_user_performances(
+                users, self.sizes['reviews'], performances, start_days, 2.5,
+            ):
+                created = at(watched, rng)
+                body = ''.join(rng.sample(REVIEW_PHRASES, rng.randrange(1, 5)))
+                yield Review(
+                    user_id=user_id, performance_id=performances[index], work_id=performance_works[index],
+                    body=body, excerpt=make_excerpt(body),
+                    rating_overall=rng.choices([None, 3, 4, 5], weights=[1, 2, 4, 5])[0],
+                    is_spoiler=rng.random() < 0.15, created_at=created, updated_at=created,
+                )
+        return self.insert(Review, reviews(), array('q'))
+
+    def link_reviews(self):
+        """ViewingLog.review（同じユーザー・公演の最新のレビュー）を id 範囲ごとの UPDATE で埋める"""
+        latest = Review.objects.filter(
+            user_id=OuterRef('user_id'), performance_id=OuterRef('performance_id'),
+        ).order_by('-created_at', '-id').values('id')[:1]
+        last_id = ViewingLog.objects.order_by('-id').values_list('id', flat=True).first() or 0
+        for start in range(0, last_id, self.batch_size):
+            ViewingLog.objects.filter(id__gt=start, id__lte=start + self.batch_size).update(
+                review=Subquery(latest),
+            )
+
+    def generate_likes(self, users, reviews):
+        rng = self.rng
+        counts = allocate(rng, len(users), self.sizes['likes'], cap=len(reviews) // 2 or 1)
+
+        def likes():
+            for user_id, k in zip(users, counts):
+                for index in distinct_picks(rng, len(reviews), k, 3.0):
+                    yield Like(user_id=user_id, review_id=reviews[index], created_at=at(self.random_date(), rng))
+        self.insert(Like, likes())
+
+    def generate_shops(self):
+        rng = self.rng
+        return self.insert(Shop, (
+            Shop(
+                name=f'{rng.choice(AREAS)}の店{i}', slug=f'shop-{i}',
+                category=rng.choice(['cafe', 'bar', 'restaurant']), is_featured=i < 20, featured_order=i,
+                created_at=at(START, rng), updated_at=at(START, rng),
+            )
+            for i in range(self.sizes['shops'])
+        ), array('q'))
+
+    def generate_coupons(self, shops):
+        rng = self.rng
+        self.insert(Coupon, (
+            Coupon(
+                shop_id=shops[skewed(rng, len(shops))], title=f'観劇割{i}', discount_text='10%OFF',
+                created_at=at(START, rng), updated_at=at(START, rng),
+            )
+            for i in range(self.sizes['coupons'])
+        ))
+
+    def generate_click_logs(self, users, shops):
+        rng = self.rng
+        self.insert(ShopClickLog, (
+            ShopClickLog(
+                shop_id=shops[skewed(rng, len(shops), 3.0)],
+                user_id=users[skewed(rng, len(users), 1.5)] if rng.random() < 0.7 else None,
+                source_type=rng.choice(SOURCE_TYPES), clicked_target=rng.choice(CLICKED_TARGETS),
+                created_at=at(self.random_date(), rng),
+            )
+            for _ in range(self.sizes['click_logs'])
+        ))
@@ -0,0 +1,64 @@
+import csv
+from collections import defaultdict
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from works import casts
+from works.models import Performance
+
+
+class Command(BaseCommand):
+    help = 'キャストをCSVから一括インポート（公演ごとにまとめて登録）'
+
+    def add_arguments(self, parser):
+        parser.add_argument('csv_file', type=str)
+        parser.add_argument('--dry-run', action='store_true', help='実際には保存しない')
+
+    def handle(self, *args, **options):
+        path = options['csv_file']
+        dry_run = options['dry_run']
+        created = skipped = errors = 0
+
+        entries = defaultdict(list)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                reader = csv.DictReader(f)
+                required = {'work_slug', 'theater_slug', 'start_date', 'name'}
+                if not required.issubset(set(reader.fieldnames or [])):
+                    raise CommandError(f'必須列が不足: {required - set(reader.fieldnames or [])}')
+
+                for i, row in enumerate(reader, start=2):
+                    key = tuple(row[col].strip() for col in ('work_slug', 'theater_slug', 'start_date'))
+                    name = row['name'].strip()
+                    if not all(key) or not name:
+                        errors += 1
+                        self.stderr.write(f'行{i}でエラー: work_slug, theater_slug, start_date, name は必須です')
+                        continue
+                    entries[key].append({'name': name, 'role_name': (row.get('role_name') or '').strip()})
+        except FileNotFoundError:
+            raise CommandError(f'ファイルが見つかりません: {path}')
+
+        for (work_slug, theater_slug, start_date), rows in entries.items():
+            label = f'{work_slug} @ {theater_slug} ({start_date})'
+            try:
+                performance = Performance.objects.filter(
+                    work__slug=work_slug, theater__slug=theater_slug, start_date=start_date,
+                ).first()
+            except ValidationError:
+                performance = None
+            if performance is None:
+                errors += len(rows)
+                self.stderr.write(f'公演 {label} が見つかりません')
+                continue
+            if dry_run:
+                self.stdout.write(f'[DRY-RUN] {label}: {len(rows)}人')
+                continue
+            count = casts.add_casts(performance, rows, is_approved=True)
+            created += count
+            skipped += len(rows) - count
+
+        prefix = '[DRY-RUN] ' if dry_run else ''
+        self.stdout.write(self.style.SUCCESS(
+            f'{prefix}完了: 作成={created} 既存={skipped} エラー={errors}'
+        ))
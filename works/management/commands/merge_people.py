@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from works import people
+from works.models import Person
+
+
+class Command(BaseCommand):
+    help = '表記ゆれで重複した人物を統合（キャストを付け替えて重複を削除）'
+
+    def add_arguments(self, parser):
+        parser.add_argument('slugs', nargs='*',
+                            help='--into に統合する人物の slug（省略時は name_key が同じ人物をすべて統合）')
+        parser.add_argument('--into', help='残す人物の slug（別名義など名前の違う人物をまとめる場合）')
+        parser.add_argument('--dry-run', action='store_true', help='統合対象を表示するだけ')
+
+    def handle(self, *args, **options):
+        if options['into']:
+            keep = Person.objects.filter(slug=options['into']).values_list('id', flat=True).first()
+            if keep is None:
+                raise CommandError(f'人物が見つかりません: {options["into"]}')
+            dups = dict(Person.objects.filter(slug__in=options['slugs']).values_list('slug', 'id'))
+            missing = set(options['slugs']) - set(dups)
+            if missing:
+                raise CommandError(f'人物が見つかりません: {", ".join(sorted(missing))}')
+            mapping = {dup: keep for dup in dups.values()}
+        else:
+            mapping = people.find_duplicates()
+
+        names = dict(Person.objects.filter(pk__in=[*mapping, *mapping.values()]).values_list('id', 'name'))
+        for dup, keep in mapping.items():
+            self.stdout.write(f'{names[dup]} → {names[keep]}')
+        if options['dry_run']:
+            self.stdout.write(self.style.SUCCESS(f'完了: 統合対象={len(mapping)}（dry-run）'))
+            return
+
+        with transaction.atomic():
+            moved, removed = people.merge(mapping)
+            refreshed = 0 if options['into'] else people.refresh_name_keys()
+        self.stdout.write(self.style.SUCCESS(
+            f'完了: 人物={len(mapping)} キャスト付け替え={moved} 重複キャスト削除={removed} キー更新={refreshed}'
+        ))
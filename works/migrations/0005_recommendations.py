@@ -0,0 +1,55 @@
+# Generated by Django 4.2.29 on 2026-10-19 13:26
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('works', '0004_postersubmission_cloudinary_fields'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SimilarWork',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField()),
+                ('rank', models.PositiveSmallIntegerField()),
+                ('similar', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='works.work')),
+                ('work', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='similar_works', to='works.work')),
+            ],
+            options={
+                'ordering': ['work', 'rank'],
+            },
+        ),
+        migrations.CreateModel(
+            name='UserRecommendation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField()),
+                ('rank', models.PositiveSmallIntegerField()),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recommendations', to=settings.AUTH_USER_MODEL)),
+                ('work', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='works.work')),
+            ],
+            options={
+                'ordering': ['user', 'rank'],
+                'indexes': [models.Index(fields=['user', 'rank'], name='user_recommendation_rank_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='userrecommendation',
+            constraint=models.UniqueConstraint(fields=('user', 'work'), name='unique_user_recommendation'),
+        ),
+        migrations.AddIndex(
+            model_name='similarwork',
+            index=models.Index(fields=['work', 'rank'], name='similar_work_rank_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='similarwork',
+            constraint=models.UniqueConstraint(fields=('work', 'similar'), name='unique_similar_work'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.29 on 2026-10-19 13:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('works', '0005_recommendations'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='performance',
+            index=models.Index(fields=['start_date'], name='performance_start_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='performancecast',
+            index=models.Index(fields=['person', 'performance'], name='cast_person_performance_idx'),
+        ),
+    ]
@@ -0,0 +1,88 @@
+import unicodedata
+from collections import defaultdict
+
+from django.db import migrations, models
+from django.db.models import Count
+
+# works.models.normalize_name のこの時点での定義（正規化ルールが変わってもこのマイグレーションの結果は変えない）
+NAME_KEY_LENGTH = 200
+_KATAKANA_TO_HIRAGANA = {code: code - 0x60 for code in range(ord('ァ'), ord('ヶ') + 1)}
+CHUNK_SIZE = 500
+
+
+def normalize_name(name):
+    name = ''.join(unicodedata.normalize('NFKC', name or '').split())
+    return name.translate(_KATAKANA_TO_HIRAGANA).casefold()[:NAME_KEY_LENGTH]
+
+
+def rebuild_person_stats(apps, performance_ids):
+    """統合した公演を観たユーザーの出演者別 ViewingStat を数え直す（reviews.stats.rebuild の person 分）"""
+    ViewingLog = apps.get_model('reviews', 'ViewingLog')
+    ViewingStat = apps.get_model('reviews', 'ViewingStat')
+    user_ids = sorted(set(ViewingLog.objects.filter(
+        performance_id__in=performance_ids, status='watched',
+    ).values_list('user_id', flat=True)))
+    for start in range(0, len(user_ids), CHUNK_SIZE):
+        chunk = user_ids[start:start + CHUNK_SIZE]
+        rows = ViewingLog.objects.filter(
+            user_id__in=chunk, status='watched', performance__casts__isnull=False,
+        ).values('user_id', 'performance__casts__person_id').annotate(n=Count('id'))
+        ViewingStat.objects.filter(user_id__in=chunk, kind='person').delete()
+        ViewingStat.objects.bulk_create([
+            ViewingStat(
+                user_id=row['user_id'], kind='person',
+                key=str(row['performance__casts__person_id']), count=row['n'],
+            )
+            for row in rows
+        ], batch_size=1000)
+
+
+def merge_and_fill(apps, schema_editor):
+    """name_key を埋め、同じキーになる人物は ID の小さい人物に統合する（統合した公演の観劇統計も数え直す）"""
+    Person = apps.get_model('works', 'Person')
+    PerformanceCast = apps.get_model('works', 'PerformanceCast')
+    groups = defaultdict(list)
+    for person in Person.objects.order_by('id'):
+        groups[normalize_name(person.name)].append(person)
+    merged_performance_ids = set()
+    for name_key, (keep, *dups) in groups.items():
+        if dups:
+            merged_performance_ids.update(
+                PerformanceCast.objects.filter(person__in=dups).values_list('performance_id', flat=True),
+            )
+            taken = set(PerformanceCast.objects.filter(person=keep).values_list('performance_id', flat=True))
+            for cast in PerformanceCast.objects.filter(person__in=dups).order_by('id'):
+                if cast.performance_id in taken:
+                    cast.delete()
+                else:
+                    taken.add(cast.performance_id)
+                    cast.person = keep
+                    cast.save(update_fields=['person'])
+            Person.objects.filter(pk__in=[dup.pk for dup in dups]).delete()
+        keep.name_key = name_key
+        keep.save(update_fields=['name_key'])
+    if merged_performance_ids:
+        rebuild_person_stats(apps, merged_performance_ids)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('works', '0006_filmography_indexes'),
+        ('reviews', '0006_viewing_stat'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='person',
+            name='name_key',
+            field=models.CharField(default='', editable=False, max_length=200),
+            preserve_default=False,
+        ),
+        migrations.RunPython(merge_and_fill, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='person',
+            name='name_key',
+            field=models.CharField(editable=False, max_length=200, unique=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.29 on 2026-10-19 14:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('works', '0007_person_name_key'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='work',
+            name='is_deleted',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+    ]
@@ -1,10 +1,25 @@
+import unicodedata
 import uuid
+from urllib.parse import urlsplit
 
 from django.conf import settings
+from django.core.exceptions import ValidationError
 from django.db import models
 from django.utils.text import slugify
 
 
+CLOUDINARY_HOST = 'res.cloudinary.com'
+
+
+def is_cloudinary_url(url):
+    """https://res.cloudinary.com/... の URL か（ホスト名で判定。部分一致ではない）"""
+    try:
+        parts = urlsplit(url or '')
+        return parts.scheme == 'https' and parts.hostname == CLOUDINARY_HOST and parts.port is None
+    except ValueError:
+        return False
+
+
 def _unique_slug(model_class, base, slug_field='slug', max_length=300):
     slug = slugify(base, allow_unicode=True)[:max_length] or f'item-{uuid.uuid4().hex[:8]}'
     if not model_class.objects.filter(**{slug_field: slug}).exists():
@@ -16,6 +31,16 @@ def _unique_slug(model_class, base, slug_field='slug', max_length=300):
     return f'{slug[:max_length - 13]}-{uuid.uuid4().hex[:8]}'
 
 
+NAME_KEY_LENGTH = 200
+_KATAKANA_TO_HIRAGANA = {code: code - 0x60 for code in range(ord('ァ'), ord('ヶ') + 1)}
+
+
+def normalize_name(name):
+    """人物名の照合キー: NFKC（全角/半角の統一）・空白除去・カタカナ→ひらがな・大文字小文字の統一"""
+    name = ''.join(unicodedata.normalize('NFKC', name or '').split())
+    return name.translate(_KATAKANA_TO_HIRAGANA).casefold()[:NAME_KEY_LENGTH]
+
+
 class Work(models.Model):
     title = models.CharField(max_length=300)
     slug = models.SlugField(max_length=300, unique=True, blank=True)
@@ -25,6 +50,8 @@ class Work(models.Model):
         null=True, related_name='created_works',
     )
     is_approved = models.BooleanField(default=True)
+    # 削除ジョブ（works/tasks.py）の完了待ち。API には出さない
+    is_deleted = models.BooleanField(default=False, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -42,6 +69,8 @@ class Work(models.Model):
 
 class Person(models.Model):
     name = models.CharField(max_length=200)
+    # normalize_name(name)。表記ゆれで同じ人物が重複登録されないよう一意にする
+    name_key = models.CharField(max_length=NAME_KEY_LENGTH, unique=True, editable=False)
     slug = models.SlugField(max_length=200, unique=True, blank=True)
     phonetic = models.CharField(max_length=200, blank=True, default='')
     profile_text = models.TextField(blank=True, default='')
@@ -58,7 +87,12 @@ class Person(models.Model):
         ordering = ['name']
         verbose_name_plural = 'people'
 
+    def clean(self):
+        if Person.objects.filter(name_key=normalize_name(self.name)).exclude(pk=self.pk).exists():
+            raise ValidationError({'name': '同じ名前の人物が既に登録されています。'})
+
     def save(self, *args, **kwargs):
+        self.name_key = normalize_name(self.name)
         if not self.slug:
             self.slug = _unique_slug(Person, self.name, max_length=200)
         super().save(*args, **kwargs)
@@ -86,6 +120,9 @@ class Performance(models.Model):
 
     class Meta:
         ordering = ['-start_date']
+        indexes = [
+            models.Index(fields=['start_date'], name='performance_start_date_idx'),
+        ]
 
     def __str__(self):
         return f'{self.work.title} @ {self.theater.name}'
@@ -103,6 +140,10 @@ class PerformanceCast(models.Model):
     class Meta:
         unique_together = ['performance', 'person']
         ordering = ['id']
+        indexes = [
+            # 人物 → 公演の結合（出演作一覧）をインデックスだけで辿る
+            models.Index(fields=['person', 'performance'], name='cast_person_performance_idx'),
+        ]
 
     def __str__(self):
         return f'{self.person.name} ({self.role_name})' if self.role_name else self.person.name
@@ -137,3 +178,45 @@ class PosterSubmission(models.Model):
 
     def __str__(self):
         return f'{self.work.title} - {self.user}'
+
+
+class SimilarWork(models.Model):
+    """作品ごとの類似作品（build_recommendations で一括生成）"""
+    work = models.ForeignKey(Work, on_delete=models.CASCADE, related_name='similar_works')
+    similar = models.ForeignKey(Work, on_delete=models.CASCADE, related_name='+')
+    score = models.FloatField()
+    rank = models.PositiveSmallIntegerField()
+
+    class Meta:
+        ordering = ['work', 'rank']
+        constraints = [
+            models.UniqueConstraint(fields=['work', 'similar'], name='unique_similar_work'),
+        ]
+        indexes = [
+            models.Index(fields=['work', 'rank'], name='similar_work_rank_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.work_id} → {self.similar_id} ({self.score:.3f})'
+
+
+class UserRecommendation(models.Model):
+    """ユーザーごとのおすすめ作品（build_recommendations で一括生成）"""
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='recommendations',
+    )
+    work = models.ForeignKey(Work, on_delete=models.CASCADE, related_name='+')
+    score = models.FloatField()
+    rank = models.PositiveSmallIntegerField()
+
+    class Meta:
+        ordering = ['user', 'rank']
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'work'], name='unique_user_recommendation'),
+        ]
+        indexes = [
+            models.Index(fields=['user', 'rank'], name='user_recommendation_rank_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.user_id} → {self.work_id} ({self.score:.3f})'
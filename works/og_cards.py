@@ -0,0 +1,164 @@
+"""
+SNSシェア用のOGP画像（1200x630）を Pillow で生成する。
+
+入力（作品・ポスター・劇場・レビューの updated_at 等）のハッシュをファイル名にして
+OG_CACHE_DIR に保存するので、同じ内容のカードは一度しか描画しない。
+"""
+import hashlib
+import io
+import os
+import tempfile
+import urllib.request
+from pathlib import Path
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponseNotModified
+from PIL import Image, ImageDraw, ImageFont
+
+from .models import is_cloudinary_url
+
+WIDTH, HEIGHT = 1200, 630
+BACKGROUND = (18, 18, 28)
+TEXT_COLOR = (245, 245, 250)
+SUB_COLOR = (170, 170, 190)
+ACCENT = (242, 201, 76)
+POSTER_TIMEOUT = 5
+MAX_POSTER_BYTES = 10 * 1024 * 1024
+# 日本語グリフを含むフォント（OG_FONT_PATH 未設定時に順に探す）
+FONT_CANDIDATES = [
+    '/usr/share/fonts/opentype/noto/NotoSansCJK-Bold.ttc',
+    '/usr/share/fonts/noto-cjk/NotoSansCJK-Bold.ttc',
+    '/usr/share/fonts/truetype/fonts-japanese-gothic.ttf',
+    '/System/Library/Fonts/ヒラギノ角ゴシック W6.ttc',
+]
+
+
+def cache_key(*parts):
+    return hashlib.sha256('|'.join(str(p) for p in parts).encode()).hexdigest()
+
+
+def cache_path(key):
+    return Path(settings.OG_CACHE_DIR) / key[:2] / f'{key}.png'
+
+
+def _font(size):
+    for path in [settings.OG_FONT_PATH, *FONT_CANDIDATES]:
+        if path and os.path.exists(path):
+            return ImageFont.truetype(path, size)
+    return ImageFont.load_default(size=size)
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    # リダイレクト先（Cloudinary 以外のホスト）は取りに行かない
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+_opener = urllib.request.build_opener(_NoRedirect)
+
+
+def _read_capped(f):
+    data = f.read(MAX_POSTER_BYTES + 1)
+    if len(data) > MAX_POSTER_BYTES:
+        raise ValueError('ポスター画像が大きすぎます')
+    return data
+
+
+def _load_poster(poster):
+    if not poster:
+        return None
+    try:
+        if poster.image:
+            with poster.image.open('rb') as f:
+                data = _read_capped(f)
+        elif is_cloudinary_url(poster.image_url):
+            # ユーザーが登録した URL なので https://res.cloudinary.com/ 以外は取得しない
+            with _opener.open(poster.image_url, timeout=POSTER_TIMEOUT) as res:
+                data = _read_capped(res)
+        else:
+            return None
+        return Image.open(io.BytesIO(data)).convert('RGB')
+    except (OSError, ValueError, Image.DecompressionBombError):
+        # 取得できなければポスターなしで描画
+        return None
+
+
+def _wrap(draw, text, font, max_width, max_lines):
+    lines, line = [], ''
+    for ch in text:
+        if draw.textlength(line + ch, font=font) > max_width:
+            lines.append(line)
+            line = ch
+            if len(lines) == max_lines:
+                lines[-1] = lines[-1][:-1] + '…'
+                return lines
+        else:
+            line += ch
+    if line:
+        lines.append(line)
+    return lines
+
+
+def _draw(poster, title, theater_name, rating_text, body=''):
+    image = Image.new('RGB', (WIDTH, HEIGHT), BACKGROUND)
+    draw = ImageDraw.Draw(image)
+
+    x = 60
+    poster_image = _load_poster(poster)
+    if poster_image:
+        poster_image.thumbnail((420, HEIGHT - 80))
+        image.paste(poster_image, (40, (HEIGHT - poster_image.height) // 2))
+        x = 40 + poster_image.width + 50
+    text_width = WIDTH - x - 60
+
+    y = 70
+    title_font = _font(56)
+    for line in _wrap(draw, title, title_font, text_width, 3):
+        draw.text((x, y), line, font=title_font, fill=TEXT_COLOR)
+        y += 72
+    if theater_name:
+        y += 10
+        draw.text((x, y), theater_name, font=_font(34), fill=SUB_COLOR)
+        y += 50
+    if rating_text:
+        y += 10
+        draw.text((x, y), rating_text, font=_font(40), fill=ACCENT)
+        y += 60
+    if body:
+        body_font = _font(28)
+        for line in _wrap(draw, body.replace('\n', ' '), body_font, text_width, 3):
+            draw.text((x, y), line, font=body_font, fill=TEXT_COLOR)
+            y += 40
+    draw.text((x, HEIGHT - 80), 'HOSHIDORI', font=_font(30), fill=SUB_COLOR)
+
+    buf = io.BytesIO()
+    image.save(buf, format='PNG', optimize=True)
+    return buf.getvalue()
+
+
+def render(key, poster, title, theater_name, rating_text, body=''):
+    """キャッシュ済みならそのパスを、なければ描画して保存したパスを返す"""
+    path = cache_path(key)
+    if path.exists():
+        return path
+    data = _draw(poster, title, theater_name, rating_text, body)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # 同時リクエストで半端なファイルを返さないよう一時ファイル経由で置き換え
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+    with os.fdopen(fd, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+    return path
+
+
+def respond(request, key, *args, **kwargs):
+    """ETag付きで画像を返す（同じカードを何度クロールされても描画は一度）"""
+    etag = f'"{key}"'
+    if request.headers.get('If-None-Match') == etag:
+        response = HttpResponseNotModified()
+    else:
+        path = render(key, *args, **kwargs)
+        response = FileResponse(open(path, 'rb'), content_type='image/png')
+    response['ETag'] = etag
+    response['Cache-Control'] = f'public, max-age={settings.OG_CACHE_MAX_AGE}'
+    return response
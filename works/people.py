@@ -0,0 +1,84 @@
+"""
+重複人物の統合。
+
+統合は「重複の人物ID → 残す人物ID」の対応表で行い、PerformanceCast の付け替えは
+CASE 式の UPDATE 1回（と、統合後に (公演, 人物) が重なる行の DELETE 1回）でまとめて行う。
+UPDATE はシグナルを通らないので、影響を受けたユーザーの観劇統計（人物別）は最後に再計算する。
+"""
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Case, Exists, F, IntegerField, OuterRef, Q, Value, When
+
+from reviews import stats
+from reviews.models import ViewingLog
+from . import filmography, work_page
+from .models import Performance, PerformanceCast, Person, normalize_name
+
+CHUNK_SIZE = 500
+
+
+def find_duplicates():
+    """name_key が同じになる人物 → {重複の人物ID: 残す人物ID}（ID の小さい人物を残す）"""
+    groups = defaultdict(list)
+    for person_id, name in Person.objects.order_by('id').values_list('id', 'name').iterator():
+        groups[normalize_name(name)].append(person_id)
+    return {dup: ids[0] for ids in groups.values() for dup in ids[1:]}
+
+
+def _merge_chunk(mapping):
+    target = Case(
+        *[When(person_id=dup, then=Value(keep)) for dup, keep in mapping.items()],
+        default=F('person_id'), output_field=IntegerField(),
+    )
+    casts = PerformanceCast.objects.annotate(target=target)
+    # 統合後に同じ公演で重なるキャストは、残す人物の行（なければ ID の小さい行）だけ残す
+    overlapping = casts.filter(
+        performance=OuterRef('performance'), target=OuterRef('target'),
+    ).filter(Q(person_id=F('target')) | Q(id__lt=OuterRef('id')))
+    removed, _ = casts.filter(person_id__in=mapping).filter(Exists(overlapping)).delete()
+    moved = PerformanceCast.objects.filter(person_id__in=mapping).update(person_id=target)
+    Person.objects.filter(pk__in=mapping).delete()
+    return moved, removed
+
+
+def merge(mapping):
+    """重複人物を統合して (付け替えたキャスト数, 重複で削除したキャスト数) を返す"""
+    mapping = {dup: keep for dup, keep in mapping.items() if dup != keep}
+    if not mapping:
+        return 0, 0
+    performance_ids = list(PerformanceCast.objects.filter(
+        person_id__in=mapping,
+    ).values_list('performance_id', flat=True).distinct())
+
+    moved = removed = 0
+    items = list(mapping.items())
+    with transaction.atomic():
+        for start in range(0, len(items), CHUNK_SIZE):
+            chunk_moved, chunk_removed = _merge_chunk(dict(items[start:start + CHUNK_SIZE]))
+            moved += chunk_moved
+            removed += chunk_removed
+
+        user_ids = set(ViewingLog.objects.filter(
+            performance_id__in=performance_ids, status='watched',
+        ).values_list('user_id', flat=True))
+        if user_ids:
+            stats.rebuild(user_ids)
+        filmography.bump(*mapping.values())
+        for work_id in Performance.objects.filter(
+            pk__in=performance_ids,
+        ).values_list('work_id', flat=True).distinct():
+            work_page.bump(work_id)
+    return moved, removed
+
+
+def refresh_name_keys():
+    """正規化ルール変更後などに name_key を付け直す（先に merge(find_duplicates()) で重複を解消しておく）"""
+    changed = []
+    for person in Person.objects.only('id', 'name', 'name_key').iterator():
+        name_key = normalize_name(person.name)
+        if person.name_key != name_key:
+            person.name_key = name_key
+            changed.append(person)
+    Person.objects.bulk_update(changed, ['name_key'], batch_size=1000)
+    return len(changed)
@@ -0,0 +1,80 @@
+from config.projection import Projection
+from reviews import ratings
+from reviews.models import WorkRating
+from .models import Performance, PosterSubmission
+from .serializers import WorkSerializer
+
+POSTER_COLUMNS = ('work_id', 'image', 'image_url', 'user__username', 'user__display_name', 'user__avatar_url')
+
+
+def selected_posters(work_ids):
+    """作品ID → 選択済みポスターの行（prefetch の _prefetched_selected_posters[0] 相当）"""
+    posters = {}
+    rows = PosterSubmission.objects.filter(
+        work_id__in=set(work_ids), is_selected=True,
+    ).values(*POSTER_COLUMNS)
+    for row in rows:
+        posters.setdefault(row['work_id'], row)
+    return posters
+
+
+def poster_url(projection, poster):
+    if not poster:
+        return None
+    if poster['image_url']:
+        return poster['image_url']
+    if poster['image']:
+        return projection.file_url(PosterSubmission._meta.get_field('image'), poster['image'])
+    return None
+
+
+class WorkProjection(Projection):
+    serializer_class = WorkSerializer
+
+    def prepare(self, rows):
+        work_ids = [row['id'] for row in rows]
+        self.posters, self.performances = {}, {}
+        if self.wants('selected_poster_image_url', 'selected_poster_user_display_name',
+                      'selected_poster_user_avatar_url'):
+            self.posters = selected_posters(work_ids)
+        if not self.wants('theater_name', 'start_date'):
+            return
+        perf_rows = Performance.objects.filter(
+            work_id__in=work_ids,
+        ).order_by('-start_date').values('work_id', 'start_date', 'theater__name')
+        for row in perf_rows:
+            self.performances.setdefault(row['work_id'], row)
+
+    def get_created_by(self, row):
+        return row['created_by__username']
+
+    def get_selected_poster_image_url(self, row):
+        return poster_url(self, self.posters.get(row['id']))
+
+    def get_selected_poster_user_display_name(self, row):
+        poster = self.posters.get(row['id'])
+        if poster:
+            return poster['user__display_name'] or poster['user__username']
+        return None
+
+    def get_selected_poster_user_avatar_url(self, row):
+        poster = self.posters.get(row['id'])
+        if poster:
+            return poster['user__avatar_url'] or None
+        return None
+
+    def get_theater_name(self, row):
+        perf = self.performances.get(row['id'])
+        return perf['theater__name'] if perf else None
+
+    def get_rating(self, row):
+        if row['rating_summary__count'] is None:
+            return ratings.summary_data(None)
+        return ratings.summary_data(WorkRating(**{
+            name: row[f'rating_summary__{name}']
+            for name in ['count', 'average', *[f'count_{value}' for value in ratings.RATING_VALUES]]
+        }))
+
+    def get_start_date(self, row):
+        perf = self.performances.get(row['id'])
+        return str(perf['start_date']) if perf else None
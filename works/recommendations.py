@@ -0,0 +1,107 @@
+"""
+作品レコメンドのオフライン計算。
+
+ViewingLog の共起（同じユーザーが記録した作品）と PerformanceCast の
+出演者の重なりから作品間のコサイン類似度を求め、上位N件を
+SimilarWork / UserRecommendation に書き出す。
+
+行列は疎なので、ユーザー→作品・出演者→作品の転置リストを走査して
+0でない要素だけを計算する（作品数の2乗にはならない）。
+"""
+import heapq
+import math
+from collections import defaultdict
+
+from django.db import transaction
+
+from reviews.models import ViewingLog
+from .models import PerformanceCast, SimilarWork, UserRecommendation
+
+CO_VIEW_WEIGHT = 0.7
+CAST_WEIGHT = 0.3
+# 記録数が極端に多いユーザーは共起計算から外す（組み合わせ数が2乗で増えるため）
+MAX_ITEMS_PER_USER = 500
+
+
+def _postings(pairs):
+    """(行, 列) の組から 列→行集合 と 行→列集合 を作る"""
+    by_item = defaultdict(set)
+    by_owner = defaultdict(set)
+    for owner, item in pairs:
+        by_item[item].add(owner)
+        by_owner[owner].add(item)
+    return by_item, by_owner
+
+
+def _cosine(by_item, by_owner):
+    """共起回数 / sqrt(件数a * 件数b) を、共起のある組だけ計算"""
+    co = defaultdict(lambda: defaultdict(int))
+    for items in by_owner.values():
+        if len(items) > MAX_ITEMS_PER_USER:
+            continue
+        items = sorted(items)
+        for i, a in enumerate(items):
+            for b in items[i + 1:]:
+                co[a][b] += 1
+                co[b][a] += 1
+    norms = {item: math.sqrt(len(owners)) for item, owners in by_item.items()}
+    return {
+        a: {b: n / (norms[a] * norms[b]) for b, n in row.items()}
+        for a, row in co.items()
+    }
+
+
+def build_similarity():
+    # 削除ジョブ待ちの作品は類似度・おすすめの対象にしない
+    viewing_pairs = ViewingLog.objects.filter(performance__work__is_deleted=False).values_list(
+        'user_id', 'performance__work_id',
+    ).distinct()
+    cast_pairs = PerformanceCast.objects.filter(performance__work__is_deleted=False).values_list(
+        'person_id', 'performance__work_id',
+    ).distinct()
+    works_by_user, user_works = _postings(viewing_pairs.iterator())
+    works_by_person, person_works = _postings(cast_pairs.iterator())
+
+    co_view = _cosine(works_by_user, user_works)
+    cast = _cosine(works_by_person, person_works)
+
+    similarity = defaultdict(dict)
+    for weight, matrix in ((CO_VIEW_WEIGHT, co_view), (CAST_WEIGHT, cast)):
+        for a, row in matrix.items():
+            for b, score in row.items():
+                similarity[a][b] = similarity[a].get(b, 0.0) + weight * score
+    return similarity, user_works
+
+
+def _top(scores, top_n):
+    return heapq.nlargest(top_n, scores.items(), key=lambda kv: (kv[1], -kv[0]))
+
+
+def build(top_n=20):
+    """類似作品・ユーザー別おすすめを再計算して保存。保存した件数を返す"""
+    similarity, user_works = build_similarity()
+
+    similar_rows = [
+        SimilarWork(work_id=work_id, similar_id=other_id, score=score, rank=rank)
+        for work_id, row in similarity.items()
+        for rank, (other_id, score) in enumerate(_top(row, top_n), start=1)
+    ]
+
+    recommendation_rows = []
+    for user_id, seen in user_works.items():
+        scores = defaultdict(float)
+        for work_id in seen:
+            for other_id, score in similarity.get(work_id, {}).items():
+                if other_id not in seen:
+                    scores[other_id] += score
+        recommendation_rows.extend(
+            UserRecommendation(user_id=user_id, work_id=work_id, score=score, rank=rank)
+            for rank, (work_id, score) in enumerate(_top(scores, top_n), start=1)
+        )
+
+    with transaction.atomic():
+        SimilarWork.objects.all().delete()
+        UserRecommendation.objects.all().delete()
+        SimilarWork.objects.bulk_create(similar_rows, batch_size=1000)
+        UserRecommendation.objects.bulk_create(recommendation_rows, batch_size=1000)
+    return len(similar_rows), len(recommendation_rows)
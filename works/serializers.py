@@ -1,6 +1,16 @@
 from rest_framework import serializers
 
-from .models import PerformanceCast, Performance, Person, PosterSubmission, Work
+from reviews import ratings
+from .models import (
+    PerformanceCast, Performance, Person, PosterSubmission, Work, is_cloudinary_url, normalize_name,
+)
+
+
+# rating フィールドが読む集計行（WorkRating / PerformanceRating）の列
+RATING_PATHS = [
+    'rating_summary__count', 'rating_summary__average',
+    *[f'rating_summary__count_{value}' for value in ratings.RATING_VALUES],
+]
 
 
 class WorkSerializer(serializers.ModelSerializer):
@@ -10,6 +20,7 @@ class WorkSerializer(serializers.ModelSerializer):
     selected_poster_user_avatar_url = serializers.SerializerMethodField()
     theater_name = serializers.SerializerMethodField()
     start_date = serializers.SerializerMethodField()
+    rating = serializers.SerializerMethodField()
 
     class Meta:
         model = Work
@@ -17,11 +28,23 @@ class WorkSerializer(serializers.ModelSerializer):
             'id', 'title', 'slug', 'description',
             'created_by', 'is_approved',
             'selected_poster_image_url', 'selected_poster_user_display_name', 'selected_poster_user_avatar_url',
-            'theater_name', 'start_date',
+            'theater_name', 'start_date', 'rating',
             'created_at', 'updated_at',
         ]
         read_only_fields = ['id', 'created_by', 'is_approved', 'created_at', 'updated_at']
         extra_kwargs = {'slug': {'required': False}}
+        # ?fields= での絞り込み用（各フィールドが読むモデルのパス）
+        field_paths = {
+            'created_by': ['created_by__username'],
+            'selected_poster_image_url': ['poster_submissions__image', 'poster_submissions__image_url'],
+            'selected_poster_user_display_name': [
+                'poster_submissions__user__display_name', 'poster_submissions__user__username',
+            ],
+            'selected_poster_user_avatar_url': ['poster_submissions__user__avatar_url'],
+            'theater_name': ['performances__theater__name'],
+            'start_date': ['performances__start_date'],
+            'rating': RATING_PATHS,
+        }
 
     def _get_selected_poster(self, obj):
         """prefetchデータから選択済みポスターを取得（クエリ発行なし）"""
@@ -74,6 +97,9 @@ class WorkSerializer(serializers.ModelSerializer):
             return poster.user.avatar_url or None
         return None
 
+    def get_rating(self, obj):
+        return ratings.summary_data(ratings.summary_of(obj))
+
 
 class PersonSerializer(serializers.ModelSerializer):
     created_by = serializers.StringRelatedField(read_only=True)
@@ -86,6 +112,15 @@ class PersonSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['id', 'created_by', 'is_approved', 'created_at', 'updated_at']
         extra_kwargs = {'slug': {'required': False}}
+        field_paths = {'created_by': ['created_by__username']}
+
+    def validate_name(self, value):
+        duplicates = Person.objects.filter(name_key=normalize_name(value))
+        if self.instance is not None:
+            duplicates = duplicates.exclude(pk=self.instance.pk)
+        if duplicates.exists():
+            raise serializers.ValidationError('同じ名前の人物が既に登録されています。')
+        return value
 
 
 class PerformanceCastSerializer(serializers.ModelSerializer):
@@ -97,21 +132,51 @@ class PerformanceCastSerializer(serializers.ModelSerializer):
         read_only_fields = ['id']
 
 
+class FilmographySerializer(serializers.ModelSerializer):
+    """人物の出演作1件（PerformanceCast + 公演・作品・劇場）"""
+    start_date = serializers.DateField(source='performance.start_date', read_only=True)
+    end_date = serializers.DateField(source='performance.end_date', read_only=True)
+    company_name = serializers.CharField(source='performance.company_name', read_only=True)
+    work = serializers.IntegerField(source='performance.work_id', read_only=True)
+    work_title = serializers.CharField(source='performance.work.title', read_only=True)
+    work_slug = serializers.CharField(source='performance.work.slug', read_only=True)
+    theater = serializers.IntegerField(source='performance.theater_id', read_only=True)
+    theater_name = serializers.CharField(source='performance.theater.name', read_only=True)
+    theater_slug = serializers.CharField(source='performance.theater.slug', read_only=True)
+
+    class Meta:
+        model = PerformanceCast
+        fields = [
+            'id', 'role_name', 'performance', 'start_date', 'end_date', 'company_name',
+            'work', 'work_title', 'work_slug', 'theater', 'theater_name', 'theater_slug',
+        ]
+        read_only_fields = fields
+
+
 class PerformanceSerializer(serializers.ModelSerializer):
     created_by = serializers.StringRelatedField(read_only=True)
     work_title = serializers.CharField(source='work.title', read_only=True)
     theater_name = serializers.CharField(source='theater.name', read_only=True)
     theater_slug = serializers.CharField(source='theater.slug', read_only=True)
     casts = PerformanceCastSerializer(many=True, read_only=True)
+    rating = serializers.SerializerMethodField()
 
     class Meta:
         model = Performance
         fields = [
             'id', 'work', 'work_title', 'theater', 'theater_name', 'theater_slug',
             'company_name', 'start_date', 'end_date', 'note',
-            'created_by', 'is_approved', 'casts', 'created_at', 'updated_at',
+            'created_by', 'is_approved', 'casts', 'rating', 'created_at', 'updated_at',
         ]
         read_only_fields = ['id', 'created_by', 'is_approved', 'created_at', 'updated_at']
+        field_paths = {
+            'created_by': ['created_by__username'],
+            'casts': ['casts__person__name', 'casts__role_name'],
+            'rating': RATING_PATHS,
+        }
+
+    def get_rating(self, obj):
+        return ratings.summary_data(ratings.summary_of(obj))
 
 
 class PosterSubmissionSerializer(serializers.ModelSerializer):
@@ -136,7 +201,7 @@ class PosterSubmissionSerializer(serializers.ModelSerializer):
         return obj.user.avatar_url or None
 
     def validate_image_url(self, value):
-        if value and 'res.cloudinary.com' not in value:
+        if value and not is_cloudinary_url(value):
             raise serializers.ValidationError('Cloudinary以外の画像URLは使用できません')
         return value
 
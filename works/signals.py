@@ -0,0 +1,120 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from config import deletion
+from reviews.models import Like, Review
+from . import filmography, work_page
+from .models import Performance, PerformanceCast, PosterSubmission, Work
+
+
+@receiver([post_save, post_delete], sender=Work)
+def _invalidate_work(sender, instance, **kwargs):
+    work_page.bump(instance.pk)
+
+
+@receiver(pre_save, sender=Performance)
+def _snapshot_performance_work(sender, instance, raw=False, **kwargs):
+    # 作品の付け替えを検出するため、保存前の work_id を持っておく（post_save の受け手が参照）
+    instance._previous_work_id = None
+    if instance.pk and not instance._state.adding and not raw:
+        instance._previous_work_id = Performance.objects.filter(
+            pk=instance.pk,
+        ).values_list('work_id', flat=True).first()
+
+
+@receiver([post_save, post_delete], sender=Performance)
+@receiver([post_save, post_delete], sender=PosterSubmission)
+def _invalidate_work_child(sender, instance, **kwargs):
+    work_page.bump(instance.work_id)
+    # 公演が別の作品へ付け替えられたら、元の作品のページからも外す
+    previous = getattr(instance, '_previous_work_id', None)
+    if previous and previous != instance.work_id:
+        work_page.bump(previous)
+
+
+@receiver(pre_save, sender=Review)
+def _snapshot_review_work(sender, instance, raw=False, **kwargs):
+    # Review.work は save() で公演から設定し直されるので、保存前の値を DB から読んでおく
+    instance._previous_work_id = None
+    if not instance.pk or instance._state.adding or raw:
+        return
+    # 公演が変わっていない（post_init のスナップショットで分かる）なら作品も変わらない
+    old_performance_id = (getattr(instance, '_stats_state', None) or {}).get('performance_id')
+    if old_performance_id != instance.performance_id:
+        instance._previous_work_id = Review.objects.filter(
+            pk=instance.pk,
+        ).values_list('work_id', flat=True).first()
+
+
+@receiver([post_save, post_delete], sender=Review)
+def _invalidate_by_review(sender, instance, **kwargs):
+    work_page.bump(instance.work_id)
+    previous = getattr(instance, '_previous_work_id', None)
+    if previous and previous != instance.work_id:
+        work_page.bump(previous)
+
+
+@receiver([post_save, post_delete], sender=PerformanceCast)
+def _invalidate_by_performance(sender, instance, **kwargs):
+    work_page.bump(Performance.objects.filter(
+        pk=instance.performance_id,
+    ).values_list('work_id', flat=True).first())
+
+
+@receiver([post_save, post_delete], sender=PerformanceCast)
+def _invalidate_filmography(sender, instance, **kwargs):
+    filmography.bump(instance.person_id)
+
+
+@receiver(post_save, sender=Performance)
+def _invalidate_filmography_by_performance(sender, instance, created, **kwargs):
+    # 公演の削除はキャストの削除（カスケード）で反映される
+    if not created:
+        filmography.bump(*PerformanceCast.objects.filter(
+            performance=instance,
+        ).values_list('person_id', flat=True))
+
+
+@receiver(post_save, sender=Work)
+def _invalidate_filmography_by_work(sender, instance, created, **kwargs):
+    if not created:
+        filmography.bump(*PerformanceCast.objects.filter(
+            performance__work=instance,
+        ).values_list('person_id', flat=True).distinct())
+
+
+@receiver([post_save, post_delete], sender=Like)
+def _invalidate_by_like(sender, instance, **kwargs):
+    work_page.bump(Review.objects.filter(
+        pk=instance.review_id,
+    ).values_list('work_id', flat=True).first())
+
+
+# まとめて削除（config/deletion.py）される行 → 作品 id へのパス
+WORK_PATHS = {
+    Work: 'id',
+    Performance: 'work_id',
+    PosterSubmission: 'work_id',
+    PerformanceCast: 'performance__work_id',
+    Review: 'work_id',
+    Like: 'review__work_id',
+}
+
+
+@receiver(deletion.pre_batch_delete, sender=Work)
+@receiver(deletion.pre_batch_delete, sender=Performance)
+@receiver(deletion.pre_batch_delete, sender=PosterSubmission)
+@receiver(deletion.pre_batch_delete, sender=PerformanceCast)
+@receiver(deletion.pre_batch_delete, sender=Review)
+@receiver(deletion.pre_batch_delete, sender=Like)
+def _invalidate_batch(sender, ids, **kwargs):
+    work_ids = sender._base_manager.filter(pk__in=ids).values_list(
+        WORK_PATHS[sender], flat=True,
+    ).order_by().distinct()
+    for work_id in work_ids:
+        work_page.bump(work_id)
+
+
+@receiver(deletion.pre_batch_delete, sender=PerformanceCast)
+def _invalidate_filmography_batch(sender, ids, **kwargs):
+    filmography.bump(*PerformanceCast.objects.filter(pk__in=ids).values_list('person_id', flat=True))
@@ -0,0 +1,28 @@
+from django.db import transaction
+
+from config import deletion
+from jobs.queue import enqueue, task
+from . import filmography, recommendations, work_page
+from .models import PerformanceCast, Work
+
+
+@task('works.build_recommendations', schedule='0 4 * * *')
+def build_recommendations(top_n=20):
+    recommendations.build(top_n=top_n)
+
+
+@task('works.delete_work')
+def delete_work(work_id):
+    deletion.purge(Work.objects.filter(pk=work_id))
+
+
+def request_deletion(work):
+    """作品をすぐに一覧・詳細から外し、公演・レビュー等の関連データごとの削除はジョブで行う"""
+    with transaction.atomic():
+        Work.objects.filter(pk=work.pk).update(is_deleted=True)
+        enqueue('works.delete_work', work_id=work.pk)
+        # update() では post_save が送られないので、出演者の出演作一覧もここで無効化する
+        filmography.bump(*PerformanceCast.objects.filter(
+            performance__work=work,
+        ).values_list('person_id', flat=True).distinct())
+    work_page.bump(work.pk)
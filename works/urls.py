@@ -1,6 +1,10 @@
+from django.urls import path
 from rest_framework.routers import DefaultRouter
 
-from .views import PerformanceCastViewSet, PerformanceViewSet, PersonViewSet, WorkViewSet
+from .views import (
+    MyRecommendationsView, PerformanceCastViewSet, PerformanceViewSet, PersonViewSet,
+    PopularPeopleView, WorkViewSet,
+)
 
 router = DefaultRouter()
 router.register('works', WorkViewSet)
@@ -8,4 +12,7 @@ router.register('performances', PerformanceViewSet)
 router.register('people', PersonViewSet)
 router.register('casts', PerformanceCastViewSet)
 
-urlpatterns = router.urls
+urlpatterns = [
+    path('me/recommendations/', MyRecommendationsView.as_view(), name='my-recommendations'),
+    path('people/popular/', PopularPeopleView.as_view(), name='person-popular'),
+] + router.urls
@@ -1,52 +1,81 @@
-from django.db.models import Prefetch, Subquery, OuterRef
+from django.db.models import Count, Prefetch, Q, Subquery, OuterRef
 
 from rest_framework.decorators import action
 from rest_framework.mixins import DestroyModelMixin
 from rest_framework.parsers import JSONParser, MultiPartParser, FormParser
-from rest_framework.permissions import IsAuthenticated, IsAuthenticatedOrReadOnly
+from rest_framework.permissions import AllowAny, IsAuthenticated, IsAuthenticatedOrReadOnly
 from rest_framework.response import Response
+from rest_framework.views import APIView
 from rest_framework.viewsets import GenericViewSet, ModelViewSet
 
 from accounts.permissions import IsOwnerOrReadOnly
-from .models import Performance, PerformanceCast, Person, PosterSubmission, Work
+from config.async_views import AsyncReadView, alist, serialize
+from config.fieldsets import SparseFieldsMixin
+from config.projection import ProjectionListMixin
+from reviews import ratings
+from . import casts, filmography, og_cards, tasks, work_page
+from .models import (
+    Performance, PerformanceCast, Person, PosterSubmission, SimilarWork, UserRecommendation, Work,
+    normalize_name,
+)
+from .projections import WorkProjection
 from .serializers import (
     PerformanceCastSerializer, PerformanceSerializer, PersonSerializer,
     PosterSubmissionSerializer, WorkSerializer,
 )
 
 
-class WorkViewSet(ModelViewSet):
-    queryset = Work.objects.all()
+def _prefetch_work_cards(qs):
+    """WorkSerializer が使う評価集計・ポスター・公演をまとめて取得"""
+    return qs.select_related('rating_summary').prefetch_related(
+        Prefetch(
+            'poster_submissions',
+            queryset=PosterSubmission.objects.filter(
+                is_selected=True,
+            ).select_related('user'),
+            to_attr='_prefetched_selected_posters',
+        ),
+        Prefetch(
+            'performances',
+            queryset=Performance.objects.select_related('theater').order_by('-start_date'),
+            to_attr='_prefetched_performances',
+        ),
+    )
+
+
+def _works_in_order(work_ids):
+    works = _prefetch_work_cards(Work.objects.filter(id__in=work_ids, is_deleted=False)).in_bulk()
+    return [works[wid] for wid in work_ids if wid in works]
+
+
+class WorkViewSet(SparseFieldsMixin, ProjectionListMixin, ModelViewSet):
+    # 削除ジョブ待ちの作品は出さない
+    queryset = Work.objects.filter(is_deleted=False)
     serializer_class = WorkSerializer
+    projection_class = WorkProjection
     lookup_field = 'slug'
     permission_classes = [IsAuthenticatedOrReadOnly]
 
     def get_queryset(self):
-        qs = super().get_queryset().prefetch_related(
-            Prefetch(
-                'poster_submissions',
-                queryset=PosterSubmission.objects.filter(
-                    is_selected=True,
-                ).select_related('user'),
-                to_attr='_prefetched_selected_posters',
-            ),
-            Prefetch(
-                'performances',
-                queryset=Performance.objects.select_related('theater').order_by('-start_date'),
-                to_attr='_prefetched_performances',
-            ),
-        )
+        qs = _prefetch_work_cards(super().get_queryset())
         q = self.request.query_params.get('q')
         if q:
             qs = qs.filter(title__icontains=q)
         person = self.request.query_params.get('person')
         if person:
             qs = qs.filter(performances__casts__person__name__icontains=person).distinct()
+        if self.request.query_params.get('ordering') == 'rating':
+            # work_rating_rank_idx を使う（全作品に WorkRating 行がある）
+            qs = qs.order_by('-rating_summary__average', '-rating_summary__count', '-created_at')
         return qs
 
     def perform_create(self, serializer):
         serializer.save(created_by=self.request.user)
 
+    def perform_destroy(self, instance):
+        # 公演・レビューの多い作品でもすぐ返せるよう、関連データの削除はジョブで行う
+        tasks.request_deletion(instance)
+
     @action(detail=True, methods=['get', 'post'], url_path='posters',
             parser_classes=[JSONParser, MultiPartParser, FormParser])
     def posters(self, request, slug=None):
@@ -60,6 +89,43 @@ class WorkViewSet(ModelViewSet):
         serializer.save(work=work, user=request.user, is_selected=True)
         return Response(serializer.data, status=201)
 
+    @action(detail=True, methods=['get'])
+    def similar(self, request, slug=None):
+        work_id = Work.objects.filter(slug=slug, is_deleted=False).values_list('id', flat=True).first()
+        if work_id is None:
+            return Response(status=404)
+        similar_ids = list(SimilarWork.objects.filter(
+            work_id=work_id,
+        ).order_by('rank').values_list('similar_id', flat=True))
+        serializer = self.get_serializer(_works_in_order(similar_ids), many=True)
+        return Response(serializer.data)
+
+    @action(detail=True, methods=['get'], permission_classes=[AllowAny])
+    def page(self, request, slug=None):
+        # 作品ページに必要なデータをまとめて返す（works/work_page.py）
+        data = work_page.get(request, slug)
+        if data is None:
+            return Response(status=404)
+        return Response(data)
+
+    @action(detail=True, methods=['get'], url_path='og-image', permission_classes=[AllowAny])
+    def og_image(self, request, slug=None):
+        work = self.get_object()
+        # get_queryset の prefetch 済みデータを使う
+        poster = next(iter(work._prefetched_selected_posters), None)
+        perf = next(iter(work._prefetched_performances), None)
+        # 評価の集計は select_related 済みの RatingSummary（reviews/ratings.py）
+        summary = ratings.summary_of(work)
+        rating_text = f'★ {summary.average:.1f}（{summary.count}件）' if summary and summary.count else ''
+        theater_name = perf.theater.name if perf else ''
+        key = og_cards.cache_key(
+            'work', work.id, work.updated_at,
+            poster and poster.id, poster and poster.image_url,
+            perf and perf.updated_at, perf and perf.theater.updated_at,
+            rating_text,
+        )
+        return og_cards.respond(request, key, poster, work.title, theater_name, rating_text)
+
     @action(detail=False, methods=['get'], url_path='my-posters',
             permission_classes=[IsAuthenticated])
     def my_posters(self, request):
@@ -80,8 +146,11 @@ class WorkViewSet(ModelViewSet):
         return Response(status=204)
 
 
-class PerformanceViewSet(ModelViewSet):
-    queryset = Performance.objects.select_related('work', 'theater').prefetch_related('casts__person')
+class PerformanceViewSet(SparseFieldsMixin, ModelViewSet):
+    # 削除ジョブ待ちの作品の公演は出さない
+    queryset = Performance.objects.filter(work__is_deleted=False).select_related(
+        'work', 'theater', 'rating_summary',
+    ).prefetch_related('casts__person')
     serializer_class = PerformanceSerializer
     permission_classes = [IsAuthenticatedOrReadOnly, IsOwnerOrReadOnly]
 
@@ -103,9 +172,10 @@ class PerformanceViewSet(ModelViewSet):
         role_name = request.data.get('role_name', '').strip()
         if not name:
             return Response({'name': '名前は必須です'}, status=400)
+        # 表記ゆれ（全角/半角・空白・カナ）を吸収した name_key で1回のインデックス検索
         person, _ = Person.objects.get_or_create(
-            name=name,
-            defaults={'created_by': request.user},
+            name_key=normalize_name(name),
+            defaults={'name': name, 'created_by': request.user},
         )
         cast, created = PerformanceCast.objects.get_or_create(
             performance=performance,
@@ -114,8 +184,29 @@ class PerformanceViewSet(ModelViewSet):
         )
         return Response(PerformanceCastSerializer(cast).data, status=201 if created else 200)
 
+    @action(detail=True, methods=['post'], url_path='add_casts',
+            permission_classes=[IsAuthenticatedOrReadOnly])
+    def add_casts(self, request, pk=None):
+        # [{name, role_name}, ...] をまとめて登録し、公演のキャスト一覧を返す（works/casts.py）
+        performance = self.get_object()
+        entries = request.data.get('casts')
+        if not isinstance(entries, list) or not entries:
+            return Response({'casts': 'キャストの配列を指定してください'}, status=400)
+        if len(entries) > casts.MAX_CASTS:
+            return Response({'casts': f'一度に登録できるのは{casts.MAX_CASTS}件までです'}, status=400)
+        if not all(isinstance(e, dict) and isinstance(e.get('name'), str) and e['name'].strip() for e in entries):
+            return Response({'name': '名前は必須です'}, status=400)
+        if not all(isinstance(e.get('role_name') or '', str) for e in entries):
+            return Response({'role_name': '役名は文字列で指定してください'}, status=400)
+        created = casts.add_casts(performance, entries, created_by=request.user)
+        cast_list = PerformanceCast.objects.filter(performance=performance).select_related('person')
+        return Response(
+            PerformanceCastSerializer(cast_list, many=True).data,
+            status=201 if created else 200,
+        )
+
 
-class PersonViewSet(ModelViewSet):
+class PersonViewSet(SparseFieldsMixin, ModelViewSet):
     queryset = Person.objects.all()
     serializer_class = PersonSerializer
     lookup_field = 'slug'
@@ -124,24 +215,49 @@ class PersonViewSet(ModelViewSet):
     def get_queryset(self):
         qs = super().get_queryset()
         q = self.request.query_params.get('q')
-        if q:
-            qs = qs.filter(name__icontains=q)
+        # 空白だけの q は照合キーが空になり全件に一致するので絞り込まない
+        name_key = normalize_name(q)
+        if name_key:
+            qs = qs.filter(Q(name__icontains=q) | Q(name_key__contains=name_key))
         return qs
 
     def perform_create(self, serializer):
         serializer.save(created_by=self.request.user)
 
-    @action(detail=False, methods=['get'], url_path='popular')
-    def popular(self, request):
-        from django.db.models import Count
-        qs = Person.objects.annotate(
-            work_count=Count('casts__performance__work', distinct=True),
-        ).filter(work_count__gt=0).order_by('-work_count')[:20]
-        serializer = self.get_serializer(qs, many=True)
-        return Response(serializer.data)
+    @action(detail=True, methods=['get'], permission_classes=[AllowAny])
+    def performances(self, request, slug=None):
+        # 出演作を開始日の降順でキーセットページング（works/filmography.py）
+        person_id = Person.objects.filter(slug=slug).values_list('id', flat=True).first()
+        if person_id is None:
+            return Response(status=404)
+        return Response(filmography.get(person_id, request.query_params.get('cursor')))
+
+
+class PopularPeopleView(AsyncReadView):
+    cache_response = True
+
+    async def get_data(self, request):
+        people = await alist(Person.objects.select_related('created_by').annotate(
+            work_count=Count(
+                'casts__performance__work', distinct=True,
+                filter=Q(casts__performance__work__is_deleted=False),
+            ),
+        ).filter(work_count__gt=0).order_by('-work_count')[:20])
+        return serialize(request, PersonSerializer, people)
 
 
 class PerformanceCastViewSet(DestroyModelMixin, GenericViewSet):
     queryset = PerformanceCast.objects.all()
     serializer_class = PerformanceCastSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
+
+
+class MyRecommendationsView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        work_ids = list(UserRecommendation.objects.filter(
+            user=request.user,
+        ).order_by('rank').values_list('work_id', flat=True))
+        serializer = WorkSerializer(_works_in_order(work_ids), many=True, context={'request': request})
+        return Response(serializer.data)
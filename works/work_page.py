@@ -0,0 +1,117 @@
+"""
+作品ページ用の集約レスポンス（GET /api/works/<slug>/page/）。
+
+作品・公演（劇場・キャスト込み）・レビュー集計と1ページ目・ポスター一覧を、
+件数によらず決まった数のクエリで組み立てる:
+  作品（評価集計込み） / ポスター / 公演 / キャスト / レビュー件数 / レビュー1ページ目
+
+ユーザーに依存しない部分は「作品ごとのバージョン」をキーにキャッシュする。
+バージョンは作品・公演・キャスト・ポスター・レビュー・いいねの保存/削除時に
+works/signals.py が更新する（人物名・劇場名などの変更は WORK_PAGE_CACHE_TIMEOUT で反映）。
+ログイン中ユーザーの is_liked だけはキャッシュ後に1クエリで上書きする。
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Prefetch, Value
+from django.urls import reverse
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+from reviews import ratings
+from reviews.models import Like, Review
+from reviews.serializers import ReviewSerializer
+from .models import Performance, PerformanceCast, PosterSubmission, Work
+from .serializers import PerformanceSerializer, PosterSubmissionSerializer, WorkSerializer
+
+
+def _version_key(work_id):
+    return f'work_page:version:{work_id}'
+
+
+def version(work_id):
+    # 初期値も時刻にして、バージョンのキーが消えても古いエントリと衝突しないようにする
+    return cache.get_or_set(_version_key(work_id), time.time_ns(), None)
+
+
+def bump(work_id):
+    """作品ページのキャッシュを無効化（コミット後に新しいバージョンへ）"""
+    if work_id:
+        transaction.on_commit(lambda: cache.set(_version_key(work_id), time.time_ns(), None))
+
+
+def _review_excerpts(reviews, context):
+    # レビュー一覧（ReviewViewSet.list）と同じく本文は返さず excerpt だけ
+    serializer = ReviewSerializer(reviews, many=True, context=context)
+    serializer.child.fields.pop('body')
+    return serializer.data
+
+
+def build(work, request):
+    context = {'request': request}
+    posters = list(PosterSubmission.objects.filter(work=work).select_related('user'))
+    performances = list(Performance.objects.filter(work=work).select_related(
+        'theater', 'created_by', 'rating_summary',
+    ).prefetch_related(
+        Prefetch('casts', queryset=PerformanceCast.objects.select_related('person')),
+    ))
+    for poster in posters:
+        poster.work = work
+    for perf in performances:
+        perf.work = work
+    # WorkSerializer が使う prefetch 相当
+    work._prefetched_selected_posters = [p for p in posters if p.is_selected]
+    work._prefetched_performances = performances
+
+    reviews = Review.objects.filter(work=work)
+    review_count = reviews.count()
+    page_size = api_settings.PAGE_SIZE
+    first_page = reviews.select_related(
+        'user', 'performance__work', 'performance__theater',
+    ).defer('body').annotate(
+        _like_count=Count('likes'),
+        # is_liked はキャッシュ後にユーザーごとに上書き
+        _liked_by_user=Value(False),
+    ).order_by('-created_at')[:page_size]
+
+    next_url = None
+    if review_count > page_size:
+        url = request.build_absolute_uri(reverse('review-list')) + f'?work={work.id}'
+        next_url = replace_query_param(url, 'page', 2)
+    return {
+        'work': WorkSerializer(work, context=context).data,
+        'performances': PerformanceSerializer(performances, many=True, context=context).data,
+        'reviews': {
+            'count': review_count,
+            # 評価の集計は WorkRating（reviews/ratings.py）から
+            'rating': ratings.summary_data(ratings.summary_of(work)),
+            'next': next_url,
+            'results': _review_excerpts(first_page, context),
+        },
+        'posters': PosterSubmissionSerializer(posters, many=True, context=context).data,
+    }
+
+
+def get(request, slug):
+    """作品ページのデータ（作品がない・削除中なら None）"""
+    work_id = Work.objects.filter(slug=slug, is_deleted=False).values_list('id', flat=True).first()
+    if work_id is None:
+        return None
+    key = f'work_page:{work_id}:{version(work_id)}:{request.get_host()}'
+    data = cache.get(key)
+    if data is None:
+        work = Work.objects.select_related('created_by', 'rating_summary').get(pk=work_id)
+        data = build(work, request)
+        cache.set(key, data, settings.WORK_PAGE_CACHE_TIMEOUT)
+
+    results = data['reviews']['results']
+    if request.user.is_authenticated and results:
+        liked = set(Like.objects.filter(
+            user=request.user, review_id__in=[r['id'] for r in results],
+        ).values_list('review_id', flat=True))
+        if liked:
+            results = [{**r, 'is_liked': r['id'] in liked} for r in results]
+            data = {**data, 'reviews': {**data['reviews'], 'results': results}}
+    return data